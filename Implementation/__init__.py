@@ -0,0 +1,70 @@
+"""
+MAYTHON: MAYO implementation and showcase in Python.
+
+    from Implementation import MAYO_Simulator, create_simulator
+    sim = create_simulator(P_coeffs, E_matrices, M, N, K)    # backend picked for the size
+
+Every name below is imported on first access (PEP 562), so `import Implementation`
+loads nothing: the verifier core needs only the standard library, NumPy is imported
+by the vectorized backends and tkinter by the GUI (python -m Implementation.mayo_gui).
+"""
+import importlib
+
+# public name -> submodule that defines it
+_EXPORTS = {
+    "Q": "mayo_utils",
+    "BinaryField": "mayo_utils",
+    "GF256": "mayo_utils",
+    "GF16": "mayo_utils",
+    "FIELDS": "mayo_utils",
+    "get_field": "mayo_utils",
+    "whipping_pairs": "mayo_utils",
+    "pack_upper_triangular": "mayo_utils",
+    "unpack_upper_triangular": "mayo_utils",
+    "MAYO_Simulator": "mayo_primitives",
+    "LAYOUTS": "mayo_primitives",
+    "TRACE_STAGES": "mayo_primitives",
+    "generate_mayo_test_parameters": "mayo_data_setup",
+    "SeededPublicKey": "mayo_data_setup",
+    "BACKENDS": "mayo_backends",
+    "register_backend": "mayo_backends",
+    "available_backends": "mayo_backends",
+    "select_backend": "mayo_backends",
+    "load_backend": "mayo_backends",
+    "create_simulator": "mayo_backends",
+    "MAYO_NumpySimulator": "mayo_numpy",
+    "MAYO_PackedSimulator": "mayo_gf16",
+    "PreparedKeyCache": "mayo_cache",
+    "SimulatorFactory": "mayo_cache",
+    "MayoStore": "mayo_store",
+    "StoreWriter": "mayo_store",
+    "SharedPublicKey": "mayo_parallel",
+    "verify_parallel": "mayo_parallel",
+    "screen_verify": "mayo_screening",
+    "IncrementalEvaluator": "mayo_incremental",
+    "TrapdoorKey": "mayo_signing",
+    "MAYO_Signer": "mayo_signing",
+    "Experiment": "mayo_experiments",
+}
+
+_SUBMODULES = {
+    "mayo_utils", "mayo_primitives", "mayo_data_setup", "mayo_backends", "mayo_numpy", "mayo_gf16",
+    "mayo_cache", "mayo_store", "mayo_parallel", "mayo_screening", "mayo_incremental", "mayo_signing",
+    "mayo_experiments", "mayo_benchmark", "mayo_cli", "mayo_gui",
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Cache it, so the next access is a plain module attribute lookup
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | _SUBMODULES)
@@ -0,0 +1,98 @@
+import importlib
+import importlib.util
+import sys
+
+from .mayo_utils import get_field
+
+# --- 1. BACKEND REGISTRY ---
+# A backend is a MAYO_Simulator subclass plus what it needs to run. Modules are only
+# imported when a backend is loaded, so listing or selecting backends never pulls in NumPy.
+
+class Backend:
+    """A simulator implementation: where its class lives and what it supports."""
+    def __init__(self, name, module, class_name, fields=None, requires=()):
+        self.name = name
+        # Module path, relative to this package when it starts with "."
+        self.module = module
+        self.class_name = class_name
+        # Field names it supports (None standing for the integer ring), or None for all
+        self.fields = fields
+        # Top-level modules that must be importable (checked without importing them)
+        self.requires = requires
+        self._available = None
+
+    def available(self):
+        if self._available is None:
+            self._available = all(importlib.util.find_spec(name) is not None for name in self.requires)
+        return self._available
+
+    def supports(self, field):
+        field = get_field(field)
+        return self.fields is None or (field.name if field is not None else None) in self.fields
+
+    def load(self):
+        """Imports the backend module and returns its simulator class."""
+        return getattr(importlib.import_module(self.module, __package__), self.class_name)
+
+BACKENDS = {}
+
+def register_backend(name, module, class_name, fields=None, requires=()):
+    """Adds (or replaces) a backend; `module` may be absolute or relative to this package."""
+    BACKENDS[name] = Backend(name, module, class_name, fields=fields, requires=requires)
+    return BACKENDS[name]
+
+register_backend("python", ".mayo_primitives", "MAYO_Simulator")
+register_backend("numpy", ".mayo_numpy", "MAYO_NumpySimulator", requires=("numpy",))
+register_backend("packed", ".mayo_gf16", "MAYO_PackedSimulator", fields=("gf16",), requires=("numpy",))
+
+def available_backends(field=None):
+    """Names of the backends that can run here for the given field."""
+    return [name for name, backend in BACKENDS.items() if backend.available() and backend.supports(field)]
+
+
+# --- 2. SIZE-AWARE SELECTION ---
+# Single P*(s) evaluations cost about M*K*N^2 multiplications. The pure-Python path has no
+# per-call overhead, NumPy has a fixed one, so NumPy only pays off above a size. Measured
+# crossovers with NumPy already imported (mayo_benchmark sizes, one core):
+#   ring:   NumPy faster from (4, 6, 2), M*K*N^2 = 288
+#   fields: pure Python faster up to (12, 16, 2) = 6144, NumPy from (16, 24, 3) = 27648
+# For batches NumPy was faster at every size, down to (2, 3, 1). The nibble-packed GF(16)
+# backend was slower than NumPy even at MAYO_1, so it is never picked automatically.
+RING_NUMPY_WORK = 256
+FIELD_NUMPY_WORK = 16384
+# Importing NumPy takes about 100 ms, as long as pure Python takes for this much work
+# (about 90 ns per ring multiplication, 6 ns per field one). While NumPy is not imported
+# yet, the whole batch has to outweigh the import before NumPy is picked.
+RING_IMPORT_WORK = 1_000_000
+FIELD_IMPORT_WORK = 16_000_000
+
+def select_backend(M, N, K, field=None, batch_size=1):
+    """Name of the fastest available backend for evaluating batch_size signatures at (M, N, K)."""
+    if not (BACKENDS["numpy"].available() and BACKENDS["numpy"].supports(field)):
+        return "python"
+    ring = get_field(field) is None
+    work = M * K * N * N
+    if "numpy" not in sys.modules and work * batch_size < (RING_IMPORT_WORK if ring else FIELD_IMPORT_WORK):
+        return "python"
+    if batch_size > 1:
+        return "numpy"
+    return "numpy" if work >= (RING_NUMPY_WORK if ring else FIELD_NUMPY_WORK) else "python"
+
+def load_backend(name="auto", M=None, N=None, K=None, field=None, batch_size=1):
+    """Simulator class of a backend by name; "auto" selects one for (M, N, K) and field."""
+    if name == "auto":
+        if None in (M, N, K):
+            raise ValueError("backend 'auto' needs M, N and K")
+        name = select_backend(M, N, K, field, batch_size)
+    try:
+        backend = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend '{name}'. Choose from: auto, {', '.join(BACKENDS)}") from None
+    if not backend.supports(field):
+        raise ValueError(f"backend '{name}' does not support field {get_field(field)}")
+    return backend.load()
+
+def create_simulator(P_coeffs, E_matrices, M, N, K, field=None, backend="auto", batch_size=1, **options):
+    """Builds a simulator for a key with the named (or automatically selected) backend."""
+    simulator_class = load_backend(backend, M, N, K, field, batch_size)
+    return simulator_class(P_coeffs, E_matrices, M, N, K, field=field, **options)
@@ -0,0 +1,229 @@
+"""
+Benchmark harness for the MAYO simulators.
+
+    python -m Implementation.mayo_benchmark            # every size, every backend
+    python -m Implementation.mayo_benchmark --sizes demo MAYO_1 --backends python numpy
+    python -m Implementation.mayo_benchmark -o run.json --baseline baseline.json
+    python -m Implementation.mayo_benchmark --save-baseline baseline.json
+
+For each parameter set and backend it times key generation (generate_mayo_test_parameters,
+without a valid target), simulator setup, one P_eval / P_prime / P_star_eval and a batch
+verify_batch, and records the peak memory of the batch verification.
+Results are written as JSON. With --baseline, every timing is compared with the
+stored run and the exit status is 1 if one got slower than the tolerance allows.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from .mayo_data_setup import generate_mayo_test_parameters
+from .mayo_utils import field_order
+from .mayo_backends import load_backend as load_engine
+
+# --- 1. PARAMETER SETS AND BACKENDS ---
+# (M, N, K): the GUI demo defaults up to the NIST MAYO parameter sets (m, n, k).
+PARAMETER_SETS = {
+    "demo": (4, 6, 2),
+    "small": (16, 24, 3),
+    "MAYO_1": (78, 86, 10),
+    "MAYO_2": (64, 81, 4),
+    "MAYO_3": (108, 118, 11),
+    "MAYO_5": (142, 154, 12),
+}
+
+# name: (mayo_backends engine, field, simulator options)
+BACKENDS = {
+    "python": ("python", None, {}),
+    "python-upper": ("python", None, {"layout": "upper"}),
+    "python-gf256": ("python", "gf256", {}),
+    "numpy": ("numpy", None, {}),
+    "numpy-upper": ("numpy", None, {"layout": "upper"}),
+    "numpy-gf256": ("numpy", "gf256", {}),
+    "packed-gf16": ("packed", "gf16", {}),
+}
+
+# Pure-Python backends are skipped when M * K * N^2 (multiplications per P*(s)) is above
+# this, unless --all is given: from MAYO_2 up a single batch takes tens of seconds to minutes.
+PYTHON_WORK_LIMIT = 1_000_000
+# Timings that are compared against a baseline
+TIMED_FIELDS = ("keygen_s", "setup_s", "P_eval_s", "P_prime_s", "P_star_eval_s", "batch_per_signature_s")
+
+
+def load_backend(name):
+    engine, field, options = BACKENDS[name]
+    try:
+        return load_engine(engine, field=field), field, options
+    except ImportError as exc:
+        # e.g. NumPy missing: the remaining backends still run
+        raise RuntimeError(f"backend '{name}' unavailable: {exc}") from None
+
+
+# --- 2. MEASUREMENTS ---
+
+def time_call(fn, min_time=0.2, max_repeats=1000):
+    """Fastest run of fn(), repeated until at least min_time seconds have been spent."""
+    best = float("inf")
+    total, runs = 0.0, 0
+    while runs < max_repeats and (runs == 0 or total < min_time):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        runs += 1
+    return best
+
+def peak_memory(fn):
+    """Peak bytes allocated (Python and NumPy) while running fn()."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def generate_key(size, field):
+    """
+    Times generate_mayo_test_parameters. Returns (seconds, (P_coeffs, E_matrices, S_INPUT)).
+    No valid target is requested: that would add a pure-Python P*(s) trace (most of the
+    time at MAYO_1) to every backend's key generation time.
+    """
+    M, N, K = PARAMETER_SETS[size]
+    start = time.perf_counter()
+    P_coeffs, E_matrices, S_INPUT, _ = generate_mayo_test_parameters(M, N, K, False, field=field)
+    return time.perf_counter() - start, (P_coeffs, E_matrices, S_INPUT)
+
+def bench_case(size, backend, batch_size=64, min_time=0.2, keys=None):
+    """
+    Runs every measurement for one (parameter set, backend). Returns a result dict.
+    `keys` caches generate_key results so backends sharing a field reuse one key, along
+    with the first backend's P*(S_INPUT), which every later backend must reproduce.
+    """
+    M, N, K = PARAMETER_SETS[size]
+    simulator_class, field, options = load_backend(backend)
+    order = field_order(field)
+    sig_len = N * K
+    result = {"size": size, "backend": backend, "M": M, "N": N, "K": K, "field": field}
+
+    keys = {} if keys is None else keys
+    if (size, field) not in keys:
+        keys[(size, field)] = {"generated": generate_key(size, field)}
+    key = keys[(size, field)]
+    result["keygen_s"], (P_coeffs, E_matrices, S_INPUT) = key["generated"]
+
+    start = time.perf_counter()
+    sim = simulator_class(P_coeffs, E_matrices, M, N, K, field=field, **options)
+    result["setup_s"] = time.perf_counter() - start
+
+    x = [random.randrange(order) for _ in range(N)]
+    y = [random.randrange(order) for _ in range(N)]
+    result["P_eval_s"] = time_call(lambda: sim.P_eval(x), min_time)
+    result["P_prime_s"] = time_call(lambda: sim.P_prime(x, y), min_time)
+    result["P_star_eval_s"] = time_call(lambda: sim.P_star_eval(S_INPUT, sig_len), min_time)
+    # The target is evaluated by the backend under test; backends sharing a key must agree
+    T = [int(v) for v in sim.P_star_eval(S_INPUT, sig_len)]
+    reference, T_reference = key.setdefault("target", (backend, T))
+    if T != T_reference:
+        raise AssertionError(f"{backend} disagrees with {reference} at {size}")
+
+    signatures = [[random.randrange(order) for _ in range(sig_len)] for _ in range(batch_size)]
+    targets = [T] * batch_size
+    batch = time_call(lambda: sim.verify_batch(signatures, targets), min_time)
+    result["batch_size"] = batch_size
+    result["batch_per_signature_s"] = batch / batch_size
+    result["batch_signatures_per_s"] = batch_size / batch
+    result["peak_memory_bytes"] = peak_memory(lambda: sim.verify_batch(signatures, targets))
+    return result
+
+def run_suite(sizes, backends, batch_size=64, min_time=0.2, include_slow=False, log=print):
+    results = []
+    for size in sizes:
+        keys = {}
+        M, N, K = PARAMETER_SETS[size]
+        for backend in backends:
+            if BACKENDS[backend][0] == "python" and M * K * N * N > PYTHON_WORK_LIMIT and not include_slow:
+                log(f"{size:>7} {backend:<13} skipped (pure Python, use --all)")
+                continue
+            try:
+                result = bench_case(size, backend, batch_size, min_time, keys)
+            except RuntimeError as exc:
+                log(f"{size:>7} {backend:<13} skipped ({exc})")
+                continue
+            log(f"{size:>7} {backend:<13} keygen {result['keygen_s']:8.3f} s | P*(s) "
+                f"{result['P_star_eval_s'] * 1e3:9.3f} ms | batch {result['batch_signatures_per_s']:9.1f} sig/s | "
+                f"peak {result['peak_memory_bytes'] / 2**20:8.2f} MiB")
+            results.append(result)
+    return results
+
+
+# --- 3. BASELINE COMPARISON ---
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Compares timings with a stored run. Returns a list of regressions
+    (size, backend, field, baseline value, new value) slower than 1 + tolerance.
+    """
+    stored = {(r["size"], r["backend"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = stored.get((result["size"], result["backend"]))
+        if old is None:
+            continue
+        for field in TIMED_FIELDS:
+            if field in old and result[field] > old[field] * (1 + tolerance):
+                regressions.append((result["size"], result["backend"], field, old[field], result[field]))
+    return regressions
+
+def environment():
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "python": platform.python_version(),
+        "numpy": numpy_version,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the MAYO simulators.")
+    parser.add_argument("--sizes", nargs="+", choices=list(PARAMETER_SETS), default=list(PARAMETER_SETS))
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS))
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds spent per timing")
+    parser.add_argument("--all", action="store_true", help="also run pure Python at the large sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", help="also write the results to this baseline file")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    results = run_suite(args.sizes, args.backends, args.batch_size, args.min_time, args.all)
+    report = {"environment": environment(), "results": results}
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for size, backend, field, old, new in regressions:
+            print(f"REGRESSION {size} {backend} {field}: {old:.6g} s -> {new:.6g} s ({new / old:.2f}x)")
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
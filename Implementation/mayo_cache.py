@@ -0,0 +1,234 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from .mayo_utils import whipping_pairs
+from .mayo_primitives import MAYO_Simulator
+
+# --- 1. KEY FINGERPRINTS ---
+# A fingerprint names a public key independently of how it is held in memory: nested
+# lists, NumPy arrays and the bytes of a seeded key all hash the same way. Seeded keys
+# are fingerprinted from their seed, so a cache hit never expands the key.
+
+def _field_name(field):
+    return getattr(field, "name", field) or "ring"
+
+def _matrix_bytes(matrix):
+    """Row-major element bytes of a matrix given as nested lists, an array or bytes."""
+    if isinstance(matrix, (bytes, bytearray, memoryview)):
+        return bytes(matrix)
+    if hasattr(matrix, "tobytes"):
+        return matrix.astype("uint8").tobytes()
+    return b"".join(bytes(row) for row in matrix)
+
+def key_fingerprint(P_coeffs, E_matrices, M, N, K, field=None):
+    """SHA-256 (hex) of the parameters, every P_i and every E_ij in whipping-pair order."""
+    h = hashlib.sha256(f"MAYO-PK|{M}|{N}|{K}|{_field_name(field)}|".encode())
+    if isinstance(P_coeffs, (bytes, bytearray, memoryview)) or hasattr(P_coeffs, "tobytes"):
+        h.update(_matrix_bytes(P_coeffs))
+    else:
+        for P_i in P_coeffs:
+            h.update(_matrix_bytes(P_i))
+    for i, j in whipping_pairs(K):
+        h.update(_matrix_bytes(E_matrices[f"{i},{j}"]))
+    return h.hexdigest()
+
+def seed_fingerprint(seed, M, N, K, field=None):
+    """Fingerprint of a seed-expanded key (mayo_data_setup.SeededPublicKey)."""
+    h = hashlib.sha256(f"MAYO-SEED|{M}|{N}|{K}|{_field_name(field)}|".encode())
+    h.update(bytes(seed))
+    return h.hexdigest()
+
+def fingerprint(key):
+    """Fingerprint of a key object: from its seed if it has one, otherwise from its matrices."""
+    if hasattr(key, "seed"):
+        return seed_fingerprint(key.seed, key.M, key.N, key.K, key.field)
+    return key_fingerprint(key.P_coeffs, key.E_matrices, key.M, key.N, key.K, key.field)
+
+
+# --- 2. PREPARED-KEY SIZE ---
+# CPython keeps one shared object for each int in -5..256; every other int in a list is
+# an object of its own (e.g. the ring's P_i + P_i^T entries, which go up to 510).
+_CACHED_INTS = range(-5, 257)
+
+def prepared_nbytes(obj, _seen=None):
+    """
+    Approximate memory held by a prepared simulator: NumPy arrays, bytes and the nested
+    lists/dicts of its attributes. Objects shared between attributes are counted once;
+    list elements cost their 8-byte slot, plus the int object itself outside -5..256.
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if hasattr(obj, "nbytes") and hasattr(obj, "dtype"):
+        # A view only owns its base's memory once
+        base = getattr(obj, "base", None)
+        return 0 if base is not None and id(base) in seen else obj.nbytes
+    if isinstance(obj, (bytes, bytearray)):
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(prepared_nbytes(v, seen) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        total = sys.getsizeof(obj)
+        for v in obj:
+            if isinstance(v, int):
+                if v not in _CACHED_INTS:
+                    total += sys.getsizeof(v)
+            else:
+                total += prepared_nbytes(v, seen)
+        return total
+    if isinstance(obj, MAYO_Simulator):
+        return sum(prepared_nbytes(v, seen) for v in vars(obj).values())
+    return 0
+
+
+# --- 3. LRU CACHE ---
+
+class PreparedKeyCache:
+    """
+    LRU cache of prepared simulators, bounded by their total size in bytes.
+
+    Entries are keyed by (fingerprint, simulator class, options), so the same key
+    prepared for different backends or layouts is cached separately. A simulator larger
+    than max_bytes on its own is returned but not cached. Thread-safe: concurrent
+    get_or_prepare calls for the same key prepare it once and share the result.
+    """
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        # cache_key -> Future of the prepare() currently running for it
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get(self, cache_key):
+        """The cached simulator for cache_key (marked most recently used), or None."""
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, cache_key, simulator):
+        """Caches a prepared simulator, evicting least recently used entries to stay in budget."""
+        nbytes = prepared_nbytes(simulator)
+        with self._lock:
+            if cache_key in self._entries:
+                self.current_bytes -= self._entries.pop(cache_key)[1]
+            if nbytes > self.max_bytes:
+                return
+            while self._entries and self.current_bytes + nbytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+            self._entries[cache_key] = (simulator, nbytes)
+            self.current_bytes += nbytes
+
+    def get_or_prepare(self, cache_key, prepare):
+        """
+        Returns the cached simulator, or calls prepare() and caches its result. A caller
+        that finds the same key already being prepared waits for that result (counted
+        as a hit) instead of preparing it again.
+        """
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return entry[0]
+            future = self._in_flight.get(cache_key)
+            if future is None:
+                future = self._in_flight[cache_key] = Future()
+                self.misses += 1
+                owner = True
+            else:
+                self.hits += 1
+                owner = False
+        if not owner:
+            return future.result()
+        try:
+            simulator = prepare()
+            self.put(cache_key, simulator)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(simulator)
+            return simulator
+        finally:
+            with self._lock:
+                del self._in_flight[cache_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, cache_key):
+        return cache_key in self._entries
+
+    def stats(self):
+        """Hit/miss counters and current occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# --- 4. SIMULATOR FACTORY ---
+
+class SimulatorFactory:
+    """
+    Builds simulators through a PreparedKeyCache, so a key that was already prepared
+    (stacked, symmetrized, packed, converted to field tables, ...) is reused as is.
+
+        factory = SimulatorFactory(MAYO_NumpySimulator, max_bytes=512 * 2**20)
+        sim = factory.from_key(seeded_key)          # prepared once
+        sim = factory.from_key(seeded_key)          # cache hit
+
+    Simulators are shared between callers and must be treated as read-only.
+    """
+    def __init__(self, simulator_class=MAYO_Simulator, cache=None, max_bytes=256 * 1024 * 1024, **options):
+        self.simulator_class = simulator_class
+        self.options = options
+        self.cache = PreparedKeyCache(max_bytes) if cache is None else cache
+
+    def _cache_key(self, fp):
+        # The class itself, not its name: same-named classes from different modules differ
+        return (fp, self.simulator_class, tuple(sorted(self.options.items())))
+
+    def simulator(self, P_coeffs, E_matrices, M, N, K, field=None, fp=None):
+        """Simulator for a key given as matrices; `fp` skips hashing when the fingerprint is known."""
+        fp = fp or key_fingerprint(P_coeffs, E_matrices, M, N, K, field)
+        return self.cache.get_or_prepare(
+            self._cache_key(fp),
+            lambda: self.simulator_class(P_coeffs, E_matrices, M, N, K, field=field, **self.options),
+        )
+
+    def from_key(self, key):
+        """Simulator for a key object such as mayo_data_setup.SeededPublicKey."""
+        return self.cache.get_or_prepare(
+            self._cache_key(fingerprint(key)),
+            lambda: self.simulator_class.from_key(key, **self.options),
+        )
+
+    def stats(self):
+        return self.cache.stats()
@@ -0,0 +1,256 @@
+"""
+Headless command-line front end (no tkinter).
+
+    python -m Implementation.mayo_cli generate --count 1000 --format jsonl > records.jsonl
+    python -m Implementation.mayo_cli verify records.jsonl > results.jsonl
+
+A record is (key-id, signature, target). The key-id is the hex seed of a
+mayo_data_setup.SeededPublicKey; M, N, K and the field are given on the command line
+and are shared by every key in a stream.
+
+Formats:
+  jsonl   one object per line: {"key_id": "<hex>", "signature": [...], "target": [...]}
+          (signature/target may also be hex strings, one byte per element)
+  binary  records back to back, each field prefixed by its length as a little-endian
+          uint16: <len><key-id bytes><len><signature bytes><len><target bytes>
+
+Records are streamed: at most one batch is held in memory, so input size is unbounded.
+"""
+import argparse
+import itertools
+import json
+import random
+import struct
+import sys
+
+from .mayo_primitives import MAYO_Simulator
+from .mayo_data_setup import DEFAULT_M, DEFAULT_N, DEFAULT_K, SeededPublicKey, generate_random_matrix
+from .mayo_utils import FIELDS, field_order
+from .mayo_cache import SimulatorFactory
+# Backends are imported on first use (see mayo_backends), so the plain Python path needs
+# nothing beyond the standard library
+from .mayo_backends import BACKENDS, load_backend
+
+# --- 1. FORMATS ---
+FORMATS = ("jsonl", "binary")
+_LENGTH = struct.Struct("<H")
+
+
+# --- 2. RECORD READERS / WRITERS ---
+
+def _elements(value, name):
+    """A signature or target: a hex string, or a list of integers in 0..255."""
+    if isinstance(value, str):
+        return list(bytes.fromhex(value))
+    if not isinstance(value, list):
+        raise ValueError(f"{name} must be a hex string or a list of integers")
+    for v in value:
+        # bool is an int subclass, but true/false are not elements
+        if not isinstance(v, int) or isinstance(v, bool) or not 0 <= v <= 255:
+            raise ValueError(f"{name} element {v!r} is not an integer in 0..255")
+    return value
+
+def read_jsonl(stream):
+    """Yields (key_id, signature, target) from a binary stream of JSON lines."""
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            key_id = record["key_id"]
+            if not isinstance(key_id, str):
+                raise ValueError(f"key_id must be a hex string, not {type(key_id).__name__}")
+            yield key_id, _elements(record["signature"], "signature"), _elements(record["target"], "target")
+        except (ValueError, KeyError, TypeError) as exc:
+            raise ValueError(f"line {line_no}: malformed record ({exc})") from None
+
+def _read_field(stream, record_no):
+    head = stream.read(_LENGTH.size)
+    if not head:
+        return None
+    if len(head) < _LENGTH.size:
+        raise ValueError(f"record {record_no}: truncated length prefix")
+    (length,) = _LENGTH.unpack(head)
+    data = stream.read(length)
+    if len(data) < length:
+        raise ValueError(f"record {record_no}: truncated field")
+    return data
+
+def read_binary(stream):
+    """Yields (key_id, signature, target) from a length-prefixed binary stream."""
+    for record_no in itertools.count(1):
+        key = _read_field(stream, record_no)
+        if key is None:
+            return
+        signature = _read_field(stream, record_no)
+        target = _read_field(stream, record_no)
+        if signature is None or target is None:
+            raise ValueError(f"record {record_no}: truncated record")
+        yield key.hex(), list(signature), list(target)
+
+def write_jsonl(stream, key_id, signature, target):
+    line = {"key_id": key_id, "signature": bytes(signature).hex(), "target": bytes(target).hex()}
+    stream.write(json.dumps(line).encode() + b"\n")
+
+def write_binary(stream, key_id, signature, target):
+    for field in (bytes.fromhex(key_id), bytes(signature), bytes(target)):
+        stream.write(_LENGTH.pack(len(field)) + field)
+
+READERS = {"jsonl": read_jsonl, "binary": read_binary}
+WRITERS = {"jsonl": write_jsonl, "binary": write_binary}
+
+
+# --- 3. VERIFICATION PIPELINE ---
+# read -> batch (consecutive records of one key) -> verify -> write, one generator each.
+
+def batches(records, batch_size):
+    """Groups consecutive records with the same key-id into batches of at most batch_size."""
+    for key_id, group in itertools.groupby(records, key=lambda record: record[0]):
+        while True:
+            chunk = list(itertools.islice(group, batch_size))
+            if not chunk:
+                break
+            yield key_id, chunk
+
+class KeyStore:
+    """
+    Simulators for key-ids, prepared through a mayo_cache.SimulatorFactory: hot keys stay
+    prepared (LRU, at most max_bytes of prepared key data).
+    """
+    def __init__(self, M, N, K, field=None, simulator_class=MAYO_Simulator, max_bytes=256 * 1024 * 1024):
+        self.M, self.N, self.K, self.field = M, N, K, field
+        self.factory = SimulatorFactory(simulator_class, max_bytes=max_bytes)
+
+    def get(self, key_id):
+        # Keys are fingerprinted from their seed, so a cache hit does not expand anything
+        return self.factory.from_key(SeededPublicKey(key_id, self.M, self.N, self.K, field=self.field))
+
+def verify_stream(records, keys, batch_size=256):
+    """
+    Verifies (key_id, signature, target) records lazily.
+    Yields (index, key_id, valid, output) in input order.
+    """
+    sig_len = keys.N * keys.K
+    index = 0
+    for key_id, chunk in batches(records, batch_size):
+        for _, signature, target in chunk:
+            if len(signature) != sig_len or len(target) != keys.M:
+                raise ValueError(f"record {index + 1}: expected a {sig_len}-element signature "
+                                 f"and a {keys.M}-element target")
+        outputs, valid = keys.get(key_id).verify_batch(
+            [signature for _, signature, _ in chunk], [target for _, _, target in chunk])
+        for output, ok in zip(outputs, valid):
+            yield index, key_id, bool(ok), [int(v) for v in output]
+            index += 1
+
+
+# --- 4. COMMANDS ---
+
+def _open_input(path):
+    return sys.stdin.buffer if path in (None, "-") else open(path, "rb")
+
+def _open_output(path):
+    return sys.stdout.buffer if path in (None, "-") else open(path, "wb")
+
+def cmd_verify(args):
+    simulator_class = load_backend(args.backend, args.M, args.N, args.K, args.field, args.batch_size)
+    keys = KeyStore(args.M, args.N, args.K, field=args.field,
+                    simulator_class=simulator_class, max_bytes=args.cache_mb * 1024 * 1024)
+    total = accepted = 0
+    source, sink = _open_input(args.input), _open_output(args.output)
+    try:
+        for index, key_id, valid, output in verify_stream(READERS[args.format](source), keys, args.batch_size):
+            result = {"index": index, "key_id": key_id, "valid": valid}
+            if args.show_output:
+                result["output"] = output
+            sink.write(json.dumps(result).encode() + b"\n")
+            total += 1
+            accepted += valid
+            if total % args.batch_size == 0:
+                sink.flush()
+    finally:
+        sink.flush()
+        if source is not sys.stdin.buffer:
+            source.close()
+        if sink is not sys.stdout.buffer:
+            sink.close()
+    print(f"verified {total} records: {accepted} valid, {total - accepted} invalid", file=sys.stderr)
+    stats = keys.factory.stats()
+    print(f"key cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions, "
+          f"{stats['bytes'] / 2**20:.1f} MiB held", file=sys.stderr)
+    return 0 if accepted == total else 1
+
+def cmd_generate(args):
+    if args.seed is not None:
+        random.seed(args.seed)
+    key_ids = [SeededPublicKey.generate(args.M, args.N, args.K, field=args.field).key_id for _ in range(args.keys)]
+    order = field_order(args.field)
+    # Each key is expanded and prepared once (through the same cache as verify), and the
+    # targets of its valid records are evaluated batch_size at a time
+    simulator_class = load_backend("auto", args.M, args.N, args.K, args.field, args.batch_size)
+    keys = KeyStore(args.M, args.N, args.K, field=args.field, simulator_class=simulator_class)
+    records = ((key_ids[n * args.keys // args.count],) for n in range(args.count))
+    sink = _open_output(args.output)
+    try:
+        for key_id, chunk in batches(records, args.batch_size):
+            signatures = generate_random_matrix(len(chunk), args.N * args.K, order)
+            valid = [random.random() >= args.invalid_fraction for _ in chunk]
+            signed = [signature for signature, ok in zip(signatures, valid) if ok]
+            outputs = iter(keys.get(key_id).P_star_eval_batch(signed) if signed else [])
+            for signature, ok in zip(signatures, valid):
+                # Valid records get P*(s) as target, the others a random one
+                target = [int(v) for v in next(outputs)] if ok else generate_random_matrix(1, args.M, order)[0]
+                WRITERS[args.format](sink, key_id, signature, target)
+    finally:
+        sink.flush()
+        if sink is not sys.stdout.buffer:
+            sink.close()
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m Implementation.mayo_cli", description="Headless MAYO verifier.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(p):
+        p.add_argument("--M", type=int, default=DEFAULT_M, help="number of equations")
+        p.add_argument("--N", type=int, default=DEFAULT_N, help="size of signature blocks")
+        p.add_argument("--K", type=int, default=DEFAULT_K, help="number of signature blocks")
+        p.add_argument("--field", choices=list(FIELDS), default=None, help="finite field (default: integers mod Q)")
+        p.add_argument("--format", choices=FORMATS, default="jsonl")
+        p.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+
+    verify = sub.add_parser("verify", help="verify a stream of (key-id, signature, target) records")
+    add_common(verify)
+    verify.add_argument("input", nargs="?", default="-", help="input file (default: stdin)")
+    verify.add_argument("--backend", choices=["auto", *BACKENDS], default="auto",
+                        help="simulator implementation (default: picked for M, N, K and the batch size)")
+    verify.add_argument("--batch-size", type=int, default=256, help="records verified per batch")
+    verify.add_argument("--cache-mb", type=int, default=256, help="memory budget for prepared keys (MiB)")
+    verify.add_argument("--show-output", action="store_true", help="include P*(s) in each result")
+    verify.set_defaults(run=cmd_verify)
+
+    generate = sub.add_parser("generate", help="write random test records")
+    add_common(generate)
+    generate.add_argument("--count", type=int, default=100)
+    generate.add_argument("--keys", type=int, default=1, help="number of distinct public keys")
+    generate.add_argument("--invalid-fraction", type=float, default=0.5)
+    generate.add_argument("--batch-size", type=int, default=256, help="records evaluated per batch")
+    generate.add_argument("--seed", type=int, default=None, help="seed for reproducible output")
+    generate.set_defaults(run=cmd_generate)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, "batch_size", 1) < 1:
+        raise SystemExit("--batch-size must be at least 1")
+    try:
+        return args.run(args)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
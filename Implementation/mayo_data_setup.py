@@ -1,52 +1,192 @@
+import hashlib
 import random
-from mayo_utils import Q
-from mayo_primitives import MAYO_Simulator
+from .mayo_utils import whipping_pairs, field_order
+from .mayo_primitives import MAYO_Simulator
 
 # --- 1. DEFAULT PARAMETERS ---
 DEFAULT_M = 4 # Number of equations (Hash size)
 DEFAULT_N = 6 # Size of signature blocks
-DEFAULT_K = 2 # Number of signature blocks (Max 2 for this sim)
+DEFAULT_K = 2 # Number of signature blocks
 
 # --- 2. RANDOM PARAMETER GENERATION (Helper function) ---
 
+def _reduction_table(modulus):
+    """bytes.translate table mapping every byte b to b % modulus."""
+    return bytes(b % modulus for b in range(256))
+
+def random_elements(count, modulus):
+    """
+    Returns `count` random elements in [0, modulus-1] as bytes, drawn in bulk from `random`
+    (so random.seed() still makes runs reproducible). Requires modulus to divide 256.
+    """
+    return random.randbytes(count).translate(_reduction_table(modulus))
+
 def generate_random_matrix(rows, cols, modulus):
     """Generates a matrix with random elements in [0, modulus-1]."""
-    return [[random.randint(0, modulus - 1) for _ in range(cols)] for _ in range(rows)]
+    if 256 % modulus:
+        return [[random.randint(0, modulus - 1) for _ in range(cols)] for _ in range(rows)]
+    buf = random_elements(rows * cols, modulus)
+    return [list(buf[r*cols:(r+1)*cols]) for r in range(rows)]
 
-def generate_random_matrices_and_signature(Q, M, N, K, sig_len):
-    """Generates random public key matrices (P, E) and a random signature (S)."""
+def generate_random_matrices_and_signature(Q, M, N, K, sig_len, progress=None):
+    """
+    Generates random public key matrices (P, E) and a random signature (S).
+    If given, progress() is called after each P_i (it may raise to abort).
+    """
     # P_coeffs: M matrices of size N x N.
-    P_coeffs = [generate_random_matrix(N, N, Q) for _ in range(M)]
-
-    # E_matrices: M x M whipping transformation matrices. (Simplified for K=2)
-    E_matrices = {
-        "1,1": generate_random_matrix(M, M, Q),
-        "2,2": generate_random_matrix(M, M, Q),
-        # E_ij where i != j (assuming K=2 for the simulator)
-        "1,2": generate_random_matrix(M, M, Q), 
-    }
+    P_coeffs = []
+    for _ in range(M):
+        P_coeffs.append(generate_random_matrix(N, N, Q))
+        if progress is not None:
+            progress()
+
+    # E_matrices: M x M whipping transformation matrices, one per block pair (i, j) with i <= j.
+    E_matrices = {f"{i},{j}": generate_random_matrix(M, M, Q) for i, j in whipping_pairs(K)}
     
     # S_INPUT: Random signature vector of length N*K
-    S_INPUT = [random.randint(0, Q - 1) for _ in range(sig_len)]
+    S_INPUT = generate_random_matrix(1, sig_len, Q)[0]
     
     return P_coeffs, E_matrices, S_INPUT
 
-def generate_mayo_test_parameters(M, N, K, force_valid):
+def generate_mayo_test_parameters(M, N, K, force_valid, field=None, seed=None, return_trace=False, hook=None,
+                                  progress=None):
     """
     Generates all test parameters.
     If force_valid is True, T_PRIME_HASH_INPUT is set to P*(S_INPUT), guaranteeing success.
+    `field` selects the arithmetic (see mayo_utils.get_field); None keeps integers mod Q.
+    If `seed` is given, the public key is the SeededPublicKey expanded from it.
+    If `return_trace` is True, the MAYO_Simulator.P_star_trace of S_INPUT is returned as a
+    fifth value (computed once, and reused as the target when force_valid is set).
+    `hook` is forwarded to P_star_trace to follow (or abort, by raising) the evaluation.
+    `progress` is called once per generated P_i of a random key and once per signature
+    block of the trace (so M + K times for a random key with a trace); it may raise too.
     """
     SIG_LENGTH = N * K
+    order = field_order(field)
     
-    # Always generate random public key and signature
-    P_coeffs, E_matrices, S_INPUT = generate_random_matrices_and_signature(Q, M, N, K, SIG_LENGTH)
+    if seed is None:
+        # Always generate random public key and signature
+        P_coeffs, E_matrices, S_INPUT = generate_random_matrices_and_signature(order, M, N, K, SIG_LENGTH, progress)
+    else:
+        key = SeededPublicKey(seed, M, N, K, field=field)
+        P_coeffs, E_matrices = key.P_coeffs, key.E_matrices
+        S_INPUT = generate_random_matrix(1, SIG_LENGTH, order)[0]
+
+    trace = None
+    if force_valid or return_trace:
+        temp_simulator = MAYO_Simulator(P_coeffs, E_matrices, M, N, K, field=field)
+        trace = temp_simulator.P_star_trace(S_INPUT, SIG_LENGTH, hook=hook, progress=progress)
 
     if force_valid:
         # Guarantee VALID: Calculate the expected output T = P*(S)
-        temp_simulator = MAYO_Simulator(P_coeffs, E_matrices, M, N, K)
-        T_PRIME_HASH_INPUT = temp_simulator.P_star_eval(S_INPUT, SIG_LENGTH)
+        T_PRIME_HASH_INPUT = trace["T"]
     else:
         # Generate random hash T' independently (likely INVALID)
-        T_PRIME_HASH_INPUT = [random.randint(0, Q - 1) for _ in range(M)]
+        T_PRIME_HASH_INPUT = generate_random_matrix(1, M, order)[0]
+
+    if return_trace:
+        return P_coeffs, E_matrices, S_INPUT, T_PRIME_HASH_INPUT, trace
+    return P_coeffs, E_matrices, S_INPUT, T_PRIME_HASH_INPUT
+
+# --- 3. SEED-EXPANDED PUBLIC KEYS ---
+# Like real MAYO, a public key can be stored as a short seed and expanded with an XOF.
+# Every P_i and every E matrix is read from its own domain-separated SHAKE-128 stream,
+# so one P_i can be expanded on its own and the bulk expansion is just their concatenation.
+SEED_BYTES = 16
+_XOF_DOMAIN = b"MAYTHON-PK-v1"
+_LOW_NIBBLES = bytes(b & 0x0F for b in range(256))
+_HIGH_NIBBLES = bytes(b >> 4 for b in range(256))
+
+class SeededPublicKey:
+    """
+    Public key (P_coeffs, E_matrices) held as a 16-byte seed.
+
+    The same seed and parameters always expand to the same key. Matrices are only
+    expanded (and then cached) when P_coeffs / E_matrices are first accessed; P_bytes(i)
+    and expand_P_bytes() give the raw row-major element bytes without building lists.
+    """
+    def __init__(self, seed, M, N, K, field=None):
+        if isinstance(seed, str):
+            seed = bytes.fromhex(seed)
+        elif isinstance(seed, (bytes, bytearray, memoryview)):
+            seed = bytes(seed)
+        else:
+            # bytes(16) would silently be an all-zero seed
+            raise TypeError(f"seed must be bytes or a hex string, not {type(seed).__name__}")
+        if len(seed) != SEED_BYTES:
+            raise ValueError(f"seed must be {SEED_BYTES} bytes, got {len(seed)}")
+        self.seed = seed
+        self.M = M
+        self.N = N
+        self.K = K
+        self.field = field
+        self.order = field_order(field)
+        if 256 % self.order:
+            raise ValueError(f"seed expansion needs a field size dividing 256, got {self.order}")
+        self._P_coeffs = None
+        self._E_matrices = None
+
+    @classmethod
+    def generate(cls, M, N, K, field=None):
+        """Creates a key from a fresh random seed (drawn from `random`, so seedable)."""
+        return cls(random.randbytes(SEED_BYTES), M, N, K, field=field)
+
+    def _expand(self, label, index, count):
+        """Reads `count` field elements from the XOF stream (label, index)."""
+        header = len(self.seed).to_bytes(1, 'little') + self.seed + label + index.to_bytes(4, 'little')
+        xof = hashlib.shake_128(_XOF_DOMAIN + header)
+        if self.order == 16:
+            # Two GF(16) elements per byte, low nibble first
+            data = xof.digest((count + 1) // 2)
+            out = bytearray(2 * len(data))
+            out[0::2] = data.translate(_LOW_NIBBLES)
+            out[1::2] = data.translate(_HIGH_NIBBLES)
+            return bytes(out[:count])
+        data = xof.digest(count)
+        if self.order != 256:
+            data = data.translate(_reduction_table(self.order))
+        return data
+
+    def P_bytes(self, i):
+        """Row-major elements of P_i (N*N bytes), expanded on its own."""
+        if not 0 <= i < self.M:
+            raise IndexError(f"P index {i} out of range for M={self.M}")
+        return self._expand(b"P", i, self.N * self.N)
+
+    def expand_P_bytes(self):
+        """All P_i back to back, (M, N, N) row-major (M*N*N bytes)."""
+        return b"".join(self.P_bytes(i) for i in range(self.M))
+
+    def E_bytes(self, i, j):
+        """Row-major elements of the whipping matrix E_ij (M*M bytes)."""
+        pair = whipping_pairs(self.K).index((i, j))
+        return self._expand(b"E", pair, self.M * self.M)
+
+    def P_matrix(self, i):
+        """P_i as a nested list, expanded lazily without touching the other P_j."""
+        buf = self.P_bytes(i)
+        return [list(buf[r*self.N:(r+1)*self.N]) for r in range(self.N)]
+
+    @property
+    def P_coeffs(self):
+        if self._P_coeffs is None:
+            self._P_coeffs = [self.P_matrix(i) for i in range(self.M)]
+        return self._P_coeffs
+
+    @property
+    def E_matrices(self):
+        if self._E_matrices is None:
+            self._E_matrices = {}
+            for i, j in whipping_pairs(self.K):
+                buf = self.E_bytes(i, j)
+                self._E_matrices[f"{i},{j}"] = [list(buf[r*self.M:(r+1)*self.M]) for r in range(self.M)]
+        return self._E_matrices
+
+    @property
+    def key_id(self):
+        """Hex form of the seed; together with (M, N, K, field) it identifies the key."""
+        return self.seed.hex()
 
-    return P_coeffs, E_matrices, S_INPUT, T_PRIME_HASH_INPUT
\ No newline at end of file
+    def simulator(self, simulator_class=MAYO_Simulator):
+        """Builds a simulator for this key (expands it if needed)."""
+        return simulator_class.from_key(self)
\ No newline at end of file
@@ -0,0 +1,253 @@
+"""
+Monte Carlo false-acceptance / collision experiments.
+
+    python -m Implementation.mayo_experiments --M 2 --N 6 --K 2 --trials 10000000 --checkpoint run.json
+    python -m Implementation.mayo_experiments --checkpoint run.json --resume   # continue a stopped run
+
+A trial is a random (key, signature, target) triple, exactly what
+generate_mayo_test_parameters(M, N, K, force_valid=False) produces; it counts as a
+false acceptance when P*(s) == t. Trials run in batches: every batch draws one fresh
+seed-expanded key and batch_size signatures and targets as whole arrays, and evaluates
+them with one verify_batch call. Batch b always uses the random stream (seed, b), so
+results do not depend on the number of workers or on how often a run was resumed.
+
+Per batch it also counts the collisions P*(s) == P*(s') among the batch's signatures
+(same key) and how many of the M equations each trial matched. Counts are held in
+ExperimentCounts, which merge by addition and round-trip through JSON checkpoints.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .mayo_utils import FIELDS, field_order
+from .mayo_data_setup import SEED_BYTES, SeededPublicKey, generate_mayo_test_parameters
+from .mayo_primitives import MAYO_Simulator
+from .mayo_numpy import MAYO_NumpySimulator
+
+# --- 1. MERGEABLE COUNTS ---
+
+class ExperimentCounts:
+    """
+    Counters of one or more batches. Two counts of the same parameters merge by adding
+    every field, so batches can be counted in any order, in any process.
+    """
+    def __init__(self, M, trials=0, accepts=0, collisions=0, pairs=0, matches=None):
+        self.M = M
+        self.trials = trials
+        self.accepts = accepts
+        # Pairs of signatures (same key) with equal outputs, and pairs compared
+        self.collisions = collisions
+        self.pairs = pairs
+        # matches[e] = number of trials where exactly e of the M equations held
+        self.matches = list(matches) if matches is not None else [0] * (M + 1)
+
+    def merge(self, other):
+        if other.M != self.M:
+            raise ValueError(f"cannot merge counts for M={other.M} into M={self.M}")
+        self.trials += other.trials
+        self.accepts += other.accepts
+        self.collisions += other.collisions
+        self.pairs += other.pairs
+        self.matches = [a + b for a, b in zip(self.matches, other.matches)]
+        return self
+
+    def to_dict(self):
+        return {"M": self.M, "trials": self.trials, "accepts": self.accepts,
+                "collisions": self.collisions, "pairs": self.pairs, "matches": self.matches}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["M"], data["trials"], data["accepts"], data["collisions"], data["pairs"], data["matches"])
+
+    def rates(self, order):
+        """Observed rates next to what uniformly random outputs would give (order^-M)."""
+        expected = float(order) ** -self.M
+        return {
+            "false_acceptance": self.accepts / self.trials if self.trials else 0.0,
+            "collision": self.collisions / self.pairs if self.pairs else 0.0,
+            "expected": expected,
+            "mean_equations_matched": (sum(e * n for e, n in enumerate(self.matches)) / self.trials
+                                       if self.trials else 0.0),
+            "expected_equations_matched": self.M / order,
+        }
+
+
+# --- 2. BATCHES ---
+
+def batch_rng(seed, index):
+    """Independent generator for batch `index` of the run seeded with `seed`."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+
+def run_batch(M, N, K, field, batch_size, seed, index, simulator_class=MAYO_NumpySimulator):
+    """Runs one batch of trials and returns its ExperimentCounts."""
+    order = field_order(field)
+    rng = batch_rng(seed, index)
+    key = SeededPublicKey(rng.bytes(SEED_BYTES), M, N, K, field=field)
+    simulator = simulator_class.from_key(key)
+    signatures = rng.integers(0, order, size=(batch_size, N * K), dtype=np.uint8)
+    targets = rng.integers(0, order, size=(batch_size, M), dtype=np.uint8)
+
+    outputs, valid = simulator.verify_batch(signatures, targets)
+    outputs = np.asarray(outputs, dtype=np.uint8).reshape(batch_size, M)
+    matched = np.count_nonzero(outputs == targets, axis=1)
+    # Equal outputs are equal rows; count the pairs inside every group of equal rows
+    _, sizes = np.unique(outputs, axis=0, return_counts=True)
+    return ExperimentCounts(
+        M,
+        trials=batch_size,
+        accepts=int(np.count_nonzero(valid)),
+        collisions=int((sizes * (sizes - 1) // 2).sum()),
+        pairs=batch_size * (batch_size - 1) // 2,
+        matches=np.bincount(matched, minlength=M + 1).tolist(),
+    )
+
+def _run_batch_task(task):
+    return task[-2], run_batch(*task)
+
+
+# --- 3. RUNS WITH CHECKPOINTS ---
+
+class Experiment:
+    """
+    A run of `batches` batches of `batch_size` trials. Completed batch indices and the
+    merged counts are checkpointed to a JSON file (written atomically), and a run created
+    with Experiment.resume() skips the batches that file lists.
+    """
+    def __init__(self, M, N, K, field=None, batches=1, batch_size=4096, seed=0,
+                 checkpoint=None, simulator_class=MAYO_NumpySimulator):
+        self.M, self.N, self.K, self.field = M, N, K, field
+        self.batches = batches
+        self.batch_size = batch_size
+        self.seed = seed
+        self.checkpoint = checkpoint
+        self.simulator_class = simulator_class
+        self.counts = ExperimentCounts(M)
+        self.completed = set()
+
+    @property
+    def parameters(self):
+        return {"M": self.M, "N": self.N, "K": self.K, "field": self.field,
+                "batches": self.batches, "batch_size": self.batch_size, "seed": self.seed}
+
+    @classmethod
+    def resume(cls, checkpoint, simulator_class=MAYO_NumpySimulator):
+        with open(checkpoint) as f:
+            state = json.load(f)
+        experiment = cls(**state["parameters"], checkpoint=checkpoint, simulator_class=simulator_class)
+        experiment.counts = ExperimentCounts.from_dict(state["counts"])
+        experiment.completed = set(state["completed"])
+        return experiment
+
+    def save(self):
+        if self.checkpoint is None:
+            return
+        state = {"parameters": self.parameters, "counts": self.counts.to_dict(),
+                 "completed": sorted(self.completed)}
+        tmp = f"{self.checkpoint}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.checkpoint)
+
+    def _record(self, index, counts):
+        self.counts.merge(counts)
+        self.completed.add(index)
+
+    def run(self, workers=1, checkpoint_every=30.0, log=None):
+        """
+        Runs every batch not completed yet, on `workers` processes (1 = in this process),
+        saving a checkpoint at least every `checkpoint_every` seconds and at the end.
+        Returns the merged counts.
+        """
+        tasks = [(self.M, self.N, self.K, self.field, self.batch_size, self.seed, index, self.simulator_class)
+                 for index in range(self.batches) if index not in self.completed]
+        last_save = time.monotonic()
+
+        def progress(index, counts):
+            nonlocal last_save
+            self._record(index, counts)
+            if time.monotonic() - last_save >= checkpoint_every:
+                self.save()
+                last_save = time.monotonic()
+                if log:
+                    log(f"{len(self.completed)}/{self.batches} batches, {self.counts.trials} trials, "
+                        f"{self.counts.accepts} accepted")
+
+        try:
+            if workers <= 1:
+                for task in tasks:
+                    progress(*_run_batch_task(task))
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(_run_batch_task, task) for task in tasks]
+                    for future in as_completed(futures):
+                        progress(*future.result())
+        finally:
+            # Also on KeyboardInterrupt: every finished batch is kept for resume()
+            self.save()
+        return self.counts
+
+
+# --- 4. PER-CALL BASELINE ---
+
+def legacy_trial(M, N, K, field=None):
+    """One trial the way the GUI does it: generate_mayo_test_parameters + MAYO_Simulator."""
+    P_coeffs, E_matrices, s, t = generate_mayo_test_parameters(M, N, K, False, field=field)
+    return MAYO_Simulator(P_coeffs, E_matrices, M, N, K, field=field).P_star_eval(s, N * K) == t
+
+def compare_with_legacy(M, N, K, field=None, batch_size=4096, legacy_trials=200):
+    """Seconds per trial of the per-call path and of run_batch."""
+    start = time.perf_counter()
+    for _ in range(legacy_trials):
+        legacy_trial(M, N, K, field)
+    legacy = (time.perf_counter() - start) / legacy_trials
+    start = time.perf_counter()
+    run_batch(M, N, K, field, batch_size, 0, 0)
+    batched = (time.perf_counter() - start) / batch_size
+    return legacy, batched
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo false-acceptance experiments.")
+    parser.add_argument("--M", type=int, default=2)
+    parser.add_argument("--N", type=int, default=6)
+    parser.add_argument("--K", type=int, default=2)
+    parser.add_argument("--field", choices=list(FIELDS), default=None)
+    parser.add_argument("--trials", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--checkpoint", help="JSON file holding the partial results")
+    parser.add_argument("--resume", action="store_true", help="continue the run stored in --checkpoint")
+    parser.add_argument("--compare", action="store_true", help="time the per-call path against batches")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        legacy, batched = compare_with_legacy(args.M, args.N, args.K, args.field, args.batch_size)
+        print(f"per-call {legacy * 1e6:9.1f} us/trial | batched {batched * 1e6:7.2f} us/trial | "
+              f"{legacy / batched:6.1f}x")
+        return 0
+    if args.resume:
+        if not args.checkpoint:
+            parser.error("--resume needs --checkpoint")
+        experiment = Experiment.resume(args.checkpoint)
+    else:
+        batches = -(-args.trials // args.batch_size)
+        experiment = Experiment(args.M, args.N, args.K, args.field, batches, args.batch_size,
+                                args.seed, args.checkpoint)
+
+    start = time.perf_counter()
+    counts = experiment.run(args.workers, log=lambda line: print(line, file=sys.stderr))
+    elapsed = time.perf_counter() - start
+    report = {"parameters": experiment.parameters, "counts": counts.to_dict(),
+              "rates": counts.rates(field_order(experiment.field)), "seconds": elapsed}
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+import sys
+import time
+
+import numpy as np
+
+from .mayo_utils import GF16, whipping_pairs, triangular_size
+from .mayo_primitives import MAYO_Simulator
+from .mayo_numpy import BATCH_WORK_BYTES
+
+# --- 1. NIBBLE-PACKED M-VECTORS ---
+# As in the reference MAYO code, an "m-vector" (one GF(16) coefficient per equation) is
+# packed 16 elements per 64-bit limb: element e lives in bits 4*(e % 16) .. 4*(e % 16) + 3
+# of limb e // 16. One XOR on a limb adds 16 equations at once, and a multiplication by a
+# scalar is a handful of shifts and masks on the whole word (SWAR: SIMD within a register).
+ELEMENTS_PER_LIMB = 16
+MASK_MSB = np.uint64(0x8888888888888888)  # top bit of every nibble
+# Key rows gathered per _row_combinations chunk (bytes). Chunks that stay in cache were as
+# fast as one row at a time at MAYO_1 and up to 40x faster at the demo sizes.
+ROW_CHUNK_BYTES = 1024 * 1024
+
+def m_vector_limbs(M):
+    """Number of uint64 limbs needed to hold an m-vector of M GF(16) elements."""
+    return -(-M // ELEMENTS_PER_LIMB)
+
+def pack_m_vectors(values):
+    """Packs an array of shape (..., M) of GF(16) elements into (..., limbs) uint64 words."""
+    values = np.asarray(values, dtype=np.uint64)
+    if values.size and values.max() >= GF16.order:
+        raise ValueError("values outside GF(16)")
+    M = values.shape[-1]
+    L = m_vector_limbs(M)
+    padded = np.zeros(values.shape[:-1] + (L * ELEMENTS_PER_LIMB,), dtype=np.uint64)
+    padded[..., :M] = values
+    shifts = np.arange(ELEMENTS_PER_LIMB, dtype=np.uint64) * np.uint64(4)
+    nibbles = padded.reshape(values.shape[:-1] + (L, ELEMENTS_PER_LIMB)) << shifts
+    return np.bitwise_or.reduce(nibbles, axis=-1)
+
+def unpack_m_vectors(packed, M):
+    """Inverse of pack_m_vectors: (..., limbs) uint64 words back to (..., M) uint8 elements."""
+    packed = np.asarray(packed, dtype=np.uint64)
+    shifts = np.arange(ELEMENTS_PER_LIMB, dtype=np.uint64) * np.uint64(4)
+    nibbles = (packed[..., None] >> shifts) & np.uint64(0xF)
+    return nibbles.reshape(packed.shape[:-1] + (packed.shape[-1] * ELEMENTS_PER_LIMB,))[..., :M].astype(np.uint8)
+
+def gf16v_mul_by_x(a):
+    """Multiplies every nibble of the packed words by x, reducing with x^4 = x + 1."""
+    msb = a & MASK_MSB
+    a = a ^ msb
+    return (a << np.uint64(1)) ^ ((msb >> np.uint64(3)) * np.uint64(3))
+
+def gf16v_mul_u64(a, b):
+    """
+    Multiplies packed m-vectors a by GF(16) scalars b (broadcast against a), all 16
+    nibbles of a limb at once: r = XOR over the bits k of b of (x^k * a).
+    """
+    b = np.asarray(b, dtype=np.uint64)
+    result = a * (b & np.uint64(1))
+    for k in range(1, 4):
+        a = gf16v_mul_by_x(a)
+        result = result ^ (a * ((b >> np.uint64(k)) & np.uint64(1)))
+    return result
+
+# --- 2. PACKED SIMULATOR ---
+
+class MAYO_PackedSimulator(MAYO_Simulator):
+    """
+    GF(16) simulator on nibble-packed keys, in the style of the reference MAYO code.
+
+    The public key is stored column-wise as m-vectors: P_packed[a, b] holds the (a, b)
+    entry of every P_m, so each uint64 word carries 16 equations. Both contractions of
+    x^T * P_m * y scale packed words by signature scalars with the SWAR multiply and
+    add them with XOR. Results match MAYO_Simulator(..., field="gf16").
+    """
+    ACCEPTS_ARRAYS = True
+
+    def __init__(self, P_coeffs, E_matrices, M, N, K, field="gf16", layout="full"):
+        super().__init__(P_coeffs, E_matrices, M, N, K, field=field, layout=layout)
+
+    def _key_matrices(self):
+        """
+        P as an (M, N, N) uint8 array. With layout="upper" a packed buffer or (M, N(N+1)/2)
+        array is scattered into upper-triangular matrices, which define the same forms.
+        """
+        M, N = self.M, self.N
+        P = self.P_coeffs
+        if isinstance(P, (bytes, bytearray, memoryview)):
+            P = np.frombuffer(P, dtype=np.uint8)
+        P = np.asarray(P, dtype=np.uint8)
+        if self.layout == "upper" and P.size == M * triangular_size(N):
+            full = np.zeros((M, N, N), dtype=np.uint8)
+            rows, cols = np.triu_indices(N)
+            full[:, rows, cols] = P.reshape(M, -1)
+            return full
+        return P.reshape(M, N, N)
+
+    def _prepare_key(self):
+        if self.field is not GF16:
+            raise ValueError("MAYO_PackedSimulator only supports field='gf16'")
+        M, N = self.M, self.N
+        self.limbs = m_vector_limbs(M)
+        # (N, N, limbs): entry (a, b) packs P_0[a][b] .. P_{M-1}[a][b]
+        P = self._key_matrices()
+        self.P_packed = pack_m_vectors(P.transpose(1, 2, 0))
+        P_sym = P ^ P.transpose(0, 2, 1)
+        self.P_sym_packed = pack_m_vectors(P_sym.transpose(1, 2, 0))
+        # E matrices as packed columns: (pairs, M, limbs), E * t = XOR_c t_c * column_c
+        self.E_pairs = whipping_pairs(self.K)
+        E = np.stack([np.asarray(self.E_matrices[f"{i},{j}"], dtype=np.uint8) for i, j in self.E_pairs])
+        self.E_packed = pack_m_vectors(E.transpose(0, 2, 1))
+        self._E_index = {f"{i},{j}": p for p, (i, j) in enumerate(self.E_pairs)}
+        self._pair_i = np.array([i - 1 for i, _ in self.E_pairs])
+        self._pair_j = np.array([j - 1 for _, j in self.E_pairs])
+        self._pair_diag = self._pair_i[self._pair_i == self._pair_j]
+
+    def _as_vector(self, x):
+        x = np.asarray(x, dtype=np.uint8)
+        if x.size and x.max() >= GF16.order:
+            raise ValueError("values outside GF(16)")
+        return x
+
+    def _row_combinations(self, packed, X):
+        """
+        x^T * P_m for every m and every row x of X (shape (C, N)), returned packed as
+        (C, N, limbs): entry b holds the m-vector (x^T P_m)[b].
+
+        Like the reference implementation, rows of the key are first accumulated into
+        one bin per scalar value (rows a with x_a = v go to bin v, a plain XOR), so
+        only one SWAR multiply per distinct value is needed instead of one per row.
+        The bins of a whole chunk of rows of X are formed by one reduceat over the
+        concatenated sorted rows, and each row's scaled bins by a second one.
+        """
+        C, N = X.shape
+        out = np.empty((C,) + packed.shape[1:], dtype=np.uint64)
+        chunk = max(1, ROW_CHUNK_BYTES // packed.nbytes)
+        for start in range(0, C, chunk):
+            X_chunk = X[start:start + chunk]
+            order = np.argsort(X_chunk, axis=1, kind='stable')
+            xs = np.take_along_axis(X_chunk, order, axis=1)
+            # A bin starts at the first sorted entry of a row and wherever the value changes
+            new_bin = np.ones(xs.shape, dtype=bool)
+            new_bin[:, 1:] = xs[:, 1:] != xs[:, :-1]
+            starts = np.flatnonzero(new_bin)
+            bins = np.bitwise_xor.reduceat(packed[order.ravel()], starts, axis=0)
+            scaled = gf16v_mul_u64(bins, xs.ravel()[starts, None, None])
+            out[start:start + chunk] = np.bitwise_xor.reduceat(scaled, np.flatnonzero(starts % N == 0), axis=0)
+        return out
+
+    def _contract(self, V, y):
+        """Given packed V = x^T * P_m (shape (..., N, limbs)), returns x^T * P_m * y packed."""
+        return np.bitwise_xor.reduce(gf16v_mul_u64(V, y[..., None]), axis=-2)
+
+    def _output(self, packed):
+        return unpack_m_vectors(packed, self.M).astype(np.int64)
+
+    def P_eval(self, x):
+        """Calculates P(x) = x^T * P_i * x for all P_i, 16 equations per word"""
+        x = self._as_vector(x)
+        V = self._row_combinations(self.P_packed, x[None])[0]
+        return self._output(self._contract(V, x)).tolist()
+
+    def P_prime(self, x, y):
+        """Calculates P'(x, y) = x^T * (P_i + P_i^T) * y for all P_i, 16 equations per word"""
+        x, y = self._as_vector(x), self._as_vector(y)
+        V = self._row_combinations(self.P_sym_packed, x[None])[0]
+        return self._output(self._contract(V, y)).tolist()
+
+    def _block_terms(self, s_blocks, progress=None):
+        """Block outputs and cross terms for P_star_trace, reusing the packed s_i^T * P_m rows."""
+        X = self._as_vector(s_blocks)
+        V = self._row_combinations(self.P_packed, X)
+        # All blocks are combined in one pass; report them together
+        if progress is not None:
+            for _ in range(self.K):
+                progress()
+        block_outputs = [self._output(self._contract(V[i], x)).tolist() for i, x in enumerate(X)]
+        cross_terms = {
+            (i, j): self._output(self._contract(V[i-1], X[j-1]) ^ self._contract(V[j-1], X[i-1])).tolist()
+            for i, j in self.E_pairs if i != j
+        }
+        return block_outputs, cross_terms
+
+    def _whip(self, key, term):
+        # E * t = XOR_c t_c * (packed column c of E)
+        return self._output(self._contract(self.E_packed[self._E_index[key]], self._as_vector(term))).tolist()
+
+    def _P_star_packed(self, S):
+        """P*(s) for a chunk of signatures S (shape (B, N*K)), as packed m-vectors (B, limbs)."""
+        B = S.shape[0]
+        blocks = S.reshape(B, self.K, self.N)
+        V = self._row_combinations(self.P_packed, blocks.reshape(B * self.K, self.N))
+        V = V.reshape(B, self.K, 1, self.N, self.limbs)
+        # forms[b, i, j] = s_i^T * P_m * s_j for every m, packed: (B, K, K, limbs)
+        forms = np.bitwise_xor.reduce(gf16v_mul_u64(V, blocks[:, None, :, :, None]), axis=3)
+
+        # P(s_i) on the diagonal pairs, P'(s_i, s_j) = forms[i, j] + forms[j, i] on the others
+        terms = forms[:, self._pair_i, self._pair_j] ^ forms[:, self._pair_j, self._pair_i]
+        terms[:, self._pair_i == self._pair_j] = forms[:, self._pair_diag, self._pair_diag]
+
+        # E_ij * term for every pair at once: scale each packed column of E_ij by one element
+        t = unpack_m_vectors(terms, self.M)                                  # (B, pairs, M)
+        scaled = gf16v_mul_u64(self.E_packed[None], t[..., None])            # (B, pairs, M, limbs)
+        return np.bitwise_xor.reduce(scaled.reshape(B, -1, self.limbs), axis=1)
+
+    def _batch_chunk_size(self):
+        """Signatures per chunk so the (K, K, N, limbs) contraction intermediate stays bounded."""
+        per_signature = self.K * self.K * self.N * self.limbs * 8
+        return max(1, BATCH_WORK_BYTES // per_signature)
+
+    def P_star_eval(self, s, sig_len):
+        """
+        Calculates the Whipped Map over GF(16) on packed m-vectors:
+        P*(s) = SUM(E_ii * P(s_i)) + SUM(E_ij * P'(s_i, s_j))
+        """
+        S = self._as_vector(s)[:self.N * self.K].reshape(1, -1)
+        return self._output(self._P_star_packed(S)[0]).tolist()
+
+    def P_star_eval_batch(self, signatures):
+        """P*(s) for every row of a (B, N*K) signature matrix; returns a (B, M) int64 array."""
+        S = self._as_vector(signatures).reshape(-1, self.N * self.K)
+        if S.shape[0] == 0:
+            return np.zeros((0, self.M), dtype=np.int64)
+        packed = np.empty((S.shape[0], self.limbs), dtype=np.uint64)
+        chunk = self._batch_chunk_size()
+        for start in range(0, S.shape[0], chunk):
+            packed[start:start + chunk] = self._P_star_packed(S[start:start + chunk])
+        return self._output(packed)
+
+    def verify_batch(self, signatures, targets):
+        """
+        Verifies B signatures against B targets under this public key.
+        Returns the (B, M) outputs and a boolean validity vector of length B.
+        """
+        outputs = self.P_star_eval_batch(signatures)
+        targets = self._as_vector(targets).astype(np.int64).reshape(outputs.shape)
+        return outputs, np.all(outputs == targets, axis=1)
+
+    @property
+    def key_nbytes(self):
+        """Bytes held by the packed public key (P, its symmetrized form and E)."""
+        return self.P_packed.nbytes + self.P_sym_packed.nbytes + self.E_packed.nbytes
+
+
+# --- 3. FOOTPRINT / SPEED COMPARISON ---
+
+def nested_list_bytes(obj):
+    """
+    Memory held by a nested list/dict structure of small ints. Small ints are cached by
+    CPython, so each element costs only its 8-byte slot in the containing list.
+    """
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(nested_list_bytes(v) for v in obj.values())
+    if isinstance(obj, list):
+        return sys.getsizeof(obj) + sum(nested_list_bytes(v) for v in obj if isinstance(v, (list, dict)))
+    return 0
+
+def compare_packed_path(M, N, K, signatures=20):
+    """
+    Compares the list-based GF(16) simulator with the packed one on a random key.
+    Returns a dict with key sizes (bytes) and per-signature P*(s) times (seconds).
+    """
+    # Imported here: mayo_data_setup pulls in the simulators it generates keys for
+    from .mayo_data_setup import generate_mayo_test_parameters
+
+    P_coeffs, E_matrices, S_INPUT, T = generate_mayo_test_parameters(M, N, K, True, field="gf16")
+    list_sim = MAYO_Simulator(P_coeffs, E_matrices, M, N, K, field="gf16")
+    packed_sim = MAYO_PackedSimulator(P_coeffs, E_matrices, M, N, K)
+    if packed_sim.P_star_eval(S_INPUT, N * K) != T:
+        raise AssertionError("packed path disagrees with the list-based path")
+
+    rng = np.random.default_rng()
+    sigs = rng.integers(0, 16, size=(signatures, N * K)).tolist()
+    timings = {}
+    for name, sim in (("list", list_sim), ("packed", packed_sim)):
+        start = time.perf_counter()
+        for s in sigs:
+            sim.P_star_eval(s, N * K)
+        timings[name] = (time.perf_counter() - start) / signatures
+
+    return {
+        "M": M, "N": N, "K": K,
+        "list_key_bytes": nested_list_bytes(P_coeffs) + nested_list_bytes(E_matrices),
+        "packed_key_bytes": packed_sim.key_nbytes,
+        "list_seconds_per_signature": timings["list"],
+        "packed_seconds_per_signature": timings["packed"],
+    }
+
+if __name__ == '__main__':
+    for M, N, K in [(4, 6, 2), (32, 40, 4), (78, 86, 10)]:
+        r = compare_packed_path(M, N, K, signatures=5)
+        print(f"M={M:3d} N={N:3d} K={K:2d} | key: list {r['list_key_bytes']:>10,d} B, "
+              f"packed {r['packed_key_bytes']:>9,d} B | P*(s): list {r['list_seconds_per_signature']*1e3:8.2f} ms, "
+              f"packed {r['packed_seconds_per_signature']*1e3:8.2f} ms")
@@ -1,11 +1,20 @@
 import tkinter as tk
-from tkinter import font, messagebox
+from tkinter import font, messagebox, ttk
+import queue
 import random
+import threading
 
 # Import core components from other modules
-from mayo_utils import Q, array_to_string
-from mayo_primitives import MAYO_Simulator
-from mayo_data_setup import DEFAULT_M, DEFAULT_N, DEFAULT_K, generate_mayo_test_parameters
+from .mayo_utils import Q, array_to_string, whipping_pairs
+from .mayo_primitives import TRACE_STAGES
+from .mayo_data_setup import DEFAULT_M, DEFAULT_N, DEFAULT_K, generate_mayo_test_parameters
+
+STEP_DELAY_MS = 1500 # Pause between displayed steps (skipped in fast mode)
+POLL_MS = 50 # How often the Tk loop checks the worker queue
+DISPLAY_STEPS = 5 # Number of step methods rendered per run
+
+class SimulationCancelled(Exception):
+    """Raised inside the worker thread to abandon a run the user cancelled."""
 
 class MayoGuiApp:
     def __init__(self, master):
@@ -24,8 +33,15 @@ class MayoGuiApp:
         self.N_var = tk.StringVar(value=str(DEFAULT_N))
         self.K_var = tk.StringVar(value=str(DEFAULT_K))
         self.force_valid_var = tk.BooleanVar(value=True) 
-
-        self.simulator = None
+        self.fast_mode_var = tk.BooleanVar(value=False)
+
+        # Background run state: each run gets its own queue and cancel event
+        self.M = self.N = self.K = None
+        self.trace = None
+        self.run_id = 0
+        self.worker_queue = None
+        self.cancel_event = None
+        self.work_steps = len(TRACE_STAGES)
         self.S_INPUT = []
         self.T_PRIME_HASH_INPUT = []
         self.step_counter = 0
@@ -51,7 +67,7 @@ class MayoGuiApp:
         tk.Label(param_frame, text="N (Block Size):", bg='#eef2f6', font=self.medium_font).grid(row=1, column=0, padx=5, pady=5, sticky='e')
         tk.Entry(param_frame, textvariable=self.N_var, width=5, font=self.medium_font).grid(row=1, column=1, padx=5, pady=5)
 
-        tk.Label(param_frame, text="K (Number of Blocks - Max 2 in this Sim):", bg='#eef2f6', font=self.medium_font).grid(row=2, column=0, padx=5, pady=5, sticky='e')
+        tk.Label(param_frame, text="K (Number of Blocks):", bg='#eef2f6', font=self.medium_font).grid(row=2, column=0, padx=5, pady=5, sticky='e')
         tk.Entry(param_frame, textvariable=self.K_var, width=5, font=self.medium_font).grid(row=2, column=1, padx=5, pady=5)
         
         tk.Label(param_frame, text=f"Q (Field Size): {Q}", bg='#eef2f6', font=self.medium_font, fg='#4b5563').grid(row=0, column=2, padx=15, pady=5, sticky='w', rowspan=3)
@@ -74,9 +90,26 @@ class MayoGuiApp:
             selectcolor='#eef2f6'
         ).pack(side=tk.LEFT, padx=10)
 
+        tk.Checkbutton(
+            controls_frame,
+            text="Fast Mode (No Step Delays)",
+            variable=self.fast_mode_var,
+            font=self.medium_font,
+            bg='#f7f9fb',
+            fg='#1f2937',
+            selectcolor='#eef2f6'
+        ).pack(side=tk.LEFT, padx=10)
+
+        self.cancel_button = tk.Button(controls_frame, text="Cancel", command=self.cancel_simulation, font=self.medium_font, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT, padx=5)
+
         self.run_button = tk.Button(controls_frame, text="Run Verification", command=self.start_simulation, font=self.big_font, bg='#2563eb', fg='white', relief='raised', padx=20, pady=10, activebackground='#3b82f6')
         self.run_button.pack(side=tk.RIGHT, padx=10)
 
+        # --- Progress (key generation and evaluation work, then displayed steps; sized per run) ---
+        self.progress = ttk.Progressbar(self.master, mode='determinate', maximum=len(TRACE_STAGES) + DISPLAY_STEPS, length=400)
+        self.progress.pack(pady=5)
+
 
         # --- Result Card (Hidden initially) ---
         self.result_frame = tk.Frame(self.master, bg='#ffffff', bd=2, relief='flat', padx=20, pady=10, highlightbackground="#cccccc", highlightthickness=1)
@@ -102,7 +135,7 @@ class MayoGuiApp:
         # Use small bounds to keep simulation fast and output readable
         self.M_var.set(str(random.randint(3, 8)))
         self.N_var.set(str(random.randint(5, 12)))
-        self.K_var.set(str(2)) # Keep K=2 for the current P* map simulation
+        self.K_var.set(str(random.randint(2, 4)))
 
     def validate_and_get_params(self):
         """Reads and validates user input parameters."""
@@ -113,9 +146,6 @@ class MayoGuiApp:
             
             if M < 2 or N < 2 or K < 2:
                 raise ValueError("M, N, and K must be integers greater than 1.")
-            if K > 2:
-                # The simulator logic for E_matrices is simplified for K=2 in mayo_primitives
-                raise ValueError("This simulator currently only supports K=2 blocks.")
 
             return M, N, K
         except ValueError as e:
@@ -167,14 +197,19 @@ class MayoGuiApp:
         self.master.update_idletasks()
 
     def start_simulation(self):
-        """Initializes and starts the step-by-step simulation with current parameters."""
+        """Starts a run: key generation and P*(s) run on a worker thread, the steps render here."""
         params = self.validate_and_get_params()
         if not params:
             return
 
-        M, N, K = params
+        self.M, self.N, self.K = params
         
         self.run_button.config(state=tk.DISABLED, text="Generating New Parameters...")
+        self.cancel_button.config(state=tk.NORMAL)
+        # One step per generated P_i and per signature block (the slow parts), one per stage
+        self.work_steps = self.M + self.K + len(TRACE_STAGES)
+        self.progress.config(maximum=self.work_steps + DISPLAY_STEPS)
+        self.progress['value'] = 0
         
         # Clear log and hide results
         self.steps_text.config(state=tk.NORMAL)
@@ -182,19 +217,103 @@ class MayoGuiApp:
         self.steps_text.config(state=tk.DISABLED)
         self.result_frame.pack_forget()
         self.step_counter = 0
-        
-        # --- NEW RANDOMIZATION ---
-        force_valid = self.force_valid_var.get()
-        P_coeffs, E_matrices, self.S_INPUT, self.T_PRIME_HASH_INPUT = generate_mayo_test_parameters(
-            M, N, K, force_valid
+
+        # A new run id makes callbacks still queued for an older (cancelled) run no-ops
+        self.run_id += 1
+        self.worker_queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        worker = threading.Thread(
+            target=self.simulation_worker,
+            args=(self.M, self.N, self.K, self.force_valid_var.get(), self.cancel_event, self.worker_queue),
+            daemon=True,
         )
-        self.simulator = MAYO_Simulator(P_coeffs, E_matrices, M, N, K)
-        SIG_LENGTH = N * K
-        # --- END NEW RANDOMIZATION ---
+        worker.start()
+        self.master.after(POLL_MS, self.poll_worker, self.run_id)
+
+    @staticmethod
+    def simulation_worker(M, N, K, force_valid, cancel_event, results):
+        """
+        Worker thread: generates the parameters and evaluates P*(s) once with a trace.
+        Never touches Tk; everything is reported through the `results` queue.
+        """
+        def on_stage(stage, value):
+            if cancel_event.is_set():
+                raise SimulationCancelled()
+            results.put(("stage", stage))
+
+        def on_progress():
+            # Called per P_i and per block, so a cancel lands within one unit of work
+            if cancel_event.is_set():
+                raise SimulationCancelled()
+            results.put(("progress",))
+
+        try:
+            _, _, S_INPUT, T_PRIME_HASH_INPUT, trace = generate_mayo_test_parameters(
+                M, N, K, force_valid, return_trace=True, hook=on_stage, progress=on_progress
+            )
+        except SimulationCancelled:
+            results.put(("cancelled",))
+        except Exception as e:
+            results.put(("error", str(e)))
+        else:
+            results.put(("done", S_INPUT, T_PRIME_HASH_INPUT, trace))
 
-        self.run_button.config(text="Running...")
-        # Start the sequence of steps
-        self.master.after(500, self.step1_setup, M, N, K, SIG_LENGTH)
+    def poll_worker(self, run_id):
+        """Drains the worker queue from the Tk loop; reschedules itself until the run ends."""
+        if run_id != self.run_id:
+            return
+        try:
+            while True:
+                message = self.worker_queue.get_nowait()
+                kind = message[0]
+                if kind == "progress":
+                    self.progress.step(1)
+                elif kind == "stage":
+                    self.run_button.config(text=f"Evaluating: {message[1]}...")
+                    self.progress.step(1)
+                elif kind == "done":
+                    _, self.S_INPUT, self.T_PRIME_HASH_INPUT, self.trace = message
+                    self.progress['value'] = self.work_steps
+                    self.run_button.config(text="Running...")
+                    self.progress.step(1)
+                    self.step1_setup(self.M, self.N, self.K, self.N * self.K)
+                    return
+                elif kind == "error":
+                    messagebox.showerror("Simulation Failed", message[1])
+                    self.finish_run()
+                    return
+                elif kind == "cancelled":
+                    return
+        except queue.Empty:
+            pass
+        self.master.after(POLL_MS, self.poll_worker, run_id)
+
+    def schedule_step(self, step, *args):
+        """Runs the next step after the step delay (immediately in fast mode), unless the run was cancelled."""
+        run_id = self.run_id
+        delay = 0 if self.fast_mode_var.get() else STEP_DELAY_MS
+
+        def run_step():
+            if run_id == self.run_id:
+                # The final step fills the bar itself: a ttk bar stepped onto its maximum
+                # wraps back to empty
+                if step != self.step5_compare:
+                    self.progress.step(1)
+                step(*args)
+
+        self.master.after(delay, run_step)
+
+    def cancel_simulation(self):
+        """Abandons the current run: the worker stops at its next P_i, block or stage and pending steps are dropped."""
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        self.run_id += 1
+        self.append_step("Run Cancelled", "The verification run was cancelled by the user.", is_success=False)
+        self.finish_run()
+
+    def finish_run(self):
+        self.cancel_button.config(state=tk.DISABLED)
+        self.run_button.config(state=tk.NORMAL, text="Run Verification")
 
     def step1_setup(self, M, N, K, SIG_LENGTH):
         self.step_counter = 1
@@ -202,8 +321,9 @@ class MayoGuiApp:
         s_str = array_to_string(self.S_INPUT)
         t_str = array_to_string(self.T_PRIME_HASH_INPUT)
         
-        s1_len = len(self.S_INPUT[:N])
-        s2_len = len(self.S_INPUT[N:])
+        block_lines = "\n".join(
+            f"    Block s{i+1} (Size N): {len(self.S_INPUT[i*N:(i+1)*N])} bytes" for i in range(K)
+        )
         
         character_action = "👤 Alice (The Signer) sends Bob the Public Key (P, E matrices), the Signature (s), and the Target Hash (t')."
         
@@ -218,52 +338,43 @@ Target Hash (t'): {t_str}
     Output Dimension: {M} bytes
 
 Signature is split into K={K} blocks:
-    Block s1 (Size N): {s1_len} bytes
-    Block s2 (Size N): {s2_len} bytes
+{block_lines}
 """
         self.append_step(title, content, character_action, is_running=True)
-        self.master.after(1500, self.step2_peval)
+        self.schedule_step(self.step2_peval)
 
     def step2_peval(self):
         self.step_counter = 2
         title = 'Evaluate Base Map P(x)'
+        K = self.K
+        block_names = ", ".join(f"P(s{i+1})" for i in range(K))
         
-        character_action = "🧑‍💻 Bob (The Verifier) begins calculating the quadratic parts of the verification map using the P matrices: P(s1) and P(s2)."
+        character_action = f"🧑‍💻 Bob (The Verifier) begins calculating the quadratic parts of the verification map using the P matrices: {block_names}."
         
         self.append_step(title, "Calculating the quadratic map output for each signature block. This uses the core quadratic form: P(x)i = x^T * Pi * x (mod Q).", character_action, is_running=True)
         
-        # Perform calculations
-        N = self.simulator.N
-        self.p_s1 = self.simulator.P_eval(self.S_INPUT[:N])
-        self.p_s2 = self.simulator.P_eval(self.S_INPUT[N:])
-        
-        content = f"""
-Result for Block 1 (Size M={self.simulator.M}):
-P(s1): {array_to_string(self.p_s1)}
-
-Result for Block 2 (Size M={self.simulator.M}):
-P(s2): {array_to_string(self.p_s2)}
-"""
+        content = "".join(f"""
+Result for Block {i+1} (Size M={self.M}):
+P(s{i+1}): {array_to_string(p_si)}
+""" for i, p_si in enumerate(self.trace["block_outputs"]))
         self.append_step(f'{title} (Results)', content, is_success=True)
-        self.master.after(1500, self.step3_pprime)
+        self.schedule_step(self.step3_pprime)
 
     def step3_pprime(self):
         self.step_counter = 3
-        title = "Calculate Differential Map P'(s1, s2)"
-        
-        character_action = "🧑‍💻 Bob calculates the bilinear cross-term between the signature blocks (s1 and s2)."
+        K = self.K
+        cross_pairs = [(i, j) for i, j in whipping_pairs(K) if i != j]
+        title = "Calculate Differential Map P'(si, sj)"
         
-        self.append_step(title, "Formula: P'(s1, s2) = P(s1+s2) - P(s1) - P(s2) (mod Q).", character_action, is_running=True)
+        character_action = f"🧑‍💻 Bob calculates the bilinear cross-terms between every pair of signature blocks ({len(cross_pairs)} pairs)."
         
-        # Perform calculation
-        N = self.simulator.N
-        self.p_prime_s1s2 = self.simulator.P_prime(self.S_INPUT[:N], self.S_INPUT[N:])
+        self.append_step(title, "Formula: P'(si, sj) = P(si+sj) - P(si) - P(sj) (mod Q).", character_action, is_running=True)
         
-        content = f"""
-P'(s1, s2) (Size M={self.simulator.M}): {array_to_string(self.p_prime_s1s2)}
-"""
+        content = "".join(f"""
+P'(s{i}, s{j}) (Size M={self.M}): {array_to_string(p_prime)}
+""" for (i, j), p_prime in self.trace["cross_terms"].items())
         self.append_step(f'{title} (Results)', content, is_success=True)
-        self.master.after(1500, self.step4_pstar)
+        self.schedule_step(self.step4_pstar)
 
     def step4_pstar(self):
         self.step_counter = 4
@@ -271,36 +382,26 @@ P'(s1, s2) (Size M={self.simulator.M}): {array_to_string(self.p_prime_s1s2)}
         
         character_action = "🧑‍💻 Bob applies the E (whipping) matrices to the calculated terms to produce his verification hash (T)."
         
-        self.append_step(title, "Formula: T = E11*P(s1) + E22*P(s2) + E12*P'(s1, s2) (mod Q).", character_action, is_running=True)
+        self.append_step(title, "Formula: T = SUM(Eii*P(si)) + SUM(Eij*P'(si, sj)) (mod Q).", character_action, is_running=True)
         
-        # Recalculate terms (for display detail)
-        # Note: P*(s) is recalculated fully inside P_star_eval, but we use the stored P(s) and P'(s) terms for the step output.
-        self.T_CALCULATED = self.simulator.P_star_eval(self.S_INPUT, self.simulator.N * self.simulator.K)
+        # The whipped terms and T were computed in the same pass as the steps above
+        self.T_CALCULATED = self.trace["T"]
         
-        # To show the intermediate steps, we manually calculate the terms again (redundant but illustrative)
-        E11 = self.simulator.E_matrices["1,1"]
-        E22 = self.simulator.E_matrices["2,2"]
-        E12 = self.simulator.E_matrices["1,2"]
-        M = self.simulator.M
-        
-        # We assume the simulator has access to the utility functions via imports in mayo_primitives
-        # but since we are in the main GUI file, we use the explicit imports
-        from mayo_utils import dot_product, vector_mod_q 
-        
-        term_A = vector_mod_q(dot_product(E11, self.p_s1))
-        term_B = vector_mod_q(dot_product(E22, self.p_s2))
-        term_C = vector_mod_q(dot_product(E12, self.p_prime_s1s2))
-
+        term_lines = []
+        for (i, j), term in self.trace["whipped_terms"].items():
+            if i == j:
+                term_lines.append(f"Term E{i}{j} * P(s{i}): {array_to_string(term)}")
+            else:
+                term_lines.append(f"Term E{i}{j} * P'(s{i}, s{j}): {array_to_string(term)}")
+        terms_str = "\n".join(term_lines)
 
         content = f"""
-Term A (E11 * P(s1)): {array_to_string(term_A)}
-Term B (E22 * P(s2)): {array_to_string(term_B)}
-Term C (E12 * P'(s1, s2)): {array_to_string(term_C)}
+{terms_str}
 
 Calculated Output T = P*(s): {array_to_string(self.T_CALCULATED)}
 """
         self.append_step(f'{title} (Results)', content, is_success=True)
-        self.master.after(1500, self.step5_compare)
+        self.schedule_step(self.step5_compare)
 
     def step5_compare(self):
         self.step_counter = 5
@@ -336,8 +437,9 @@ Target Hash T' (Hash of message): {array_to_string(self.T_PRIME_HASH_INPUT)}
         # Append step, using the is_valid result to color the step title itself
         self.append_step(f'{title} (Results)', content, character_action, is_success=is_valid)
         
+        self.progress['value'] = self.progress['maximum']
         # Final button state
-        self.run_button.config(state=tk.NORMAL, text="Run Verification")
+        self.finish_run()
 
 # The code below is required for the application to run when the Python file is executed.
 if __name__ == '__main__':
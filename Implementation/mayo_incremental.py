@@ -0,0 +1,223 @@
+from .mayo_utils import Q, vector_mod_q, whipping_pairs, unpack_upper_triangular
+
+# --- 1. KEY COLUMNS ---
+# A point update s_j[a] += d changes every quantity that depends on block j by a multiple
+# of column a of the symmetrized forms P_m + P_m^T. Those columns are stored once per key,
+# flattened over equations: col[a][m*N + r] = (P_m + P_m^T)[r][a].
+
+def _key_matrices(simulator):
+    """The simulator's P_m as nested lists of ints, whatever layout or container holds them."""
+    M, N = simulator.M, simulator.N
+    P = simulator.P_coeffs
+    if hasattr(P, "tolist"):
+        # NumPy arrays and memoryviews
+        P = P.tolist()
+    if isinstance(P, (bytes, bytearray)) or not isinstance(P[0], list):
+        # A flat packed buffer (mayo_utils.pack_upper_triangular)
+        return unpack_upper_triangular(bytes(P), M, N)
+    if len(P[0]) != N:
+        # Packed triangles, one row of N(N+1)/2 entries per equation
+        return unpack_upper_triangular(bytes(v for row in P for v in row), M, N)
+    return P
+
+def key_columns(simulator):
+    """
+    (columns, diagonal) for a simulator's key: columns[a] holds column a of every
+    P_m + P_m^T (length M*N, equation-major) and diagonal[a] holds P_m[a][a] for every m.
+    Bytes over a field, lists of ints mod Q over the ring.
+    """
+    F = simulator.field
+    P = _key_matrices(simulator)
+    N = simulator.N
+    columns, diagonal = [], []
+    for a in range(N):
+        if F is None:
+            columns.append([(P_m[r][a] + P_m[a][r]) % Q for P_m in P for r in range(N)])
+            diagonal.append([P_m[a][a] % Q for P_m in P])
+        else:
+            columns.append(bytes(P_m[r][a] ^ P_m[a][r] for P_m in P for r in range(N)))
+            diagonal.append(bytes(P_m[a][a] for P_m in P))
+    return columns, diagonal
+
+
+# --- 2. INCREMENTAL EVALUATOR ---
+
+class IncrementalEvaluator:
+    """
+    Keeps P*(s) up to date while single coordinates of s change.
+
+    Cached per block j: V_j = (P_m + P_m^T) * s_j for every equation (M*N values), plus
+    the block outputs P(s_j), the cross terms P'(s_i, s_j) and the whipped terms of a
+    MAYO_Simulator.P_star_trace. Setting s_j[a] to s_j[a] + d then costs O(M*N + K*M):
+        P(s_j)        += d * V_j[a] + d^2 * P[a][a]
+        P'(s_i, s_j)  += d * V_i[a]                  (for every other block i)
+        V_j           += d * column a of P + P^T
+    The changed terms are only whipped (O(M^2) per changed pair) when the output is read,
+    so a run of updates to one block pays for whipping once.
+
+        evaluator = IncrementalEvaluator(simulator, s)
+        T = evaluator.update(5, 0x3a)       # s[5] = 0x3a, returns the new P*(s)
+    """
+    def __init__(self, simulator, s, columns=None):
+        self.simulator = simulator
+        self.field = simulator.field
+        self.M, self.N, self.K = simulator.M, simulator.N, simulator.K
+        self.pairs = whipping_pairs(self.K)
+        # Key columns may be shared between evaluators of the same key (see key_columns)
+        self.columns, self.diagonal = key_columns(simulator) if columns is None else columns
+
+        sig_len = self.N * self.K
+        if len(s) < sig_len:
+            raise ValueError(f"signature has {len(s)} elements, expected {sig_len}")
+        trace = simulator.P_star_trace(list(s[:sig_len]), sig_len)
+        self.s = [self._element(v) for v in s[:sig_len]]
+        self.block_outputs = [self._vector(v) for v in trace["block_outputs"]]
+        self.cross_terms = {pair: self._vector(v) for pair, v in trace["cross_terms"].items()}
+        self.whipped_terms = {pair: self._vector(v) for pair, v in trace["whipped_terms"].items()}
+        self.T = self._vector(trace["T"])
+        # V_j, built column by column from the cached key columns
+        self.V = []
+        for j in range(self.K):
+            V_j = self._zeros(self.M * self.N)
+            for a, v in enumerate(self.s[j * self.N:(j + 1) * self.N]):
+                if v:
+                    V_j = self._axpy(V_j, v, self.columns[a])
+            self.V.append(V_j)
+        # Unwhipped changes per pair since the output was last read
+        self._pending = {}
+
+    # Vector arithmetic: bytes and XOR over a field, lists mod Q over the ring
+
+    def _element(self, v):
+        if self.field is None:
+            return int(v) % Q
+        v = int(v)
+        if not 0 <= v < self.field.order:
+            raise ValueError(f"value {v} outside GF({self.field.order})")
+        return v
+
+    def _vector(self, v):
+        return vector_mod_q(v) if self.field is None else bytes(v)
+
+    def _zeros(self, n):
+        return [0] * n if self.field is None else bytes(n)
+
+    def _axpy(self, y, c, x):
+        """y + c * x."""
+        if self.field is None:
+            return [(y_r + c * x_r) % Q for y_r, x_r in zip(y, x)]
+        return self.field.add_rows(y, self.field.scale(x, c))
+
+    def _add(self, a, b):
+        if self.field is None:
+            return [(x + y) % Q for x, y in zip(a, b)]
+        return self.field.add_rows(a, b)
+
+    def _output(self, v):
+        return list(v)
+
+    # Updates
+
+    def set(self, index, value):
+        """Sets s[index] = value without whipping; the output is brought up to date on read."""
+        if not 0 <= index < len(self.s):
+            raise IndexError(f"signature index {index} out of range")
+        value = self._element(value)
+        old = self.s[index]
+        if value == old:
+            return
+        j, a = divmod(index, self.N)
+        N = self.N
+        if self.field is None:
+            d = (value - old) % Q
+            d2 = d * d
+        else:
+            d = value ^ old
+            d2 = self.field.mul(d, d)
+
+        # P(s_j) += d * (P_sym s_j)[a] + d^2 * P[a][a], with V_j read before it changes
+        delta = self._axpy(self._axpy(self._zeros(self.M), d, self.V[j][a::N]), d2, self.diagonal[a])
+        self._change((j + 1, j + 1), delta)
+        # P'(s_i, s_j) += d * (P_sym s_i)[a]
+        for i in range(self.K):
+            if i != j:
+                pair = (min(i, j) + 1, max(i, j) + 1)
+                self._change(pair, self._axpy(self._zeros(self.M), d, self.V[i][a::N]))
+        self.V[j] = self._axpy(self.V[j], d, self.columns[a])
+        self.s[index] = value
+
+    def _change(self, pair, delta):
+        i, j = pair
+        if i == j:
+            self.block_outputs[i - 1] = self._add(self.block_outputs[i - 1], delta)
+        else:
+            self.cross_terms[pair] = self._add(self.cross_terms[pair], delta)
+        pending = self._pending.get(pair)
+        self._pending[pair] = delta if pending is None else self._add(pending, delta)
+
+    def _flush(self):
+        """Whips every pending change (E is linear, so the changes are whipped, not the terms)."""
+        for (i, j), delta in self._pending.items():
+            whipped = self._vector(self.simulator._whip(f"{i},{j}", self._output(delta)))
+            self.whipped_terms[(i, j)] = self._add(self.whipped_terms[(i, j)], whipped)
+            self.T = self._add(self.T, whipped)
+        self._pending.clear()
+
+    def update(self, index, value):
+        """Sets s[index] = value and returns the new P*(s)."""
+        self.set(index, value)
+        return self.output()
+
+    def update_many(self, changes):
+        """Applies (index, value) pairs in order and returns P*(s) once at the end."""
+        for index, value in changes:
+            self.set(index, value)
+        return self.output()
+
+    # Reads
+
+    def output(self):
+        """The current P*(s), as MAYO_Simulator.P_star_eval returns it."""
+        self._flush()
+        return self._output(self.T)
+
+    def trace(self):
+        """The current state in the form of MAYO_Simulator.P_star_trace."""
+        self._flush()
+        return {
+            "blocks": [self.s[i * self.N:(i + 1) * self.N] for i in range(self.K)],
+            "block_outputs": [self._output(v) for v in self.block_outputs],
+            "cross_terms": {pair: self._output(v) for pair, v in self.cross_terms.items()},
+            "whipped_terms": {pair: self._output(v) for pair, v in self.whipped_terms.items()},
+            "T": self._output(self.T),
+        }
+
+    def recompute(self):
+        """P*(s) evaluated from scratch by the simulator, for checking the incremental state."""
+        return [int(v) for v in self.simulator.P_star_eval(list(self.s), len(self.s))]
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from .mayo_data_setup import generate_mayo_test_parameters
+    from .mayo_primitives import MAYO_Simulator
+
+    random.seed(0)
+    M, N, K = 32, 40, 4
+    for field in (None, "gf256"):
+        P, E, s, _ = generate_mayo_test_parameters(M, N, K, True, field=field)
+        sim = MAYO_Simulator(P, E, M, N, K, field=field)
+        evaluator = IncrementalEvaluator(sim, s)
+        updates = [(random.randrange(N * K), random.randrange(256)) for _ in range(200)]
+
+        start = time.perf_counter()
+        for index, value in updates:
+            evaluator.update(index, value)
+        incremental = (time.perf_counter() - start) / len(updates)
+        start = time.perf_counter()
+        full = evaluator.recompute()
+        recompute = time.perf_counter() - start
+        assert evaluator.output() == full
+        print(f"{field or 'ring':>5} M={M} N={N} K={K}: point update {incremental * 1e3:7.3f} ms | "
+              f"full P*(s) {recompute * 1e3:7.3f} ms | {recompute / incremental:5.1f}x")
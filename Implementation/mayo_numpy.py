@@ -0,0 +1,449 @@
+import numpy as np
+
+from .mayo_utils import Q, whipping_pairs, triangular_size
+from .mayo_primitives import MAYO_Simulator
+
+# --- 1. STORAGE / WORKING PRECISION ---
+# Field elements are stored compactly (one byte each for Q=256).
+STORAGE_DTYPE = np.uint8 if Q <= 256 else np.uint16
+# Upper bound on the intermediates of one batch chunk (bytes).
+BATCH_WORK_BYTES = 32 * 1024 * 1024
+
+
+def to_field_array(values, shape=None):
+    """Converts nested lists (or arrays) to a reduced storage array of field elements."""
+    if isinstance(values, np.ndarray) and values.dtype == STORAGE_DTYPE and np.iinfo(STORAGE_DTYPE).max < Q:
+        # Every value of the storage type is already reduced: keep the array (and any
+        # buffer it views, e.g. a memory-mapped store) without copying
+        return values if shape is None else values.reshape(shape)
+    arr = np.remainder(np.asarray(values, dtype=np.int64), Q).astype(STORAGE_DTYPE)
+    if shape is not None:
+        arr = arr.reshape(shape)
+    return arr
+
+
+# --- 2. ARITHMETIC BACKENDS ---
+# The simulator below is written once against these two small interfaces:
+#   prepare(A) / apply(prepared, X): repeated products A @ X with a fixed key-side matrix A
+#   matmul(A, B), add(a, b):        general (batched) products and sums of working arrays
+#   mul(a, b), neg(a):              element-wise (broadcast) products and negation
+#   units(a), inv(a):               invertible-element mask and scalar inverses (row reduction)
+
+class RingOps:
+    """
+    Integer arithmetic mod Q (the original simulator semantics).
+
+    Contractions run in float64 so NumPy can hand them to BLAS. Every product of two
+    reduced elements is < Q^2 and a row of N of them sums to < N*Q^2, which stays exact
+    in float64 (53-bit mantissa) for any realistic N. We therefore only reduce mod Q
+    after each contraction, never inside one.
+    """
+    field = None
+    order = Q
+    work_dtype = np.float64
+
+    def to_storage(self, values, shape=None):
+        return to_field_array(values, shape)
+
+    def to_work(self, values):
+        return np.remainder(np.asarray(values, dtype=np.int64), Q).astype(self.work_dtype)
+
+    def to_output(self, arr):
+        return arr.astype(np.int64)
+
+    def prepare(self, A):
+        return np.asarray(A, dtype=self.work_dtype)
+
+    def apply(self, prepared, X):
+        return np.remainder(prepared @ X, Q)
+
+    def matmul(self, A, B):
+        return np.remainder(A @ B, Q)
+
+    def add(self, a, b):
+        return np.remainder(a + b, Q)
+
+    def mul(self, a, b):
+        return np.remainder(a * b, Q)
+
+    def neg(self, a):
+        return np.remainder(-a, Q)
+
+    def units(self, a):
+        """Mask of invertible elements: the odd residues mod Q."""
+        return np.remainder(a, 2) == 1
+
+    def inv(self, a):
+        return pow(int(a), -1, Q)
+
+    def symmetrize(self, P_stack):
+        """P_i + P_i^T for a stacked (M, N, N) key."""
+        return np.remainder(P_stack.astype(np.int64) + P_stack.transpose(0, 2, 1), Q).astype(P_stack.dtype)
+
+
+class BinaryFieldOps:
+    """
+    GF(2^k) arithmetic on uint8 arrays, driven by the multiplication table of a
+    mayo_utils.BinaryField. Addition is XOR.
+
+    Key-side products A @ X use nibble tables: for every column n of A we store
+    v * A[:, n] for each 4-bit value v (and for v << 4 when elements have 8 bits).
+    A @ X is then a gather of whole precomputed columns and an XOR reduction, done
+    8 bytes at a time on uint64 views, instead of one table lookup per element.
+    """
+    work_dtype = np.uint8
+
+    def __init__(self, field):
+        self.field = field
+        self.order = field.order
+        self.mul_flat = np.frombuffer(field.mul_table, dtype=np.uint8)
+        self.mul_table = self.mul_flat.reshape(self.order, self.order)
+        self.nibbles = (field.bits + 3) // 4
+
+    def to_storage(self, values, shape=None):
+        arr = np.asarray(values)
+        if arr.size and (arr.min() < 0 or arr.max() >= self.order):
+            raise ValueError(f"values outside GF({self.order})")
+        arr = arr.astype(np.uint8, copy=False)
+        if shape is not None:
+            arr = arr.reshape(shape)
+        return arr
+
+    to_work = to_storage
+
+    def to_output(self, arr):
+        return arr.astype(np.int64)
+
+    def prepare(self, A):
+        A = np.asarray(A, dtype=np.uint8)
+        rows, cols = A.shape
+        width = -(-rows // 8) * 8
+        digits = np.arange(16, dtype=np.intp)
+        tables = np.zeros((cols, self.nibbles, 16, width), dtype=np.uint8)
+        for k in range(self.nibbles):
+            scalars = (digits << (4 * k))[None, :, None]
+            tables[:, k, :, :rows] = self.mul_table[scalars, A.T[:, None, :]]
+        return rows, tables.view(np.uint64)
+
+    def apply(self, prepared, X):
+        rows, tables = prepared
+        X = np.asarray(X, dtype=np.uint8)
+        cols, width = tables.shape[0], tables.shape[3]
+        out = np.empty((X.shape[1], width), dtype=np.uint64)
+        chunk = max(1, BATCH_WORK_BYTES // (cols * width * 8))
+        col_index = np.arange(cols)[:, None]
+        for start in range(0, X.shape[1], chunk):
+            X_chunk = X[:, start:start + chunk]
+            acc = 0
+            for k in range(self.nibbles):
+                digits = (X_chunk >> (4 * k)) & 15
+                acc = acc ^ np.bitwise_xor.reduce(tables[col_index, k, digits], axis=0)
+            out[start:start + chunk] = acc
+        return out.view(np.uint8)[:, :rows].T
+
+    def matmul(self, A, B):
+        A = np.asarray(A, dtype=np.uint8)
+        B = np.asarray(B, dtype=np.uint8)
+        shape = np.broadcast_shapes(A.shape[:-2], B.shape[:-2]) + (A.shape[-2], B.shape[-1])
+        # Row offsets into the flattened table: a*b is mul_flat[a*order + b]
+        A_rows = A.astype(np.uint16) * self.order
+        acc = np.zeros(shape, dtype=np.uint8)
+        for j in range(A.shape[-1]):
+            acc ^= self.mul_flat.take(A_rows[..., :, j, None] + B[..., None, j, :])
+        return acc
+
+    def add(self, a, b):
+        return a ^ b
+
+    def mul(self, a, b):
+        return self.mul_table[a, b]
+
+    def neg(self, a):
+        return a
+
+    def units(self, a):
+        return a != 0
+
+    def inv(self, a):
+        return self.field.inv(int(a))
+
+    def symmetrize(self, P_stack):
+        return P_stack ^ P_stack.transpose(0, 2, 1)
+
+
+def make_ops(field):
+    """Returns the NumPy arithmetic backend for a resolved field selection."""
+    return RingOps() if field is None else BinaryFieldOps(field)
+
+def pack_upper_stack(ops, full):
+    """Packs an (M, N, N) stack into (M, N(N+1)/2) upper triangles of U = triu(P + P^T), diagonal as in P."""
+    rows, cols = np.triu_indices(full.shape[-1])
+    upper = ops.symmetrize(full)[:, rows, cols]
+    diag = rows == cols
+    upper[:, diag] = full[:, rows[diag], cols[diag]]
+    return np.ascontiguousarray(upper)
+
+
+# --- 3. VECTORIZED SIMULATOR ---
+
+class MAYO_NumpySimulator(MAYO_Simulator):
+    """
+    Vectorized drop-in replacement for MAYO_Simulator.
+
+    The public key is held as one stacked (M, N, N) array of P_i matrices and a stacked
+    array of E matrices, so that all M quadratic forms are evaluated by a single batched
+    contraction. Results are returned as plain lists and match the pure-Python path exactly,
+    for the integer ring as well as for a finite field selected with `field`.
+    """
+    ACCEPTS_ARRAYS = True
+
+    @classmethod
+    def from_key(cls, key, **options):
+        """
+        Builds the simulator straight from a seeded key's expanded byte buffer, so the
+        key is never materialized as nested lists.
+        """
+        if not hasattr(key, "expand_P_bytes"):
+            return super().from_key(key, **options)
+        P = np.frombuffer(key.expand_P_bytes(), dtype=np.uint8).reshape(key.M, key.N, key.N)
+        E = {f"{i},{j}": np.frombuffer(key.E_bytes(i, j), dtype=np.uint8).reshape(key.M, key.M)
+             for i, j in whipping_pairs(key.K)}
+        return cls(P, E, key.M, key.N, key.K, field=key.field, **options)
+
+    def _prepare_key(self):
+        M, N, K = self.M, self.N, self.K
+        self.ops = make_ops(self.field)
+        # E matrices stacked in whipping_pairs order: (K(K+1)/2, M, M)
+        self.E_pairs = whipping_pairs(K)
+        self.E_stack = np.stack([
+            self.ops.to_storage(self.E_matrices[f"{i},{j}"], (M, M)) for i, j in self.E_pairs
+        ])
+
+        if self.layout == "upper":
+            self._prepare_upper_key()
+        else:
+            self.P_stack = self.ops.to_storage(self.P_coeffs, (M, N, N))
+            # All P_i rows stacked into one (M*N, N) matrix so P_i * x for every i is a single product
+            self._P_rows = self.ops.prepare(self.P_stack.reshape(M * N, N))
+            # Symmetrized forms (P_i + P_i^T), built on first use by P_prime
+            self._P_sym_rows = None
+        # Packed triangles as one (M, N(N+1)/2) operand, built on first use by combined_P_star
+        self._U_flat = None
+        # All E matrices side by side, (M, pairs*M): whipping every term of every pair is
+        # then a single product with the stacked (pairs*M,) term vector.
+        self._E_index = {f"{i},{j}": p for p, (i, j) in enumerate(self.E_pairs)}
+        self._E_work = self.ops.prepare(self.E_stack.transpose(1, 0, 2).reshape(M, -1))
+        # Index arrays into the K x K Gram matrix for every whipping pair
+        self._pair_i = np.array([i - 1 for i, _ in self.E_pairs])
+        self._pair_j = np.array([j - 1 for _, j in self.E_pairs])
+        self._pair_cross = self._pair_i != self._pair_j
+
+    def _as_vector(self, x):
+        return self.ops.to_work(x)
+
+    def _prepare_upper_key(self):
+        """
+        Stores P as one contiguous (M, N(N+1)/2) array of packed upper triangles (see
+        mayo_utils.pack_upper_triangular) and prepares them, zero below the diagonal, as one
+        (M*N, N) key-side operand, so U_i * x for every i is a single product.
+        """
+        M, N = self.M, self.N
+        T = triangular_size(N)
+        P = self.P_coeffs
+        if isinstance(P, (bytes, bytearray, memoryview)):
+            P = np.frombuffer(P, dtype=np.uint8)
+        if np.size(P) == M * T:
+            # Already packed (e.g. the bytes of mayo_utils.pack_upper_triangular)
+            self.P_upper = self.ops.to_storage(P, (M, T))
+        else:
+            self.P_upper = pack_upper_stack(self.ops, self.ops.to_storage(P, (M, N, N)))
+        # The zero entries cost as much as the full layout's _P_rows, but one product over
+        # all rows beats N products of N - r columns each
+        rows, cols = np.triu_indices(N)
+        U = np.zeros((M, N, N), dtype=self.P_upper.dtype)
+        U[:, rows, cols] = self.P_upper
+        self._U_rows = self.ops.prepare(U.reshape(M * N, N))
+
+    def _matvecs(self, rows, X):
+        """
+        Computes P_i * x (or (P_i + P_i^T) * x) for every column x of X (shape (N, C)).
+        Returns an (M, N, C) array.
+        """
+        return self.ops.apply(rows, X).reshape(self.M, self.N, X.shape[1])
+
+    def _key_matvecs(self, X):
+        """
+        P_i * x for every column x of X (shape (N, C)), or U_i * x for the packed
+        upper-triangular layout. Returns an (M, N, C) array.
+        """
+        return self._matvecs(self._U_rows if self.layout == "upper" else self._P_rows, X)
+
+    def P_eval(self, x):
+        """Calculates P(x) = x^T * P_i * x for all P_i matrices at once (mod Q)"""
+        X = self._as_vector(x).reshape(self.N, 1)
+        P_x = self._key_matvecs(X)[:, :, 0]
+        return self.ops.to_output(self.ops.matmul(P_x, X)[:, 0]).tolist()
+
+    def P_prime(self, x, y):
+        """
+        Calculates the differential map P'(x, y) = P(x+y) - P(x) - P(y) (mod Q)
+        as one bilinear pass x^T * (P_i + P_i^T) * y over all P_i.
+        """
+        if self.layout == "upper":
+            # P'(x, y) = x . (U_i y) + y . (U_i x), both products in one pass
+            XY = self._as_vector([x, y]).reshape(2, self.N).T
+            U_xy = self._key_matvecs(XY)
+            result = self.ops.add(
+                self.ops.matmul(U_xy[:, :, 1], XY[:, :1]), self.ops.matmul(U_xy[:, :, 0], XY[:, 1:])
+            )
+            return self.ops.to_output(result[:, 0]).tolist()
+        if self._P_sym_rows is None:
+            P_sym = self.ops.symmetrize(self.P_stack)
+            self._P_sym_rows = self.ops.prepare(P_sym.reshape(self.M * self.N, self.N))
+        X = self._as_vector(x).reshape(self.N, 1)
+        Y = self._as_vector(y).reshape(self.N, 1)
+        P_sym_y = self._matvecs(self._P_sym_rows, Y)[:, :, 0]
+        return self.ops.to_output(self.ops.matmul(P_sym_y, X)[:, 0]).tolist()
+
+    def _pair_terms(self, S):
+        """
+        The unwhipped term of every whipping pair, P(s_i) or P'(s_i, s_j), for a chunk of
+        signatures S (shape (B, N*K)). Returns a (B, M, pairs) array.
+        """
+        ops = self.ops
+        B = S.shape[0]
+        blocks = S.reshape(B, self.K, self.N)
+
+        # One contraction gives P_m * s_j for every equation m, block j and signature b
+        X = blocks.reshape(B * self.K, self.N).T
+        P_s = self._key_matvecs(X).reshape(self.M, self.N, B, self.K)
+
+        # Gram matrices G[b, m] = S_b^T * P_m * S_b (K x K), with S_b the (N, K) block
+        # matrix of signature b. G[i, i] = P(s_i) and G[i, j] + G[j, i] = P'(s_i, s_j).
+        # The same holds with the packed triangles U_m in place of P_m.
+        G = ops.matmul(blocks[:, None], P_s.transpose(2, 0, 1, 3))
+        terms = G[:, :, self._pair_i, self._pair_j]
+        cross_i, cross_j = self._pair_i[self._pair_cross], self._pair_j[self._pair_cross]
+        terms[:, :, self._pair_cross] = ops.add(terms[:, :, self._pair_cross], G[:, :, cross_j, cross_i])
+        return terms
+
+    def _P_star_columns(self, S):
+        """
+        Evaluates P*(s) for a chunk of signatures S (shape (B, N*K)).
+        Returns a (B, M) array.
+        """
+        # Whip every (pair, equation) term with the side-by-side E matrices in one product
+        terms = self._pair_terms(S).transpose(0, 2, 1).reshape(S.shape[0], -1)
+        return self.ops.apply(self._E_work, terms.T).T
+
+    def _block_terms(self, s_blocks, progress=None):
+        """Block outputs and cross terms for P_star_trace, read off one signature's Gram matrix."""
+        S = self._as_vector([v for s_i in s_blocks for v in s_i]).reshape(1, -1)
+        terms = self.ops.to_output(self._pair_terms(S)[0]).T.tolist()
+        # All blocks are multiplied in one product; report them together
+        if progress is not None:
+            for _ in range(self.K):
+                progress()
+        block_outputs = [terms[p] for p, (i, j) in enumerate(self.E_pairs) if i == j]
+        cross_terms = {(i, j): terms[p] for p, (i, j) in enumerate(self.E_pairs) if i != j}
+        return block_outputs, cross_terms
+
+    def _whip(self, key, term):
+        E = self.E_stack[self._E_index[key]]
+        whipped = self.ops.matmul(E, self.ops.to_work(term).reshape(self.M, 1))
+        return self.ops.to_output(whipped[:, 0]).tolist()
+
+    def _batch_chunk_size(self):
+        """Number of signatures per chunk so the (M, N, B*K) and Gram intermediates stay bounded."""
+        per_signature = self.M * (self.N + self.K) * self.K * np.dtype(self.ops.work_dtype).itemsize
+        return max(1, BATCH_WORK_BYTES // per_signature)
+
+    def P_star_eval(self, s, sig_len):
+        """
+        Calculates the Whipped Map:
+        P*(s) = SUM(E_ii * P(s_i)) + SUM(E_ij * P'(s_i, s_j)) (mod Q)
+        """
+        S = self._as_vector(s)[:self.N * self.K].reshape(1, -1)
+        return self.ops.to_output(self._P_star_columns(S)[0]).tolist()
+
+    def P_star_eval_batch(self, signatures):
+        """
+        Calculates P*(s) for every row of a (B, N*K) signature matrix using whole-batch
+        matrix operations. Returns a (B, M) int64 array.
+        """
+        S = self._as_vector(signatures).reshape(-1, self.N * self.K)
+        outputs = np.empty((S.shape[0], self.M), dtype=np.int64)
+        chunk = self._batch_chunk_size()
+        for start in range(0, S.shape[0], chunk):
+            outputs[start:start + chunk] = self._P_star_columns(S[start:start + chunk])
+        return outputs
+
+    def verify_batch(self, signatures, targets):
+        """
+        Verifies B signatures against B targets under this public key.
+        Returns the (B, M) outputs and a boolean validity vector of length B.
+        """
+        outputs = self.P_star_eval_batch(signatures)
+        targets = self.ops.to_output(self._as_vector(targets)).reshape(outputs.shape)
+        return outputs, np.all(outputs == targets, axis=1)
+
+    # --- Random linear combinations (see mayo_screening) ---
+
+    def combined_P_star(self, signatures, coefficients):
+        """
+        SUM_b C[r, b] * P*(s_b) for every row r of the (R, B) coefficient matrix C.
+        Returns an (R, M) array.
+
+        Every term of P*(s) is linear in the block outer products s_i s_j^T, so the
+        signatures are combined there, before the key is touched:
+            X_ij = SUM_b c_b * s_i s_j^T,  SUM_b c_b * G_b[m][i, j] = <P_m, X_ij>
+        Only symmetric parts are needed (Y_ii = X_ii, Y_ij = X_ij + X_ji), and <P_m, Y>
+        is the inner product of the packed triangle U_m with the upper triangle of Y.
+        One round costs (NK)^2 per signature instead of the M*K*N^2 of P*(s_b).
+        """
+        ops = self.ops
+        M, N, K = self.M, self.N, self.K
+        S = self._as_vector(signatures).reshape(-1, N * K)
+        C = self._as_vector(coefficients).reshape(-1, S.shape[0])
+        if self._U_flat is None:
+            self._U_flat = ops.prepare(self.P_upper if self.layout == "upper" else pack_upper_stack(ops, self.P_stack))
+
+        rows, cols = np.triu_indices(N)
+        cross = self._pair_cross
+        item = np.dtype(ops.work_dtype).itemsize
+        # Rounds per pass and signatures per chunk, so X and the scaled copies of S stay bounded
+        round_chunk = max(1, BATCH_WORK_BYTES // ((N * K) ** 2 * item))
+        combined = []
+        for r0 in range(0, C.shape[0], round_chunk):
+            C_r = C[r0:r0 + round_chunk]
+            R = C_r.shape[0]
+            sig_chunk = max(1, BATCH_WORK_BYTES // (R * N * K * item * 4))
+            # X[:, r*NK:(r+1)*NK] = S^T diag(C_r[r]) S, every round of the pass in one product
+            X = None
+            for b0 in range(0, S.shape[0], sig_chunk):
+                S_b = S[b0:b0 + sig_chunk]
+                scaled = ops.mul(C_r[:, b0:b0 + sig_chunk].T[:, :, None], S_b[:, None, :]).reshape(S_b.shape[0], -1)
+                part = ops.apply(ops.prepare(S_b.T), scaled)
+                X = part if X is None else ops.add(X, part)
+            # (R, K, K, N, N) with X[r, i, j] = SUM_b c_rb * s_i s_j^T
+            X = X.reshape(K, N, R, K, N).transpose(2, 0, 3, 1, 4)
+            Y = X[:, self._pair_i, self._pair_j]
+            Y[:, cross] = ops.add(Y[:, cross], X[:, self._pair_j[cross], self._pair_i[cross]])
+            Y_upper = Y[:, :, rows, cols].reshape(-1, len(rows))
+            # <U_m, triu(Y)> for every (round, pair), then whipped pair-major as in _P_star_columns
+            terms = ops.apply(self._U_flat, Y_upper.T).reshape(M, R, -1)
+            terms = terms.transpose(2, 0, 1).reshape(-1, R)
+            combined.append(ops.apply(self._E_work, terms).T)
+        return np.concatenate(combined)
+
+    def screen_combinations(self, signatures, targets, coefficients):
+        """
+        For every row c of `coefficients` (one coefficient per signature), checks the
+        random linear combination SUM_b c_b * P*(s_b) == SUM_b c_b * t_b.
+        Returns one bool per row.
+        """
+        C = self._as_vector(coefficients)
+        C = C.reshape(-1, C.shape[-1])
+        T = self._as_vector(targets).reshape(C.shape[1], self.M)
+        combined = self.combined_P_star(signatures, C)
+        return np.all(combined == self.ops.matmul(C, T), axis=1).tolist()
@@ -0,0 +1,231 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, util
+
+import numpy as np
+
+from .mayo_utils import whipping_pairs, triangular_size, get_field
+from .mayo_numpy import to_field_array, make_ops, pack_upper_stack, MAYO_NumpySimulator
+
+# --- 1. PUBLIC KEY IN SHARED MEMORY ---
+# The expanded key is written once into a single shared block, one byte per element:
+#   [ P_0 .. P_{M-1} as (M, N, N) | E for every whipping pair as (pairs, M, M) ]
+# or, with layout="upper", P as (M, N(N+1)/2) packed triangles (see
+# mayo_utils.pack_upper_triangular), about half the size.
+# Worker processes attach to the block by name and build their simulator from views of
+# it, so the key itself is never pickled or sent through the pool.
+
+class SharedPublicKey:
+    """
+    An expanded public key held in multiprocessing.shared_memory.
+
+    Create it in the parent (from nested lists, arrays or a SeededPublicKey), hand
+    `spec` to workers and let them call attach(). The creator must close() it, which
+    also frees the block; use it as a context manager to get that for free.
+    With layout="upper" the block holds P as packed triangles, and simulators built on
+    it use the upper layout.
+    """
+    def __init__(self, shm, M, N, K, field=None, owner=False, layout="full"):
+        if layout not in ("full", "upper"):
+            raise ValueError(f"Unknown layout '{layout}'. Choose from: full, upper")
+        self.shm = shm
+        self.M = M
+        self.N = N
+        self.K = K
+        self.field = field
+        self.owner = owner
+        self.layout = layout
+        self.E_pairs = whipping_pairs(K)
+        p_shape = (M, triangular_size(N)) if layout == "upper" else (M, N, N)
+        p_size = int(np.prod(p_shape))
+        buf = np.ndarray((p_size + len(self.E_pairs) * M * M,), dtype=np.uint8, buffer=shm.buf)
+        self.P = buf[:p_size].reshape(p_shape)
+        self.E = buf[p_size:].reshape(len(self.E_pairs), M, M)
+
+    @classmethod
+    def create(cls, P_coeffs, E_matrices, M, N, K, field=None, layout="full"):
+        """
+        Copies (P_coeffs, E_matrices) into a new shared block. P_coeffs holds full
+        (M, N, N) matrices, or with layout="upper" either full matrices (packed here) or
+        an already packed buffer of M * N(N+1)/2 entries.
+        """
+        pairs = whipping_pairs(K)
+        p_size = M * (triangular_size(N) if layout == "upper" else N * N)
+        shm = shared_memory.SharedMemory(create=True, size=p_size + len(pairs) * M * M)
+        try:
+            key = cls(shm, M, N, K, field=field, owner=True, layout=layout)
+            if isinstance(P_coeffs, (bytes, bytearray, memoryview)):
+                P_coeffs = np.frombuffer(P_coeffs, dtype=np.uint8)
+            if layout == "upper" and np.size(P_coeffs) == p_size:
+                key.P[:] = to_field_array(P_coeffs, key.P.shape)
+            elif layout == "upper":
+                key.P[:] = pack_upper_stack(make_ops(get_field(field)), to_field_array(P_coeffs, (M, N, N)))
+            else:
+                key.P[:] = to_field_array(P_coeffs, (M, N, N))
+            for p, (i, j) in enumerate(pairs):
+                key.E[p] = to_field_array(E_matrices[f"{i},{j}"], (M, M))
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        return key
+
+    @classmethod
+    def from_key(cls, key, layout=None):
+        """
+        Shares a key object (SeededPublicKey or a simulator). Seeded keys are expanded
+        straight into the block without building nested lists. The layout defaults to
+        the key's own (a simulator's), else "full".
+        """
+        field = getattr(key.field, "name", key.field)
+        layout = layout or getattr(key, "layout", "full")
+        if hasattr(key, "expand_P_bytes"):
+            E = {f"{i},{j}": np.frombuffer(key.E_bytes(i, j), dtype=np.uint8).reshape(key.M, key.M)
+                 for i, j in whipping_pairs(key.K)}
+            return cls.create(key.expand_P_bytes(), E, key.M, key.N, key.K, field=field, layout=layout)
+        return cls.create(key.P_coeffs, key.E_matrices, key.M, key.N, key.K, field=field, layout=layout)
+
+    @property
+    def spec(self):
+        """Picklable description a worker needs to attach: (name, M, N, K, field, layout)."""
+        return (self.shm.name, self.M, self.N, self.K, self.field, self.layout)
+
+    @classmethod
+    def attach(cls, spec):
+        name, M, N, K, field, layout = spec
+        return cls(shared_memory.SharedMemory(name=name), M, N, K, field=field, layout=layout)
+
+    def E_matrices(self):
+        """The E matrices as a dict of (M, M) views, keyed like the simulator expects."""
+        return {f"{i},{j}": self.E[p] for p, (i, j) in enumerate(self.E_pairs)}
+
+    def simulator(self, simulator_class=MAYO_NumpySimulator, **options):
+        """
+        Builds a simulator on this key. Array-based simulators are built straight from the
+        shared views. The pure-Python MAYO_Simulator works on Python ints, so it gets a
+        private list copy of the whole key (in every worker, when used by verify_parallel);
+        packed triangles are handed to it as bytes.
+        A key shared with layout="upper" can only back upper-layout simulators.
+        """
+        layout = options.setdefault("layout", self.layout)
+        if self.layout == "upper" and layout != "upper":
+            raise ValueError("a key shared with layout='upper' only builds upper-layout simulators")
+        if simulator_class.ACCEPTS_ARRAYS:
+            P, E = self.P, self.E_matrices()
+        else:
+            P = self.P.tobytes() if self.layout == "upper" else self.P.tolist()
+            E = {key: E.tolist() for key, E in self.E_matrices().items()}
+        return simulator_class(P, E, self.M, self.N, self.K, field=self.field, **options)
+
+    def close(self):
+        # Drop the views first: a SharedMemory cannot be closed while arrays export its buffer
+        self.P = self.E = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- 2. WORKER PROCESSES ---
+# Each worker attaches once (pool initializer) and keeps its simulator for every chunk.
+
+_worker_key = None
+_worker_simulator = None
+
+def _init_worker(spec, simulator_class, options):
+    global _worker_key, _worker_simulator
+    _worker_key = SharedPublicKey.attach(spec)
+    _worker_simulator = _worker_key.simulator(simulator_class, **options)
+    # Run by multiprocessing when the worker exits (atexit handlers are skipped in
+    # forked workers)
+    util.Finalize(None, _close_worker, exitpriority=10)
+
+def _close_worker():
+    global _worker_key, _worker_simulator
+    # The simulator holds views of the block, which must go before it can be closed
+    _worker_simulator = None
+    if _worker_key is not None:
+        _worker_key.close()
+        _worker_key = None
+
+def _verify_chunk(chunk):
+    signatures, targets = chunk
+    return _worker_simulator.verify_batch(signatures, targets)
+
+
+# --- 3. PARALLEL VERIFICATION ---
+
+def _chunks(signatures, targets, chunk_size):
+    for start in range(0, len(signatures), chunk_size):
+        yield signatures[start:start + chunk_size], targets[start:start + chunk_size]
+
+def _concat(parts):
+    if parts and isinstance(parts[0], np.ndarray):
+        return np.concatenate(parts)
+    return [item for part in parts for item in part]
+
+def verify_parallel(key, signatures, targets, workers=None, chunk_size=None,
+                    simulator_class=MAYO_NumpySimulator, **options):
+    """
+    Verifies B signatures against B targets on a pool of worker processes.
+
+    `key` is anything with P_coeffs, E_matrices, M, N, K and field (a SeededPublicKey,
+    a simulator, ...) or an existing SharedPublicKey. The key is placed in shared memory
+    once; signatures are sent to the workers in chunks. Extra keyword options (e.g.
+    layout="upper") are passed to each worker's simulator. The default array-based
+    simulator computes on views of the shared block; MAYO_Simulator copies the key
+    into lists in every worker (see SharedPublicKey.simulator).
+
+    Returns the (B, M) outputs and the B validity flags, in input order, exactly as
+    simulator_class.verify_batch would.
+    """
+    if len(signatures) != len(targets):
+        raise ValueError("signatures and targets must have the same length")
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        # A few chunks per worker keeps the pool balanced without tiny tasks
+        chunk_size = max(1, -(-len(signatures) // (4 * workers)))
+
+    # An upper-layout run shares the packed triangles, not the full matrices
+    shared = key if isinstance(key, SharedPublicKey) else SharedPublicKey.from_key(key, options.get("layout"))
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared.spec, simulator_class, options)) as pool:
+            # Executor.map yields results in submission order
+            results = list(pool.map(_verify_chunk, _chunks(signatures, targets, chunk_size)))
+    finally:
+        if shared is not key:
+            shared.close()
+
+    outputs = _concat([outputs for outputs, _ in results])
+    valid = _concat([valid for _, valid in results])
+    return outputs, valid
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from .mayo_data_setup import SeededPublicKey
+
+    random.seed(0)
+    M, N, K, B = 16, 24, 2, 400
+    key = SeededPublicKey.generate(M, N, K)
+    # The serial baseline is the engine the workers run
+    reference = MAYO_NumpySimulator.from_key(key)
+    signatures = [list(random.randbytes(N * K)) for _ in range(B)]
+    targets = reference.P_star_eval_batch(signatures[:B // 2]).tolist() + [[0] * M] * (B - B // 2)
+
+    start = time.perf_counter()
+    _, expected = reference.verify_batch(signatures, targets)
+    serial = time.perf_counter() - start
+    for workers in sorted({1, 2, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        _, valid = verify_parallel(key, signatures, targets, workers=workers)
+        elapsed = time.perf_counter() - start
+        assert valid.tolist() == expected.tolist()
+        print(f"{workers} worker(s): {B / elapsed:8.0f} sig/s   (serial {B / serial:.0f} sig/s)")
@@ -1,15 +1,67 @@
-from mayo_utils import Q, poly_eval_mod, dot_product, vector_mod_q
+from .mayo_utils import (
+    Q, poly_eval_mod, dot_product, vector_mod_q, whipping_pairs, get_field, transpose_rows,
+    triangular_size, upper_row_offsets, pack_upper_triangular,
+)
+
+# Storage layouts for P_coeffs: "full" nested N x N matrices, or "upper" packed triangles
+# (see mayo_utils.pack_upper_triangular), which halve memory and multiplications.
+LAYOUTS = ("full", "upper")
+# Intermediates reported by MAYO_Simulator.P_star_trace, in evaluation order
+TRACE_STAGES = ("blocks", "block_outputs", "cross_terms", "whipped_terms", "T")
 
 class MAYO_Simulator:
-    def __init__(self, P_coeffs, E_matrices, M, N, K):
+    # Whether P_coeffs / E_matrices may be given as NumPy arrays (the pure-Python paths
+    # compute on nested lists of Python ints)
+    ACCEPTS_ARRAYS = False
+    # P_coeffs layouts the constructor's `layout` option accepts
+    SUPPORTED_LAYOUTS = LAYOUTS
+
+    def __init__(self, P_coeffs, E_matrices, M, N, K, field=None, layout="full"):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout '{layout}'. Choose from: {', '.join(LAYOUTS)}")
         self.P_coeffs = P_coeffs
         self.E_matrices = E_matrices
         self.M = M
         self.N = N
         self.K = K
+        # Arithmetic: None keeps integer arithmetic mod Q, otherwise a mayo_utils.BinaryField
+        self.field = get_field(field)
+        # "upper": P_coeffs may be full matrices (packed here) or an already packed buffer
+        self.layout = layout
+        self._prepare_key()
+
+    @classmethod
+    def from_key(cls, key, **options):
+        """Builds a simulator from a key object such as mayo_data_setup.SeededPublicKey."""
+        return cls(key.P_coeffs, key.E_matrices, key.M, key.N, key.K, field=key.field, **options)
+
+    def _prepare_key(self):
+        """Precomputes the per-key data used by the evaluation methods."""
+        if self.field is None:
+            # The integer paths index nested lists of Python ints: NumPy keys are converted
+            # once (packed buffers, bytes and memoryviews, are read as they are)
+            if hasattr(self.P_coeffs, "dtype"):
+                self.P_coeffs = self.P_coeffs.tolist()
+            self.E_matrices = {key: E.tolist() if hasattr(E, "dtype") else E for key, E in self.E_matrices.items()}
+        if self.layout == "upper":
+            self._prepare_upper_key()
+            return
+        if self.field is not None:
+            self._prepare_field_key()
+            return
+        # Symmetrized forms (P_i + P_i^T), computed once per key. The differential map
+        # P'(x, y) = P(x+y) - P(x) - P(y) equals x^T * (P_i + P_i^T) * y, a single bilinear pass.
+        self.P_sym = [
+            [[P_i[r][c] + P_i[c][r] for c in range(self.N)] for r in range(self.N)]
+            for P_i in self.P_coeffs
+        ]
 
     def P_eval(self, x):
         """Calculates P(x) = x^T * P_i * x for each P_i matrix (mod Q)"""
+        if self.layout == "upper":
+            return self._upper_P_eval(x)
+        if self.field is not None:
+            return list(self._field_forms(self._P_row_stack, x, x))
         result = [0] * self.M
         for i in range(self.M):
             P_i = self.P_coeffs[i]
@@ -21,51 +73,278 @@ class MAYO_Simulator:
         return result
 
     def P_prime(self, x, y):
-        """Calculates the differential map: P'(x, y) = P(x+y) - P(x) - P(y) (mod Q)"""
-        x_plus_y = [x[i] + y[i] for i in range(len(x))]
-
-        P_x_plus_y = self.P_eval(x_plus_y)
-        P_x = self.P_eval(x)
-        P_y = self.P_eval(y)
-
-        # Modulo arithmetic applied during subtraction (a - b - c mod Q)
-        result = [P_x_plus_y[i] - P_x[i] - P_y[i] for i in range(self.M)]
-
-        return vector_mod_q(result)
+        """
+        Calculates the differential map: P'(x, y) = P(x+y) - P(x) - P(y) (mod Q)
+        directly as the bilinear form x^T * (P_i + P_i^T) * y.
+        """
+        if self.layout == "upper":
+            return self._upper_P_prime(x, y)
+        if self.field is not None:
+            return list(self._field_forms(self._P_sym_row_stack, x, y))
+        result = [0] * self.M
+        for i in range(self.M):
+            P_sym_y = dot_product(self.P_sym[i], y)
+            result[i] = poly_eval_mod(dot_product(x, P_sym_y))
+        return result
 
     def P_star_eval(self, s, sig_len):
         """
         Calculates the Whipped Map: 
         P*(s) = SUM(E_ii * P(s_i)) + SUM(E_ij * P'(s_i, s_j)) (mod Q)
         """
-        # Calculate block sizes based on current N and K
-        s_blocks = [s[i*self.N:(i+1)*self.N] for i in range(self.K)]
-
-        # Term 1: Quadratic terms (E_ii * P(s_i))
-        quad_term = [0] * self.M
-        for i in range(self.K):
-            s_i = s_blocks[i]
-            p_si = self.P_eval(s_i)
-            e_ii = self.E_matrices[f"{i+1},{i+1}"]
-            
-            term = dot_product(e_ii, p_si)
-            quad_term = [quad_term[idx] + term[idx] for idx in range(self.M)]
-
-        # Term 2: Bilinear terms (E_ij * P'(s_i, s_j))
-        bilinear_term = [0] * self.M
-        
-        # This simulator assumes K=2 for the E matrix logic (1,1, 2,2, 1,2)
-        if self.K == 2:
-            s_i = s_blocks[0]
-            s_j = s_blocks[1]
-            
-            p_prime_ij = self.P_prime(s_i, s_j)
-            e_ij = self.E_matrices["1,2"]
-            
-            term = dot_product(e_ij, p_prime_ij)
-            bilinear_term = [bilinear_term[idx] + term[idx] for idx in range(self.M)]
-        # NOTE: For K > 2, the E_matrices structure would require significant modification.
-
-        # Final result: P*(s) = (quad_term + bilinear_term) mod Q
-        result = [quad_term[i] + bilinear_term[i] for i in range(self.M)]
-        return vector_mod_q(result)
\ No newline at end of file
+        return self.P_star_trace(s, sig_len)["T"]
+
+    def P_star_trace(self, s, sig_len, hook=None, progress=None):
+        """
+        Evaluates P*(s) in one pass and keeps every intermediate. Returns a dict with:
+            "blocks":        the K signature blocks s_i
+            "block_outputs": P(s_i) for every block
+            "cross_terms":   {(i, j): P'(s_i, s_j)} for every pair of blocks i < j (1-based)
+            "whipped_terms": {(i, j): E_ij * P(s_i) or E_ij * P'(s_i, s_j)} for every whipping pair
+            "T":             P*(s), the sum of the whipped terms
+        If given, hook(stage, value) is called as soon as each stage (in TRACE_STAGES order)
+        is available, and progress() once per block while "block_outputs" is computed (the
+        bulk of the work: each block is multiplied with every P_m). Either may raise to abort.
+        """
+        trace = {}
+
+        def record(stage, value):
+            trace[stage] = value
+            if hook is not None:
+                hook(stage, value)
+
+        s_blocks = [list(s[i*self.N:(i+1)*self.N]) for i in range(self.K)]
+        record("blocks", s_blocks)
+
+        block_outputs, cross_terms = self._block_terms(s_blocks, progress)
+        record("block_outputs", block_outputs)
+        record("cross_terms", cross_terms)
+
+        whipped_terms = {}
+        for i, j in whipping_pairs(self.K):
+            term = block_outputs[i-1] if i == j else cross_terms[(i, j)]
+            whipped_terms[(i, j)] = self._whip(f"{i},{j}", term)
+        record("whipped_terms", whipped_terms)
+
+        record("T", self._sum_terms(list(whipped_terms.values())))
+        return trace
+
+    def P_star_eval_batch(self, signatures):
+        """
+        Calculates P*(s) for every row of a (B, N*K) signature matrix.
+        Returns a (B, M) list of outputs.
+        """
+        sig_len = self.N * self.K
+        return [self.P_star_eval(list(s), sig_len) for s in signatures]
+
+    def verify_batch(self, signatures, targets):
+        """
+        Verifies B signatures against B targets under this public key.
+        Returns the (B, M) outputs and a list of B booleans (True = valid).
+        """
+        outputs = self.P_star_eval_batch(signatures)
+        valid = [output == self._reduce_output(target) for output, target in zip(outputs, targets)]
+        return outputs, valid
+
+    def screen_combinations(self, signatures, targets, coefficients):
+        """
+        For every row c of `coefficients` (one coefficient per signature), checks the
+        random linear combination SUM_b c_b * P*(s_b) == SUM_b c_b * t_b.
+        Returns one bool per row. See mayo_screening for how this is used.
+
+        This reference version evaluates every P*(s_b) first; MAYO_NumpySimulator
+        combines the signatures before touching the key.
+        """
+        outputs = [[int(v) for v in output] for output in self.P_star_eval_batch(signatures)]
+        targets = [self._reduce_output(target) for target in targets]
+        return [self._combine(c, outputs) == self._combine(c, targets) for c in coefficients]
+
+    def _combine(self, c, vectors):
+        """SUM_b c_b * v_b over output vectors, in canonical output form."""
+        if self.field is not None:
+            acc = bytes(self.M)
+            for c_b, v in zip(c, vectors):
+                acc = self.field.add_rows(acc, self.field.scale(bytes(v), int(c_b)))
+            return list(acc)
+        return vector_mod_q([sum(int(c_b) * v[m] for c_b, v in zip(c, vectors)) for m in range(self.M)])
+
+    def _P_matvecs(self, x):
+        """P_m * x for every equation m (U_m * x for the packed upper-triangular layout)."""
+        if self.layout == "upper":
+            return self._upper_matvecs(x)
+        return [dot_product(P_m, x) for P_m in self.P_coeffs]
+
+    def _reduce_output(self, vec):
+        """Brings a target vector into the same canonical form as P_star_eval outputs."""
+        if self.field is not None:
+            return list(self.field.reduce_vec(vec))
+        return vector_mod_q(vec)
+
+    def _block_terms(self, s_blocks, progress=None):
+        """
+        P(s_i) for every block and {(i, j): P'(s_i, s_j)} for every pair i < j.
+        P_m * s_i is computed once per block and shared by all of them:
+        P(s_i) = s_i . (P s_i) and P'(s_i, s_j) = s_i . (P s_j) + s_j . (P s_i).
+        """
+        if self.field is not None:
+            if self.layout == "upper":
+                return self._upper_field_block_terms(s_blocks, progress)
+            return self._field_block_terms(s_blocks, progress)
+        P_s = self._block_products(self._P_matvecs, s_blocks, progress)
+        block_outputs = [
+            vector_mod_q([dot_product(s_i, P_s[i][m]) for m in range(self.M)])
+            for i, s_i in enumerate(s_blocks)
+        ]
+        cross_terms = {}
+        for i, j in whipping_pairs(self.K):
+            if i == j:
+                continue
+            s_i, s_j = s_blocks[i-1], s_blocks[j-1]
+            cross_terms[(i, j)] = vector_mod_q([
+                dot_product(s_i, P_s[j-1][m]) + dot_product(s_j, P_s[i-1][m])
+                for m in range(self.M)
+            ])
+        return block_outputs, cross_terms
+
+    def _block_products(self, product, s_blocks, progress=None):
+        """product(s_i) for every block, calling progress() after each one."""
+        results = []
+        for s_i in s_blocks:
+            results.append(product(s_i))
+            if progress is not None:
+                progress()
+        return results
+
+    def _whip(self, key, term):
+        """E * term for the whipping matrix stored under `key` ("i,j")."""
+        if self.field is not None:
+            return list(self.field.vecmat(self._E_cols[key], bytes(term)))
+        return vector_mod_q(dot_product(self.E_matrices[key], term))
+
+    def _sum_terms(self, terms):
+        """Sum of equal-length output vectors."""
+        if self.field is not None:
+            result = bytes(self.M)
+            for term in terms:
+                result = self.field.add_rows(result, bytes(term))
+            return list(result)
+        return vector_mod_q([sum(column) for column in zip(*terms)])
+
+    # --- Finite-field arithmetic path (field is a mayo_utils.BinaryField) ---
+
+    def _prepare_field_key(self):
+        """
+        Converts the key to byte rows once. Row r of a row stack concatenates row r of
+        every P_m (length M*N), so x^T * P_m for all m is a single field.vecmat call.
+        """
+        F = self.field
+        P_rows = [[F.reduce_vec(row) for row in P_m] for P_m in self.P_coeffs]
+        P_cols = [transpose_rows(P_m) for P_m in P_rows]
+        self._P_row_stack = [b"".join(P_m[r] for P_m in P_rows) for r in range(self.N)]
+        # P_m + P_m^T: row r is row r XOR column r (addition is XOR)
+        self._P_sym_row_stack = [
+            b"".join(F.add_rows(P_rows[m][r], P_cols[m][r]) for m in range(self.M))
+            for r in range(self.N)
+        ]
+        # E * t = XOR_c t_c * (column c of E)
+        self._E_cols = {key: transpose_rows([F.reduce_vec(row) for row in E]) for key, E in self.E_matrices.items()}
+
+    def _field_combine(self, z, y):
+        """Given z = x^T * A_m stacked for all m (length M*N), returns (x^T * A_m * y) for all m."""
+        return self.field.vecmat([z[c::self.N] for c in range(self.N)], y)
+
+    def _field_forms(self, row_stack, x, y):
+        """Evaluates x^T * A_m * y for every matrix A_m of a row stack."""
+        F = self.field
+        x = F.reduce_vec(x)
+        y = x if y is x else F.reduce_vec(y)
+        return self._field_combine(F.vecmat(row_stack, x), y)
+
+    def _field_block_terms(self, s_blocks, progress=None):
+        """Block outputs and cross terms over the field, reusing s_i^T * P_m for both."""
+        F = self.field
+        s_blocks = [F.reduce_vec(s_i) for s_i in s_blocks]
+        z = self._block_products(lambda s_i: F.vecmat(self._P_row_stack, s_i), s_blocks, progress)
+        # P(s_i) = (s_i^T P) s_i
+        block_outputs = [list(self._field_combine(z[i], s_i)) for i, s_i in enumerate(s_blocks)]
+        # P'(s_i, s_j) = (s_i^T P) s_j + (s_j^T P) s_i
+        cross_terms = {
+            (i, j): list(F.add_rows(
+                self._field_combine(z[i-1], s_blocks[j-1]),
+                self._field_combine(z[j-1], s_blocks[i-1]),
+            ))
+            for i, j in whipping_pairs(self.K) if i != j
+        }
+        return block_outputs, cross_terms
+
+    # --- Upper-triangular packed path (layout="upper") ---
+    # With U_m the packed triangle of P_m (U_m + U_m^T = P_m + P_m^T off the diagonal, and
+    # U_m[r][r] = P_m[r][r]): P(x) = x . (U_m x) and P'(x, y) = x . (U_m y) + y . (U_m x).
+    # Only the N(N+1)/2 stored entries are ever multiplied.
+
+    def _prepare_upper_key(self):
+        self.T = triangular_size(self.N)
+        if isinstance(self.P_coeffs, (bytes, bytearray, memoryview)):
+            # Read in place: the ring path never copies a memoryview of a memory-mapped
+            # store (the field path regroups it once into byte columns, below)
+            self.P_upper = memoryview(self.P_coeffs).cast('B')
+        else:
+            self.P_upper = pack_upper_triangular(self.P_coeffs, self.field)
+        if len(self.P_upper) != self.M * self.T:
+            raise ValueError(f"packed P holds {len(self.P_upper)} entries, expected {self.M * self.T}")
+        self._upper_offsets = upper_row_offsets(self.N)
+        if self.field is not None:
+            F = self.field
+            self._E_cols = {key: transpose_rows([F.reduce_vec(row) for row in E]) for key, E in self.E_matrices.items()}
+            # Entry (r, c) of every U_m is the strided slice U[off_r + c - r :: T]. Column c of
+            # all triangles is stored row-major over r = 0..c (M*(c+1) bytes, M*T in total), so
+            # U_m * x for every m is one vecmat over N columns, as in the full layout. Columns
+            # are kept longest first because vecmat takes its output width from the first one.
+            T, U = self.T, self.P_upper
+            self._upper_cols = [
+                b"".join(bytes(U[off + c - r::T]) for r, off in enumerate(self._upper_offsets[:c + 1]))
+                for c in reversed(range(self.N))
+            ]
+
+    def _upper_matvecs(self, x):
+        """
+        U_m * x for every equation.
+        Integer ring: M lists (one per equation), read straight from the packed buffer.
+        Field: N byte rows, row r holding (U_m x)[r] for every m.
+        """
+        N, T, U = self.N, self.T, self.P_upper
+        if self.field is None:
+            return [
+                [dot_product(U[m*T + off: m*T + off + N - r], x[r:]) for r, off in enumerate(self._upper_offsets)]
+                for m in range(self.M)
+            ]
+        M = self.M
+        Ux = self.field.vecmat(self._upper_cols, bytes(reversed(x)))
+        return [Ux[r*M:(r + 1)*M] for r in range(N)]
+
+    def _upper_P_eval(self, x):
+        if self.field is None:
+            Ux = self._upper_matvecs(x)
+            return [poly_eval_mod(dot_product(x, Ux[m])) for m in range(self.M)]
+        x = self.field.reduce_vec(x)
+        return list(self.field.vecmat(self._upper_matvecs(x), x))
+
+    def _upper_P_prime(self, x, y):
+        if self.field is None:
+            Ux, Uy = self._upper_matvecs(x), self._upper_matvecs(y)
+            return [poly_eval_mod(dot_product(x, Uy[m]) + dot_product(y, Ux[m])) for m in range(self.M)]
+        F = self.field
+        x, y = F.reduce_vec(x), F.reduce_vec(y)
+        return list(F.add_rows(F.vecmat(self._upper_matvecs(y), x), F.vecmat(self._upper_matvecs(x), y)))
+
+    def _upper_field_block_terms(self, s_blocks, progress=None):
+        """Block outputs and cross terms over the field from the packed triangles, reusing U_m * s_i."""
+        F = self.field
+        s_blocks = [F.reduce_vec(s_i) for s_i in s_blocks]
+        U_s = self._block_products(self._upper_matvecs, s_blocks, progress)
+        block_outputs = [list(F.vecmat(U_s[i], s_i)) for i, s_i in enumerate(s_blocks)]
+        cross_terms = {
+            (i, j): list(F.add_rows(F.vecmat(U_s[j-1], s_blocks[i-1]), F.vecmat(U_s[i-1], s_blocks[j-1])))
+            for i, j in whipping_pairs(self.K) if i != j
+        }
+        return block_outputs, cross_terms
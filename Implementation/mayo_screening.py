@@ -0,0 +1,146 @@
+"""
+Probabilistic batch verification by random linear combination ("screening").
+
+Instead of checking P*(s_b) == t_b for every signature, a group of signatures is checked
+with random coefficients c_b:
+
+    SUM_b c_b * P*(s_b) == SUM_b c_b * t_b
+
+A group of valid signatures always passes. If some signature is invalid the check still
+passes by accident with probability at most:
+  - 1 / field order over GF(2^k) (a nonzero error vector e survives c.e = 0 for 1 in q choices),
+  - 1 / 2 over the ring Z/256 (the worst case is an error of 128 in one equation, which
+    every even coefficient cancels; a random error survives far less often).
+With R independent rounds that bound is raised to the power R.
+
+screen_verify() screens the whole batch, bisects groups that fail and verifies small
+groups individually. Rejections are always exact: a group only fails if it really holds
+an invalid signature, and every rejected signature is finally checked by verify_batch.
+Acceptances carry the chosen soundness error per screened group.
+
+With MAYO_NumpySimulator a round costs about (NK)^2 operations per signature, against
+M*K*N^2 for P*(s), so screening pays off when M/K is well above the number of rounds:
+over GF(256) (5 rounds for 2^-40) but not over the ring (40 rounds), where screen_verify
+falls back to verify_batch unless rounds are given explicitly. Run this module for a
+comparison with verify_batch.
+"""
+import math
+import random
+
+from .mayo_utils import field_order, get_field
+
+# --- 1. SOUNDNESS ---
+
+DEFAULT_SOUNDNESS_ERROR = 2.0 ** -40
+
+def round_error(field=None):
+    """Bound on the probability that one round accepts a group holding an invalid signature."""
+    field = get_field(field)
+    return 0.5 if field is None else 1.0 / field.order
+
+def rounds_for(soundness_error=DEFAULT_SOUNDNESS_ERROR, field=None):
+    """Smallest number of rounds whose combined false-acceptance bound is <= soundness_error."""
+    if not 0 < soundness_error < 1:
+        raise ValueError("soundness_error must be between 0 and 1")
+    return max(1, math.ceil(math.log(soundness_error) / math.log(round_error(field))))
+
+
+# --- 2. SCREENING WITH BISECTION ---
+
+def _coefficients(rng, rounds, size, order):
+    """A (rounds, size) list of uniformly random coefficients (every order divides 256)."""
+    reduce = bytes(v % order for v in range(256))
+    return [list(rng.randbytes(size).translate(reduce)) for _ in range(rounds)]
+
+def screen_verify(simulator, signatures, targets, rounds=None, soundness_error=DEFAULT_SOUNDNESS_ERROR,
+                  leaf_size=32, seed=None):
+    """
+    Verifies B signatures against B targets by screening.
+
+    `rounds` defaults to rounds_for(soundness_error, simulator.field). Over the ring the
+    rounds needed make screening slower than verifying (see the module docstring), so
+    without an explicit `rounds` every signature is verified with verify_batch.
+    Groups of at most `leaf_size` signatures are verified individually with
+    simulator.verify_batch. A failing group is split in two; if its first half passes,
+    the second half is known to hold the invalid signature and is split without being
+    screened.
+
+    Returns (valid, stats): a list of B booleans and a dict of counters.
+    """
+    if len(signatures) != len(targets):
+        raise ValueError("signatures and targets must have the same length")
+    if leaf_size < 1:
+        raise ValueError("leaf_size must be at least 1")
+    if rounds is None and simulator.field is None:
+        _, ok = simulator.verify_batch(signatures, targets)
+        return [bool(v) for v in ok], {"rounds": 0, "soundness_error": 0.0, "screens": 0,
+                                       "screened_signatures": 0, "individual": len(signatures)}
+    rounds = rounds_for(soundness_error, simulator.field) if rounds is None else rounds
+    rng = random.Random(seed)
+    order = field_order(simulator.field)
+    valid = [False] * len(signatures)
+    stats = {"rounds": rounds, "soundness_error": round_error(simulator.field) ** rounds,
+             "screens": 0, "screened_signatures": 0, "individual": 0}
+
+    def screen(start, stop):
+        stats["screens"] += 1
+        stats["screened_signatures"] += stop - start
+        C = _coefficients(rng, rounds, stop - start, order)
+        return all(simulator.screen_combinations(signatures[start:stop], targets[start:stop], C))
+
+    # (start, stop, known_bad): known_bad groups failed already (by deduction) and are not re-screened
+    pending = [(0, len(signatures), False)]
+    while pending:
+        start, stop, known_bad = pending.pop()
+        if stop - start <= leaf_size:
+            if stop > start:
+                _, ok = simulator.verify_batch(signatures[start:stop], targets[start:stop])
+                valid[start:stop] = [bool(v) for v in ok]
+                stats["individual"] += stop - start
+            continue
+        if not known_bad and screen(start, stop):
+            valid[start:stop] = [True] * (stop - start)
+            continue
+        mid = (start + stop) // 2
+        if mid - start <= leaf_size:
+            pending += [(start, mid, True), (mid, stop, False)]
+            continue
+        left_ok = screen(start, mid)
+        if left_ok:
+            valid[start:mid] = [True] * (mid - start)
+        else:
+            pending.append((start, mid, True))
+        # The group failed, so with a clean first half the second half must hold the invalid one
+        pending.append((mid, stop, left_ok))
+    return valid, stats
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import numpy as np
+    from .mayo_data_setup import generate_mayo_test_parameters
+    from .mayo_numpy import MAYO_NumpySimulator
+
+    random.seed(0)
+    M, N, K = (int(v) for v in sys.argv[1:4]) if len(sys.argv) >= 4 else (64, 81, 4)
+    B = 512
+    for field in (None, "gf256"):
+        P, E, _, _ = generate_mayo_test_parameters(M, N, K, True, field=field)
+        sim = MAYO_NumpySimulator(P, E, M, N, K, field=field)
+        signatures = np.frombuffer(random.randbytes(B * N * K), dtype=np.uint8).reshape(B, N * K)
+        outputs = sim.P_star_eval_batch(signatures)
+        for invalid in (0, 1, B // 100):
+            targets = outputs.copy()
+            for b in random.sample(range(B), invalid):
+                targets[b, 0] ^= 1
+            start = time.perf_counter()
+            _, expected = sim.verify_batch(signatures, targets)
+            direct = time.perf_counter() - start
+            start = time.perf_counter()
+            # Explicit rounds, so the ring is screened too rather than falling back
+            valid, stats = screen_verify(sim, signatures, targets, rounds=rounds_for(field=field), seed=1)
+            screened = time.perf_counter() - start
+            assert valid == expected.tolist()
+            print(f"{field or 'ring':>5} M={M} N={N} K={K} B={B} invalid={invalid:<3} rounds={stats['rounds']:<3} "
+                  f"verify_batch {direct:6.3f} s | screened {screened:6.3f} s | speedup {direct / screened:5.2f}x")
@@ -0,0 +1,221 @@
+import random
+import time
+
+import numpy as np
+
+from .mayo_utils import whipping_pairs, field_order, get_field
+from .mayo_primitives import MAYO_Simulator
+from .mayo_numpy import make_ops, MAYO_NumpySimulator
+from .mayo_data_setup import random_elements
+
+# --- 1. ROW REDUCTION ---
+# Written against the mayo_numpy arithmetic backends, so the same routine solves systems
+# over the ring Z/Q (float64 rows) and over GF(2^k) (uint8 rows, table multiplication).
+
+def _random_array(ops, shape, order):
+    """Random elements drawn from `random` (seedable), as a writable working array."""
+    count = int(np.prod(shape))
+    return ops.to_work(np.frombuffer(bytearray(random_elements(count, order)), dtype=np.uint8).reshape(shape))
+
+def row_reduce(ops, A, b):
+    """
+    Gauss-Jordan elimination of the augmented system [A | b].
+
+    Each pivot step scales one row and clears the pivot column from every other row with
+    a single broadcast product, so the work per pivot is a few whole-matrix operations.
+    Pivots must be invertible: nonzero in a field, odd in the ring Z/Q. A column without
+    such an entry is skipped. Returns the reduced matrix and the list of pivot columns.
+    """
+    aug = np.concatenate([A, b.reshape(-1, 1)], axis=1)
+    rows, cols = A.shape
+    pivots = []
+    for c in range(cols):
+        r = len(pivots)
+        if r == rows:
+            break
+        candidates = np.flatnonzero(ops.units(aug[r:, c]))
+        if not candidates.size:
+            continue
+        p = r + candidates[0]
+        if p != r:
+            aug[[r, p]] = aug[[p, r]]
+        aug[r] = ops.mul(aug[r], ops.inv(aug[r, c]))
+        factors = aug[:, c].copy()
+        factors[r] = 0
+        aug = ops.add(aug, ops.mul(ops.neg(factors)[:, None], aug[r]))
+        pivots.append(c)
+    return aug, pivots
+
+def solve(ops, A, b, order):
+    """
+    A random solution x of A x = b, or None if A has fewer invertible pivots than rows
+    (then some right-hand sides have no solution). Free variables are drawn at random.
+    """
+    aug, pivots = row_reduce(ops, A, b)
+    rows, cols = A.shape
+    if len(pivots) < rows:
+        return None
+    free = np.setdiff1d(np.arange(cols), pivots)
+    x = np.zeros(cols, dtype=aug.dtype)
+    x[free] = _random_array(ops, free.size, order)
+    # Reduced rows read x_pivot + A_free x_free = b
+    fixed = ops.matmul(aug[:, free], x[free].reshape(-1, 1))[:, 0]
+    x[pivots] = ops.add(aug[:, -1], ops.neg(fixed))
+    return x
+
+
+# --- 2. TRAPDOOR KEYS ---
+
+class TrapdoorKey:
+    """
+    Oil-and-vinegar key pair.
+
+    The N variables of a block split into V = N - o vinegar and o oil variables. The secret
+    O (V x o) spans the oil space {(O u, u)}, on which every public form vanishes:
+        P_m = [[P1, P2], [0, P3]],   P3 = -(O^T P1 O + O^T P2)
+    P_coeffs and E_matrices are an ordinary public key for any simulator.
+    """
+    def __init__(self, P_coeffs, E_matrices, O, M, N, K, field=None):
+        self.P_coeffs = P_coeffs
+        self.E_matrices = E_matrices
+        self.O = O
+        self.M = M
+        self.N = N
+        self.K = K
+        self.o = len(O[0])
+        self.field = field
+
+    @classmethod
+    def generate(cls, M, N, K, o=None, field=None):
+        """
+        Random key pair (drawn from `random`, so seedable). The oil dimension defaults to
+        the smallest o with K * o >= M, which the signer needs for a solvable system.
+        """
+        o = -(-M // K) if o is None else o
+        if not 0 < o < N:
+            raise ValueError(f"oil dimension must be between 1 and N-1, got {o}")
+        if K * o < M:
+            raise ValueError(f"K * o = {K * o} oil variables cannot solve M = {M} equations")
+        ops, order = make_ops(get_field(field)), field_order(field)
+        V = N - o
+        O = _random_array(ops, (V, o), order)
+        P = _random_array(ops, (M, N, N), order)
+        P1, P2 = P[:, :V, :V], P[:, :V, V:]
+        P3 = ops.add(ops.matmul(O.T, ops.matmul(P1, O)), ops.matmul(O.T, P2))
+        P[:, V:, :V] = 0
+        P[:, V:, V:] = ops.neg(P3)
+        E_matrices = {
+            f"{i},{j}": ops.to_output(_random_array(ops, (M, M), order)).tolist() for i, j in whipping_pairs(K)
+        }
+        return cls(ops.to_output(P).tolist(), E_matrices, ops.to_output(O).tolist(), M, N, K, field=field)
+
+    def simulator(self, simulator_class=MAYO_Simulator, **options):
+        """Builds a verifying simulator for the public half of the key."""
+        return simulator_class.from_key(self, **options)
+
+
+# --- 3. SIGNER ---
+
+class MAYO_Signer:
+    """
+    Finds s with P*(s) = t using a TrapdoorKey.
+
+    With random vinegar v_i, the blocks are s_i = (v_i + O x_i, x_i). The key vanishes on
+    the oil space, so P*(s) is affine in the oil variables x = (x_1, ..., x_K):
+        P*(s) = P*(v) + SUM_j A_j x_j,   A_j = E_jj L(v_j) + SUM_{i != j} E_ij L(v_i)
+        L(v)[m] = v^T ((P_m + P_m^T)[:V, :V] O + (P_m + P_m^T)[:V, V:])
+    (E_ij meaning the matrix of the pair {i, j}). That is an M x (K*o) linear system,
+    solved with row_reduce. If it is singular only the vinegar is redrawn; the key-side
+    products are prepared once per signer.
+    """
+    def __init__(self, key, max_attempts=100):
+        self.key = key
+        self.max_attempts = max_attempts
+        self.M, self.N, self.K, self.o = key.M, key.N, key.K, key.o
+        self.V = self.N - self.o
+        self.ops = make_ops(get_field(key.field))
+        self.order = field_order(key.field)
+        ops, M, V, o = self.ops, self.M, self.V, self.o
+
+        P_sym = ops.symmetrize(ops.to_work(key.P_coeffs))
+        self.O = ops.to_work(key.O)
+        # L_m (V x o) for every equation, transposed and stacked: v -> L(v) is one product
+        L = ops.add(ops.matmul(P_sym[:, :V, :V], self.O), P_sym[:, :V, V:])
+        self._L = ops.prepare(L.transpose(0, 2, 1).reshape(M * o, V))
+        self.E_pairs = whipping_pairs(self.K)
+        self.E_stack = np.stack([ops.to_work(key.E_matrices[f"{i},{j}"]) for i, j in self.E_pairs])
+        self._pair_i = np.array([i - 1 for i, _ in self.E_pairs])
+        self._pair_j = np.array([j - 1 for _, j in self.E_pairs])
+        # Evaluates P*(v) for the vinegar-only blocks
+        self.verifier = MAYO_NumpySimulator(key.P_coeffs, key.E_matrices, M, self.N, self.K, field=key.field)
+        self.attempts = 0
+        self.signatures = 0
+
+    def _oil_system(self, vinegar):
+        """The M x (K*o) matrix of the oil variables for a (K, V) vinegar choice."""
+        ops, M, o = self.ops, self.M, self.o
+        lin = ops.apply(self._L, vinegar.T).reshape(M, o, self.K).transpose(2, 0, 1)
+        # E_ij L(v_i) and E_ij L(v_j) for every pair, in two batched products
+        W_i = ops.matmul(self.E_stack, lin[self._pair_i])
+        W_j = ops.matmul(self.E_stack, lin[self._pair_j])
+        blocks = [np.zeros((M, o), dtype=lin.dtype) for _ in range(self.K)]
+        for p, (i, j) in enumerate(self.E_pairs):
+            blocks[j - 1] = ops.add(blocks[j - 1], W_i[p])
+            if i != j:
+                blocks[i - 1] = ops.add(blocks[i - 1], W_j[p])
+        return np.concatenate(blocks, axis=1)
+
+    def sign(self, target):
+        """A signature (list of N*K elements) with P*(s) = target."""
+        ops, K, N, V = self.ops, self.K, self.N, self.V
+        t = ops.to_work(target).reshape(self.M)
+        for _ in range(self.max_attempts):
+            self.attempts += 1
+            vinegar = _random_array(ops, (K, V), self.order)
+            s = np.zeros((K, N), dtype=vinegar.dtype)
+            s[:, :V] = vinegar
+            constant = ops.to_work(self.verifier.P_star_eval_batch(s.reshape(1, -1))[0])
+            x = solve(ops, self._oil_system(vinegar), ops.add(t, ops.neg(constant)), self.order)
+            if x is None:
+                continue
+            X = x.reshape(K, self.o)
+            s[:, :V] = ops.add(vinegar, ops.matmul(X, self.O.T))
+            s[:, V:] = X
+            self.signatures += 1
+            return ops.to_output(s.reshape(-1)).tolist()
+        raise RuntimeError(f"no solvable oil system in {self.max_attempts} attempts")
+
+    def sign_batch(self, targets):
+        return [self.sign(target) for target in targets]
+
+    def stats(self):
+        return {
+            "signatures": self.signatures,
+            "attempts": self.attempts,
+            "attempts_per_signature": self.attempts / self.signatures if self.signatures else 0.0,
+        }
+
+
+if __name__ == "__main__":
+    import sys
+
+    random.seed(0)
+    sizes = {"demo": (4, 6, 2), "small": (16, 24, 3), "MAYO_1": (78, 86, 10), "MAYO_2": (64, 81, 4)}
+    B = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    for size, (M, N, K) in sizes.items():
+        for field in (None, "gf256", "gf16"):
+            start = time.perf_counter()
+            key = TrapdoorKey.generate(M, N, K, field=field)
+            signer = MAYO_Signer(key)
+            keygen = time.perf_counter() - start
+            targets = [list(random_elements(M, field_order(field))) for _ in range(B)]
+
+            start = time.perf_counter()
+            signatures = signer.sign_batch(targets)
+            sign_time = time.perf_counter() - start
+            start = time.perf_counter()
+            _, valid = signer.verifier.verify_batch(signatures, targets)
+            verify_time = time.perf_counter() - start
+            assert valid.all()
+            print(f"{size:>7} {field or 'ring':>5} o={key.o}: keygen {keygen:6.2f} s | sign {B / sign_time:8.1f} sig/s "
+                  f"({signer.stats()['attempts_per_signature']:.2f} attempts each) | verify {B / verify_time:8.1f} sig/s")
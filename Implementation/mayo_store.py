@@ -0,0 +1,320 @@
+import mmap
+import os
+import struct
+
+from .mayo_utils import whipping_pairs, get_field, field_order, triangular_size, pack_upper_triangular
+from .mayo_primitives import MAYO_Simulator, LAYOUTS
+
+# --- 1. FILE FORMAT (version 1) ---
+# A store holds public keys and known-answer test vectors for one parameter set, one
+# byte per element, so every key and vector can be used straight from the file:
+#
+#   header   64 bytes (HEADER below, zero padded)
+#   keys     key_count records of key_stride bytes, starting at offset 64:
+#              P  M * N * N bytes, (M, N, N) row-major         (layout "full")
+#                 M * N(N+1)/2 bytes, packed upper triangles   (layout "upper")
+#              E  one (M, M) row-major matrix per whipping pair, in whipping_pairs(K) order
+#              zero padding up to a multiple of 64 bytes
+#   vectors  vector_count records, starting at the next multiple of 64:
+#              key index (uint32 little-endian), signature (N*K bytes), target (M bytes)
+#
+# All integers are little-endian. Readers reject other magics and newer versions.
+MAGIC = b"MAYOSTR\0"
+VERSION = 1
+ALIGN = 64
+# magic, version, header size, M, N, K, field name, layout, key_count, vector_count
+HEADER = struct.Struct("<8sHHIII8sB3xQQ")
+_KEY_INDEX = struct.Struct("<I")
+
+def _align(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+class StoreLayout:
+    """Sizes and offsets of a store with the given parameters."""
+    def __init__(self, M, N, K, field=None, layout="full"):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout '{layout}'. Choose from: {', '.join(LAYOUTS)}")
+        self.M, self.N, self.K = M, N, K
+        self.field = getattr(field, "name", field)
+        self.layout = layout
+        self.pairs = whipping_pairs(K)
+        self.P_size = M * (triangular_size(N) if layout == "upper" else N * N)
+        self.E_size = M * M
+        self.key_stride = _align(self.P_size + len(self.pairs) * self.E_size)
+        self.vector_stride = _KEY_INDEX.size + N * K + M
+
+    def key_offset(self, index):
+        return _align(HEADER.size) + index * self.key_stride
+
+    def vectors_offset(self, key_count):
+        return _align(self.key_offset(key_count))
+
+    def header(self, key_count, vector_count):
+        field = (self.field or "").encode("ascii")
+        return HEADER.pack(MAGIC, VERSION, _align(HEADER.size), self.M, self.N, self.K, field,
+                           LAYOUTS.index(self.layout), key_count, vector_count)
+
+
+# --- 2. WRITER ---
+
+def _flatten(values):
+    """Elements of a vector, matrix or stack of matrices (nested lists, array or bytes) as bytes."""
+    if hasattr(values, "tobytes"):
+        if values.dtype == "uint8":
+            return values.tobytes()
+        # Element by element: a cast to uint8 would wrap values that are out of range
+        return bytes(values.ravel().tolist())
+    if len(values) and isinstance(values[0], (list, tuple)):
+        return b"".join(_flatten(v) for v in values)
+    return bytes(values)
+
+def _element_bytes(values, count, what, order=256):
+    """The elements as bytes, checked against the expected count and the field order."""
+    try:
+        data = _flatten(values)
+    except (ValueError, TypeError):
+        raise ValueError(f"{what} holds values that are not integers in 0..255") from None
+    if len(data) != count:
+        raise ValueError(f"{what} holds {len(data)} elements, expected {count}")
+    if order < 256 and data and max(data) >= order:
+        raise ValueError(f"{what} holds values outside GF({order})")
+    return data
+
+class StoreWriter:
+    """
+    Writes a store file incrementally: all keys first, then the test vectors.
+    Only the record being written is held in memory.
+
+        with StoreWriter("kat.mayo", M, N, K) as w:
+            k = w.add_key(P_coeffs, E_matrices)
+            w.add_vector(k, signature, target)
+    """
+    def __init__(self, path, M, N, K, field=None, layout="full"):
+        self.spec = StoreLayout(M, N, K, field, layout)
+        self.field = get_field(field)
+        self.order = field_order(self.field)
+        self.key_count = 0
+        self.vector_count = 0
+        self._file = open(path, "wb")
+        self._file.write(self.spec.header(0, 0).ljust(_align(HEADER.size), b"\0"))
+
+    def add_key(self, P_coeffs, E_matrices):
+        """Appends a public key; returns its index."""
+        if self.vector_count:
+            raise ValueError("all keys must be added before the first test vector")
+        spec, order = self.spec, self.order
+        if spec.layout == "upper" and not isinstance(P_coeffs, (bytes, bytearray, memoryview)):
+            # Full matrices are checked, then packed here; bytes are taken as already packed
+            _element_bytes(P_coeffs, spec.M * spec.N * spec.N, "P", order)
+            P_coeffs = pack_upper_triangular(_as_lists(P_coeffs), self.field)
+        record = b"".join([_element_bytes(P_coeffs, spec.P_size, "P", order)] + [
+            _element_bytes(E_matrices[f"{i},{j}"], spec.E_size, f"E[{i},{j}]", order) for i, j in spec.pairs
+        ])
+        self._file.write(record.ljust(spec.key_stride, b"\0"))
+        self.key_count += 1
+        return self.key_count - 1
+
+    def add_vector(self, key_index, signature, target):
+        """Appends a (key index, signature, target) test vector."""
+        spec = self.spec
+        if not 0 <= key_index < self.key_count:
+            raise IndexError(f"key index {key_index} out of range for {self.key_count} keys")
+        if not self.vector_count:
+            self._file.write(b"\0" * (spec.vectors_offset(self.key_count) - self._file.tell()))
+        self._file.write(_KEY_INDEX.pack(key_index)
+                         + _element_bytes(signature, spec.N * spec.K, "signature", self.order)
+                         + _element_bytes(target, spec.M, "target", self.order))
+        self.vector_count += 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        if not self.vector_count:
+            self._file.write(b"\0" * (self.spec.vectors_offset(self.key_count) - self._file.tell()))
+        # Counts are only known now: rewrite the header in place
+        self._file.seek(0)
+        self._file.write(self.spec.header(self.key_count, self.vector_count))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _as_lists(matrix):
+    return matrix.tolist() if hasattr(matrix, "tolist") else matrix
+
+
+# --- 3. MEMORY-MAPPED READER ---
+
+class MayoStore:
+    """
+    Read-only, memory-mapped view of a store file.
+
+    Nothing is parsed or copied on open: keys and vectors are memoryviews (or NumPy
+    arrays) over the mapping, and the OS pages in only what is touched, so stores far
+    larger than RAM can be used.
+    """
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER.size:
+            self._file.close()
+            raise ValueError(f"{path}: too small to be a MAYO store")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buffer = memoryview(self._mmap)
+        try:
+            magic, version, header_size, M, N, K, field, layout, key_count, vector_count = HEADER.unpack_from(self.buffer)
+            if magic != MAGIC:
+                raise ValueError(f"{path}: not a MAYO store")
+            if version > VERSION:
+                raise ValueError(f"{path}: store version {version} is newer than supported ({VERSION})")
+            if layout >= len(LAYOUTS):
+                raise ValueError(f"{path}: unknown layout {layout}")
+            field = field.rstrip(b"\0").decode("ascii") or None
+            self.spec = StoreLayout(M, N, K, field, LAYOUTS[layout])
+            self.M, self.N, self.K, self.field, self.layout = M, N, K, field, LAYOUTS[layout]
+            self.key_count, self.vector_count = key_count, vector_count
+            self._vectors_offset = self.spec.vectors_offset(key_count)
+            needed = self._vectors_offset + vector_count * self.spec.vector_stride
+            if size < needed:
+                raise ValueError(f"{path}: truncated ({size} bytes, expected {needed})")
+        except Exception:
+            self.close()
+            raise
+
+    # Keys
+
+    def _key_parts(self, index):
+        if not 0 <= index < self.key_count:
+            raise IndexError(f"key index {index} out of range for {self.key_count} keys")
+        spec = self.spec
+        start = spec.key_offset(index)
+        P = self.buffer[start:start + spec.P_size]
+        E_start = start + spec.P_size
+        E = {
+            f"{i},{j}": self.buffer[E_start + p * spec.E_size: E_start + (p + 1) * spec.E_size]
+            for p, (i, j) in enumerate(spec.pairs)
+        }
+        return P, E
+
+    def key_buffers(self, index):
+        """P and the E matrices of key `index` as flat memoryviews into the file."""
+        return self._key_parts(index)
+
+    def key_arrays(self, index):
+        """
+        P as a (M, N, N) array ((M, N(N+1)/2) for the upper layout) and the E matrices as
+        (M, M) arrays, all zero-copy NumPy views of the mapping.
+        """
+        import numpy as np
+        P, E = self._key_parts(index)
+        P_shape = (self.M, -1) if self.layout == "upper" else (self.M, self.N, self.N)
+        return (np.frombuffer(P, dtype=np.uint8).reshape(P_shape),
+                {key: np.frombuffer(E_ij, dtype=np.uint8).reshape(self.M, self.M) for key, E_ij in E.items()})
+
+    def key_lists(self, index):
+        """
+        P_coeffs and E_matrices of key `index` in the form MAYO_Simulator computes on:
+        nested lists, except packed upper-triangular P, which stays a memoryview.
+        """
+        P, E = self._key_parts(index)
+        M, N = self.M, self.N
+        if self.layout == "upper":
+            P_coeffs = P
+        else:
+            P_coeffs = [[list(P[(m*N + r)*N:(m*N + r + 1)*N]) for r in range(N)] for m in range(M)]
+        E_matrices = {key: [list(E_ij[r*M:(r+1)*M]) for r in range(M)] for key, E_ij in E.items()}
+        return P_coeffs, E_matrices
+
+    def simulator(self, index, simulator_class=MAYO_Simulator, **options):
+        """
+        Simulator for key `index`, in the store's layout. NumPy-based simulators get
+        zero-copy array views. The pure-Python simulator reads packed upper-triangular
+        P in place; full P and the E matrices are converted to the lists it computes on.
+        """
+        if self.layout == "upper":
+            if options.setdefault("layout", "upper") != "upper":
+                raise ValueError(f"store holds packed upper-triangular keys, not layout '{options['layout']}'")
+            # Only simulators that take a layout option are given one
+            if "upper" not in getattr(simulator_class, "SUPPORTED_LAYOUTS", ("full",)):
+                raise ValueError(f"{simulator_class.__name__} cannot read packed upper-triangular keys")
+        if simulator_class.ACCEPTS_ARRAYS:
+            P_coeffs, E_matrices = self.key_arrays(index)
+        else:
+            P_coeffs, E_matrices = self.key_lists(index)
+        return simulator_class(P_coeffs, E_matrices, self.M, self.N, self.K, field=self.field, **options)
+
+    # Test vectors
+
+    def vector(self, index):
+        """(key index, signature, target) of vector `index`; signature and target are memoryviews."""
+        if not 0 <= index < self.vector_count:
+            raise IndexError(f"vector index {index} out of range for {self.vector_count} vectors")
+        start = self._vectors_offset + index * self.spec.vector_stride
+        (key_index,) = _KEY_INDEX.unpack_from(self.buffer, start)
+        sig_start = start + _KEY_INDEX.size
+        sig_end = sig_start + self.N * self.K
+        return key_index, self.buffer[sig_start:sig_end], self.buffer[sig_end:sig_end + self.M]
+
+    def vectors(self, start=0, stop=None):
+        """Iterates over (key index, signature, target) for vectors start..stop-1."""
+        stop = self.vector_count if stop is None else min(stop, self.vector_count)
+        for index in range(start, stop):
+            yield self.vector(index)
+
+    def vector_arrays(self):
+        """All vectors as a zero-copy NumPy structured array with fields key, signature, target."""
+        import numpy as np
+        dtype = np.dtype([("key", "<u4"), ("signature", np.uint8, (self.N * self.K,)), ("target", np.uint8, (self.M,))])
+        return np.frombuffer(self.buffer, dtype=dtype, count=self.vector_count, offset=self._vectors_offset)
+
+    def verify_vectors(self, simulator_class=MAYO_Simulator, batch_size=1024, **options):
+        """
+        Re-verifies every test vector against its key, batching consecutive vectors of the
+        same key. Returns the indices of the vectors whose target does not match.
+        """
+        failures = []
+        simulators = {}
+        index = 0
+        while index < self.vector_count:
+            key_index = self.vector(index)[0]
+            batch = []
+            for i in range(index, min(index + batch_size, self.vector_count)):
+                k, signature, target = self.vector(i)
+                if k != key_index:
+                    break
+                batch.append((list(signature), list(target)))
+            if key_index not in simulators:
+                simulators = {key_index: self.simulator(key_index, simulator_class, **options)}
+            _, valid = simulators[key_index].verify_batch([s for s, _ in batch], [t for _, t in batch])
+            failures.extend(index + i for i, ok in enumerate(valid) if not ok)
+            index += len(batch)
+        return failures
+
+    def close(self):
+        """
+        Closes the file and drops the store's mapping. Views handed out (arrays,
+        memoryviews, simulators on them) stay valid: while any is alive it keeps the
+        mapping, which is unmapped once the last of them is garbage collected.
+        """
+        buffer, mapping = getattr(self, "buffer", None), getattr(self, "_mmap", None)
+        self.buffer = self._mmap = None
+        try:
+            if buffer is not None:
+                buffer.release()
+            if mapping is not None:
+                mapping.close()
+        except BufferError:
+            # Views are still exported; they hold the only remaining references
+            pass
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -5,7 +5,7 @@ import random
 Q = 256  # Finite field size (F_256 or byte-based operations)
 DEFAULT_M = 4 # Number of equations (Hash size)
 DEFAULT_N = 6 # Size of signature blocks
-DEFAULT_K = 2 # Number of signature blocks (Simulator is limited to K=2 for bilinear terms)
+DEFAULT_K = 2 # Number of signature blocks
 
 # --- 2. Utility Functions ---
 
@@ -34,6 +34,59 @@ def vector_mod_q(vec):
     """Applies poly_eval_mod to every element of a vector."""
     return [poly_eval_mod(v) for v in vec]
 
+def whipping_pairs(K):
+    """
+    Lists the (i, j) block pairs (1-based, i <= j) of the whipped map for K blocks.
+    Each pair owns the E matrix stored under the key f"{i},{j}": the K pairs with
+    i == j whip the quadratic terms P(s_i), the K(K-1)/2 others the cross terms P'(s_i, s_j).
+    """
+    return [(i, j) for i in range(1, K + 1) for j in range(i, K + 1)]
+
+def triangular_size(N):
+    """Number of entries of an N x N upper triangle (diagonal included): N(N+1)/2."""
+    return N * (N + 1) // 2
+
+def upper_row_offsets(N):
+    """Start of row r inside one packed upper triangle; row r holds columns r..N-1."""
+    offsets, off = [], 0
+    for r in range(N):
+        offsets.append(off)
+        off += N - r
+    return offsets
+
+def pack_upper_triangular(P_coeffs, field=None):
+    """
+    Packs full P_i matrices into the canonical upper-triangular layout: one contiguous
+    buffer of M * N(N+1)/2 entries, equation-major, rows r = 0..N-1 each holding columns r..N-1.
+    Since x^T P x only depends on P + P^T, entry (r, c) with r < c stores P[r][c] + P[c][r]
+    and the diagonal stores P[r][r] (addition mod Q, or XOR in a field).
+    """
+    field = get_field(field)
+    out = bytearray()
+    for P_i in P_coeffs:
+        N = len(P_i)
+        for r in range(N):
+            if field is None:
+                row = [P_i[r][r] % Q] + [(P_i[r][c] + P_i[c][r]) % Q for c in range(r + 1, N)]
+            else:
+                row = [P_i[r][r]] + [P_i[r][c] ^ P_i[c][r] for c in range(r + 1, N)]
+            out += bytes(row) if field is None else field.reduce_vec(row)
+    return bytes(out)
+
+def unpack_upper_triangular(buf, M, N):
+    """
+    Expands a packed buffer back into M nested-list N x N matrices (zeros below the
+    diagonal). They define the same quadratic forms as the matrices that were packed.
+    """
+    T = triangular_size(N)
+    offsets = upper_row_offsets(N)
+    if len(buf) != M * T:
+        raise ValueError(f"packed buffer holds {len(buf)} entries, expected {M * T}")
+    return [
+        [[0] * r + list(buf[m*T + offsets[r]: m*T + offsets[r] + N - r]) for r in range(N)]
+        for m in range(M)
+    ]
+
 def array_to_string(arr):
     """Converts array elements to a formatted string, showing up to the first 10 bytes in hex."""
     if len(arr) > 10:
@@ -45,4 +98,172 @@ def array_to_string(arr):
     
     # Convert to hex representation
     hex_list = [f"{v:02x}" for v in display_arr]
-    return f"[{' '.join(hex_list)}]{suffix}"
\ No newline at end of file
+    return f"[{' '.join(hex_list)}]{suffix}"
+
+# --- 3. Binary Finite Fields GF(2^k) ---
+# The integer functions above reduce plain integer arithmetic mod Q, i.e. they work in the
+# ring Z/256, not in the field F_256. The tables below implement true field arithmetic:
+# addition is XOR and multiplication is polynomial multiplication modulo an irreducible
+# polynomial. Row routines work directly on bytes-like rows (bytes, bytearray, memoryview
+# or uint8 arrays) so that the inner loops run inside bytes.translate and big-int XOR.
+
+class BinaryField:
+    """GF(2^bits) with precomputed log/antilog tables and a full multiplication table."""
+    def __init__(self, name, bits, modulus, generator=2):
+        self.name = name
+        self.bits = bits
+        self.order = 1 << bits
+        self.modulus = modulus
+
+        # Antilog table: exp[i] = generator^i, doubled so exp[log a + log b] needs no reduction
+        self.exp = [0] * (2 * (self.order - 1))
+        self.log = [0] * self.order
+        value = 1
+        for i in range(self.order - 1):
+            self.exp[i] = value
+            self.log[value] = i
+            value = self._carryless_mul(value, generator)
+        if value != 1 or len(set(self.exp[:self.order - 1])) != self.order - 1:
+            raise ValueError(f"{generator} does not generate GF(2^{bits}) modulo {modulus:#x}")
+        for i in range(self.order - 1, len(self.exp)):
+            self.exp[i] = self.exp[i - (self.order - 1)]
+
+        # Full order x order multiplication table, row a holds a*b for every b. Row a > 0
+        # is the antilog table shifted by log a and read at log b: one bytes.translate per
+        # row instead of order^2 Python multiplications (this runs at import time).
+        logs = bytes(self.log[1:])
+        rows = [bytes(self.order)]
+        for a in range(1, self.order):
+            shifted = bytes(self.exp[self.log[a]:self.log[a] + self.order - 1]) + bytes(257 - self.order)
+            rows.append(b"\0" + logs.translate(shifted))
+        self.mul_table = b"".join(rows)
+        # One 256-byte translation table per scalar for bytes.translate (scalar * row)
+        self.mul_rows = [
+            self.mul_table[c * self.order:(c + 1) * self.order] + bytes(256 - self.order)
+            for c in range(self.order)
+        ]
+
+    def _carryless_mul(self, a, b):
+        """Multiplies two field elements bit by bit, reducing by the field polynomial."""
+        result = 0
+        while b:
+            if b & 1:
+                result ^= a
+            b >>= 1
+            a <<= 1
+            if a & self.order:
+                a ^= self.modulus
+        return result
+
+    def _log_mul(self, a, b):
+        if a == 0 or b == 0:
+            return 0
+        return self.exp[self.log[a] + self.log[b]]
+
+    def add(self, a, b):
+        """Field addition (and subtraction) is XOR."""
+        return a ^ b
+
+    def mul(self, a, b):
+        return self.mul_table[a * self.order + b]
+
+    def inv(self, a):
+        if a == 0:
+            raise ZeroDivisionError("0 has no inverse in a field")
+        return self.exp[(self.order - 1) - self.log[a]]
+
+    def reduce_vec(self, vec):
+        """
+        Checks a vector holds field elements and returns it as bytes. Only byte buffers
+        are taken as raw memory; anything else (lists, int64 arrays, ...) is read element
+        by element, so wider integers are range-checked instead of reinterpreted.
+        """
+        if isinstance(vec, (bytes, bytearray)):
+            data = bytes(vec)
+        elif isinstance(vec, (list, tuple)):
+            data = self._element_bytes(vec)
+        else:
+            try:
+                view = memoryview(vec)
+            except TypeError:
+                view = None
+            if view is not None and view.format == 'B':
+                data = view.tobytes()
+            else:
+                data = self._element_bytes(vec.tolist() if hasattr(vec, "tolist") else list(vec))
+        if self.order < 256 and data and max(data) >= self.order:
+            raise ValueError(f"vector holds values outside GF({self.order})")
+        return data
+
+    def _element_bytes(self, values):
+        try:
+            # bytes() takes integers only (no floats) and rejects values outside 0..255
+            return bytes(values)
+        except ValueError:
+            raise ValueError(f"vector holds values outside GF({self.order})") from None
+
+    def scale(self, row, c):
+        """Multiplies every element of a bytes-like row by the scalar c."""
+        return bytes(row).translate(self.mul_rows[c])
+
+    def add_rows(self, a, b):
+        """Element-wise XOR of two equal-length rows."""
+        n = len(a)
+        return (int.from_bytes(a, 'little') ^ int.from_bytes(b, 'little')).to_bytes(n, 'little')
+
+    def dot(self, a, b):
+        """Inner product of two rows, returned as a single field element."""
+        result = 0
+        mul_table, order = self.mul_table, self.order
+        for x, y in zip(a, b):
+            result ^= mul_table[x * order + y]
+        return result
+
+    def vecmat(self, rows, x):
+        """
+        Row-vector times matrix: x^T * A = XOR_i x_i * A_i, for A given as a list of rows.
+        Each term is one bytes.translate over a whole row; accumulation is one big-int XOR.
+        """
+        width = len(rows[0])
+        acc = 0
+        for row, c in zip(rows, x):
+            if c:
+                acc ^= int.from_bytes(bytes(row).translate(self.mul_rows[c]), 'little')
+        return acc.to_bytes(width, 'little')
+
+    def matvec(self, A, x):
+        """Matrix times column-vector A * x, computed as x^T * A^T."""
+        return self.vecmat(transpose_rows(A), x)
+
+def transpose_rows(A):
+    """Transposes a matrix given as rows (lists or bytes-like) into a list of bytes columns."""
+    return [bytes(col) for col in zip(*A)]
+
+# Byte-sized field matching the Q=256 element range of the simulator
+# (primitive polynomial x^8 + x^4 + x^3 + x^2 + 1, generator x).
+GF256 = BinaryField("gf256", 8, 0x11D)
+
+# Field of the reference MAYO specification: GF(16) with x^4 + x + 1, generator x.
+GF16 = BinaryField("gf16", 4, 0x13)
+
+FIELDS = {
+    GF256.name: GF256,
+    GF16.name: GF16,
+}
+
+def get_field(field):
+    """
+    Resolves a field selection. None keeps the original integer arithmetic mod Q;
+    a name from FIELDS (or a BinaryField instance) selects true finite-field arithmetic.
+    """
+    if field is None or isinstance(field, BinaryField):
+        return field
+    try:
+        return FIELDS[field]
+    except KeyError:
+        raise ValueError(f"Unknown field '{field}'. Choose from: {', '.join(FIELDS)}") from None
+
+def field_order(field):
+    """Number of distinct element values for a field selection (Q for the integer ring)."""
+    field = get_field(field)
+    return Q if field is None else field.order
\ No newline at end of file
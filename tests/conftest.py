@@ -0,0 +1,9 @@
+import random
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def seeded():
+    """Every test draws its keys and signatures from the same `random` stream."""
+    random.seed(1234)
@@ -0,0 +1,32 @@
+"""backend="auto" weighs the work against NumPy's import cost until NumPy is loaded."""
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy  # noqa: F401  (the in-process checks below run with NumPy loaded)
+
+from Implementation.mayo_backends import select_backend
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run(code):
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+
+def test_demo_sizes_stay_pure_python_without_numpy():
+    code = ("import sys; from Implementation.mayo_backends import load_backend; "
+            "print(load_backend('auto', 4, 6, 2).__name__, load_backend('auto', 4, 6, 2, batch_size=256).__name__, "
+            "'numpy' in sys.modules)")
+    out = run(code)
+    assert out.split() == ["MAYO_Simulator", "MAYO_Simulator", "False"]
+
+def test_large_work_pays_for_the_import():
+    code = "from Implementation.mayo_backends import select_backend; print(select_backend(78, 86, 10))"
+    out = run(code)
+    assert out.strip() == "numpy"
+
+def test_loaded_numpy_uses_the_measured_crossovers():
+    assert select_backend(4, 6, 2) == "numpy"
+    assert select_backend(3, 4, 2) == "python"
+    assert select_backend(12, 16, 2, "gf256") == "python"
+    assert select_backend(12, 16, 2, "gf256", batch_size=2) == "numpy"
@@ -0,0 +1,19 @@
+"""The benchmark checks every backend against the first one on a shared key."""
+import pytest
+
+from Implementation.mayo_benchmark import bench_case
+
+
+def test_backends_sharing_a_field_reuse_one_key_and_target():
+    keys = {}
+    results = [bench_case("demo", backend, batch_size=4, min_time=0, keys=keys) for backend in ("python", "numpy")]
+    assert results[0]["keygen_s"] == results[1]["keygen_s"]
+    assert keys[("demo", None)]["target"][0] == "python"
+
+def test_disagreeing_backend_is_reported():
+    keys = {}
+    bench_case("demo", "python", batch_size=4, min_time=0, keys=keys)
+    backend, target = keys[("demo", None)]["target"]
+    keys[("demo", None)]["target"] = (backend, [(v + 1) % 256 for v in target])
+    with pytest.raises(AssertionError, match="disagrees with python"):
+        bench_case("demo", "numpy", batch_size=4, min_time=0, keys=keys)
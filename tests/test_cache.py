@@ -0,0 +1,79 @@
+"""Prepared keys are cached per (key, class, options), evicted LRU and prepared once."""
+import threading
+import time
+
+import numpy as np
+
+from Implementation.mayo_primitives import MAYO_Simulator
+from Implementation.mayo_numpy import MAYO_NumpySimulator
+from Implementation.mayo_data_setup import SeededPublicKey, generate_mayo_test_parameters
+from Implementation.mayo_cache import PreparedKeyCache, SimulatorFactory, key_fingerprint, prepared_nbytes
+
+M, N, K = 6, 5, 2
+
+
+def test_fingerprint_ignores_the_container():
+    P, E, _, _ = generate_mayo_test_parameters(M, N, K, False)
+    arrays = np.array(P, dtype=np.uint8), {key: np.array(E_ij, dtype=np.uint8) for key, E_ij in E.items()}
+    assert key_fingerprint(P, E, M, N, K) == key_fingerprint(*arrays, M, N, K)
+    assert key_fingerprint(P, E, M, N, K) != key_fingerprint(P, E, M, N, K, field="gf256")
+
+def test_least_recently_used_key_is_evicted():
+    keys = [SeededPublicKey.generate(M, N, K) for _ in range(3)]
+    size = prepared_nbytes(MAYO_NumpySimulator.from_key(keys[0]))
+    factory = SimulatorFactory(MAYO_NumpySimulator, max_bytes=int(2.5 * size))
+    first = factory.from_key(keys[0])
+    factory.from_key(keys[1])
+    assert factory.from_key(keys[0]) is first
+    # keys[1] is now the least recently used
+    factory.from_key(keys[2])
+    stats = factory.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (1, 3, 1, 2)
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert factory.from_key(keys[0]) is first
+    assert factory.from_key(keys[1]) is not None
+    assert factory.stats()["misses"] == 4
+
+def test_oversized_simulator_is_returned_but_not_cached():
+    factory = SimulatorFactory(MAYO_NumpySimulator, max_bytes=1)
+    key = SeededPublicKey.generate(M, N, K)
+    assert factory.from_key(key) is not factory.from_key(key)
+    assert factory.stats()["entries"] == 0
+
+def test_classes_and_options_are_cached_separately():
+    cache = PreparedKeyCache()
+    key = SeededPublicKey.generate(M, N, K)
+    simulators = [
+        SimulatorFactory(MAYO_Simulator, cache=cache).from_key(key),
+        SimulatorFactory(MAYO_NumpySimulator, cache=cache).from_key(key),
+        SimulatorFactory(MAYO_NumpySimulator, cache=cache, layout="upper").from_key(key),
+    ]
+    assert len(cache) == 3
+    assert [type(s) for s in simulators] == [MAYO_Simulator, MAYO_NumpySimulator, MAYO_NumpySimulator]
+
+def test_ring_sums_above_256_are_counted():
+    P, E, _, _ = generate_mayo_test_parameters(M, N, K, False)
+    simulator = MAYO_Simulator(P, E, M, N, K)
+    # A copy of the same lists holding only small (shared) ints is smaller
+    small = MAYO_Simulator([[[v % 128 for v in row] for row in P_m] for P_m in P], E, M, N, K)
+    assert prepared_nbytes(simulator) > prepared_nbytes(small)
+
+def test_concurrent_callers_prepare_once():
+    cache = PreparedKeyCache()
+    calls = []
+
+    def prepare():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_prepare("key", prepare)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len(set(map(id, results))) == 1
+    assert (cache.stats()["misses"], cache.stats()["hits"]) == (1, 7)
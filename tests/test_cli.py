@@ -0,0 +1,58 @@
+"""The headless CLI: generate/verify round trips and malformed input (exit code 2)."""
+import json
+
+import pytest
+
+from Implementation.mayo_cli import main
+
+
+def run(tmp_path, command, *argv):
+    out = tmp_path / f"{command}.out"
+    return main([command, *argv, "-o", str(out)]), out
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "binary"])
+@pytest.mark.parametrize("field", [None, "gf16"])
+def test_generated_records_verify(tmp_path, fmt, field):
+    options = ["--format", fmt] + (["--field", field] if field else [])
+    code, records = run(tmp_path, "generate", "--count", "40", "--keys", "3", "--invalid-fraction", "0",
+                        "--seed", "5", "--batch-size", "7", *options)
+    assert code == 0
+    code, results = run(tmp_path, "verify", str(records), *options)
+    assert code == 0
+    assert [json.loads(line)["valid"] for line in results.read_text().splitlines()] == [True] * 40
+
+def test_invalid_records_exit_1(tmp_path):
+    code, records = run(tmp_path, "generate", "--count", "30", "--invalid-fraction", "1", "--seed", "2")
+    code, results = run(tmp_path, "verify", str(records))
+    assert code == 1
+    assert not any(json.loads(line)["valid"] for line in results.read_text().splitlines())
+
+@pytest.mark.parametrize("record", [
+    '{"key_id": 5, "signature": [1], "target": [1]}',
+    '{"key_id": "00", "signature": [1.5], "target": [1]}',
+    '{"key_id": "00", "signature": [1], "target": [300]}',
+    '{"key_id": "00", "signature": [true], "target": [1]}',
+    '{"key_id": "00", "signature": 7, "target": [1]}',
+    '{"key_id": "00", "signature": [1]}',
+    'not json',
+])
+def test_malformed_jsonl_exits_2(tmp_path, record, capsys):
+    path = tmp_path / "records.jsonl"
+    path.write_text(record + "\n")
+    code, _ = run(tmp_path, "verify", str(path))
+    assert code == 2
+    assert "line 1" in capsys.readouterr().err
+
+def test_wrong_lengths_and_seeds_exit_2(tmp_path):
+    path = tmp_path / "records.jsonl"
+    path.write_text(json.dumps({"key_id": "00" * 16, "signature": [1, 2], "target": [1, 2, 3, 4]}) + "\n")
+    assert run(tmp_path, "verify", str(path))[0] == 2
+    path.write_text(json.dumps({"key_id": "00", "signature": [0] * 12, "target": [0] * 4}) + "\n")
+    assert run(tmp_path, "verify", str(path))[0] == 2
+
+def test_truncated_binary_exits_2(tmp_path):
+    code, records = run(tmp_path, "generate", "--count", "2", "--format", "binary", "--seed", "1")
+    truncated = tmp_path / "truncated.bin"
+    truncated.write_bytes(records.read_bytes()[:-3])
+    assert run(tmp_path, "verify", "--format", "binary", str(truncated))[0] == 2
@@ -0,0 +1,44 @@
+"""Inputs given as NumPy arrays of any integer width mean the same as lists."""
+import numpy as np
+import pytest
+
+from Implementation.mayo_utils import GF16, GF256
+from Implementation.mayo_primitives import MAYO_Simulator
+from Implementation.mayo_data_setup import generate_mayo_test_parameters
+
+M, N, K = 5, 6, 2
+
+
+@pytest.mark.parametrize("field", [GF256, GF16])
+@pytest.mark.parametrize("dtype", [np.uint8, np.int64])
+def test_reduce_vec_reads_arrays_element_by_element(field, dtype):
+    values = [0, 1, 7, field.order - 1]
+    assert field.reduce_vec(np.array(values, dtype=dtype)) == bytes(values)
+    assert field.reduce_vec(values) == bytes(values)
+
+@pytest.mark.parametrize("field", [GF256, GF16])
+@pytest.mark.parametrize("bad", [[1, field_order] for field_order in (256, -1)] + [[1.5]])
+def test_reduce_vec_rejects_non_elements(field, bad):
+    with pytest.raises((ValueError, TypeError)):
+        field.reduce_vec(bad)
+    if not isinstance(bad[0], float):
+        with pytest.raises(ValueError):
+            field.reduce_vec(np.array(bad, dtype=np.int64))
+
+def test_gf16_rejects_bytes_above_15():
+    with pytest.raises(ValueError):
+        GF16.reduce_vec(np.array([3, 16], dtype=np.int64))
+
+@pytest.mark.parametrize("field", [None, "gf256", "gf16"])
+@pytest.mark.parametrize("layout", ["full", "upper"])
+def test_int64_arrays_match_lists(field, layout):
+    P, E, s, t = generate_mayo_test_parameters(M, N, K, True, field=field)
+    reference = MAYO_Simulator(P, E, M, N, K, field=field, layout=layout)
+    from_arrays = MAYO_Simulator(np.array(P, dtype=np.int64), {key: np.array(E_ij, dtype=np.int64) for key, E_ij in E.items()},
+                                 M, N, K, field=field, layout=layout)
+    x, y = s[:N], s[N:2 * N]
+    assert reference.P_eval(np.array(x)) == reference.P_eval(x)
+    assert reference.P_prime(np.array(x), np.array(y)) == reference.P_prime(x, y)
+    assert from_arrays.P_star_eval(s, N * K) == t
+    _, valid = reference.verify_batch(np.array([s, s]), np.array([t, t]))
+    assert [bool(v) for v in valid] == [True, True]
@@ -0,0 +1,58 @@
+"""The nibble-packed GF(16) engine agrees with MAYO_Simulator(field="gf16")."""
+import random
+
+import numpy as np
+import pytest
+
+from Implementation.mayo_utils import pack_upper_triangular
+from Implementation.mayo_primitives import MAYO_Simulator
+from Implementation import mayo_gf16
+from Implementation.mayo_gf16 import MAYO_PackedSimulator, pack_m_vectors, unpack_m_vectors
+from Implementation.mayo_data_setup import generate_mayo_test_parameters
+
+# M = 17 and 33 span two and three limbs
+SHAPES = [(3, 4, 2), (5, 7, 3), (17, 6, 2), (33, 9, 3)]
+
+
+def random_signatures(count, length):
+    return [[random.randrange(16) for _ in range(length)] for _ in range(count)]
+
+@pytest.mark.parametrize("M", [1, 16, 17, 40])
+def test_m_vectors_round_trip(M):
+    values = np.random.default_rng(M).integers(0, 16, size=(3, M))
+    assert np.array_equal(unpack_m_vectors(pack_m_vectors(values), M), values)
+    assert unpack_m_vectors(pack_m_vectors(values[:0]), M).shape == (0, M)
+
+@pytest.mark.parametrize("layout", ["full", "upper"])
+@pytest.mark.parametrize("M,N,K", SHAPES)
+def test_packed_matches_reference(M, N, K, layout):
+    P, E, _, _ = generate_mayo_test_parameters(M, N, K, False, field="gf16")
+    reference = MAYO_Simulator(P, E, M, N, K, field="gf16")
+    S = random_signatures(40, N * K)
+    expected = [reference.P_star_eval(s, N * K) for s in S]
+    keys = [P] + ([pack_upper_triangular(P, "gf16")] if layout == "upper" else [])
+    for P_given in keys:
+        packed = MAYO_PackedSimulator(P_given, E, M, N, K, layout=layout)
+        x, y = S[0][:N], S[1][:N]
+        assert packed.P_eval(x) == reference.P_eval(x)
+        assert packed.P_prime(x, y) == reference.P_prime(x, y)
+        assert [packed.P_star_eval(s, N * K) for s in S] == expected
+        assert packed.P_star_eval_batch(S).tolist() == expected
+        assert list(packed.P_star_trace(S[0], N * K)["T"]) == expected[0]
+
+def test_row_combinations_chunking(monkeypatch):
+    P, E, _, _ = generate_mayo_test_parameters(17, 6, 2, False, field="gf16")
+    packed = MAYO_PackedSimulator(P, E, 17, 6, 2)
+    S = random_signatures(9, 12)
+    expected = packed.P_star_eval_batch(S).tolist()
+    # Chunks of one and of two rows of X, the last one short
+    for rows in (1, 2):
+        monkeypatch.setattr(mayo_gf16, "ROW_CHUNK_BYTES", rows * packed.P_packed.nbytes)
+        assert packed.P_star_eval_batch(S).tolist() == expected
+
+def test_empty_batch():
+    P, E, _, _ = generate_mayo_test_parameters(17, 6, 2, False, field="gf16")
+    packed = MAYO_PackedSimulator(P, E, 17, 6, 2)
+    assert packed.P_star_eval_batch([]).shape == (0, 17)
+    outputs, valid = packed.verify_batch(np.zeros((0, 12), dtype=np.uint8), [])
+    assert outputs.shape == (0, 17) and valid.shape == (0,)
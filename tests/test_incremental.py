@@ -0,0 +1,56 @@
+"""Incremental updates of P*(s) match evaluating the changed signature from scratch."""
+import random
+
+import pytest
+
+from Implementation.mayo_utils import field_order
+from Implementation.mayo_primitives import MAYO_Simulator
+from Implementation.mayo_numpy import MAYO_NumpySimulator
+from Implementation.mayo_data_setup import generate_mayo_test_parameters
+from Implementation.mayo_incremental import IncrementalEvaluator, key_columns
+
+FIELDS = [None, "gf256", "gf16"]
+M, N, K = 5, 6, 3
+
+
+@pytest.mark.parametrize("field", FIELDS)
+@pytest.mark.parametrize("simulator_class", [MAYO_Simulator, MAYO_NumpySimulator])
+def test_incremental_updates_match_recompute(field, simulator_class):
+    P, E, _, _ = generate_mayo_test_parameters(M, N, K, False, field=field)
+    simulator = simulator_class(P, E, M, N, K, field=field)
+    reference = MAYO_Simulator(P, E, M, N, K, field=field)
+    order = field_order(field)
+    s = [random.randrange(order) for _ in range(N * K)]
+    evaluator = IncrementalEvaluator(simulator, s)
+    for _ in range(30):
+        index, value = random.randrange(N * K), random.randrange(order)
+        s[index] = value
+        assert evaluator.update(index, value) == reference.P_star_eval(s, N * K)
+    changes = [(random.randrange(N * K), random.randrange(order)) for _ in range(10)]
+    for index, value in changes:
+        s[index] = value
+    assert evaluator.update_many(changes) == reference.P_star_eval(s, N * K)
+    trace = reference.P_star_trace(s, N * K)
+    assert {name: trace[name] for name in ("block_outputs", "cross_terms", "T")} == \
+        {name: evaluator.trace()[name] for name in ("block_outputs", "cross_terms", "T")}
+
+@pytest.mark.parametrize("field", FIELDS)
+def test_evaluators_share_key_columns(field):
+    P, E, _, _ = generate_mayo_test_parameters(M, N, K, False, field=field)
+    simulator = MAYO_Simulator(P, E, M, N, K, field=field)
+    columns = key_columns(simulator)
+    order = field_order(field)
+    for _ in range(3):
+        s = [random.randrange(order) for _ in range(N * K)]
+        evaluator = IncrementalEvaluator(simulator, s, columns=columns)
+        assert evaluator.update(0, 1) == evaluator.recompute()
+
+def test_bad_updates_are_rejected():
+    P, E, _, _ = generate_mayo_test_parameters(M, N, K, False, field="gf16")
+    evaluator = IncrementalEvaluator(MAYO_Simulator(P, E, M, N, K, field="gf16"), [0] * (N * K))
+    with pytest.raises(IndexError):
+        evaluator.update(N * K, 1)
+    with pytest.raises(ValueError):
+        evaluator.update(0, 16)
+    with pytest.raises(ValueError):
+        IncrementalEvaluator(evaluator.simulator, [0] * (N * K - 1))
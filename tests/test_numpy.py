@@ -0,0 +1,108 @@
+"""
+The NumPy engine gives exactly what MAYO_Simulator gives, and both follow the textbook
+formulas for P, P' and P*.
+"""
+import random
+
+import pytest
+
+from Implementation.mayo_utils import Q, field_order, get_field
+from Implementation.mayo_primitives import MAYO_Simulator
+from Implementation.mayo_numpy import MAYO_NumpySimulator
+from Implementation.mayo_data_setup import generate_mayo_test_parameters
+
+FIELDS = [None, "gf256", "gf16"]
+SHAPES = [(3, 4, 2), (5, 7, 3), (17, 6, 2)]
+
+
+def random_signatures(count, length, field):
+    order = field_order(field)
+    return [[random.randrange(order) for _ in range(length)] for _ in range(count)]
+
+def as_lists(values):
+    return [[int(v) for v in row] for row in values]
+
+
+# --- 1. BASELINE FORMULAS ---
+# Written out element by element, independently of both engines:
+#   P(x)[m]  = SUM_{r,c} x_r P_m[r][c] x_c
+#   P'(x, y) = P(x + y) - P(x) - P(y)
+#   P*(s)    = SUM_i E_ii P(s_i) + SUM_{i<j} E_ij P'(s_i, s_j)
+
+class Baseline:
+    def __init__(self, P, E, M, N, K, field):
+        self.P, self.E, self.M, self.N, self.K = P, E, M, N, K
+        F = get_field(field)
+        if F is None:
+            self.add = lambda a, b: (a + b) % Q
+            self.sub = lambda a, b: (a - b) % Q
+            self.mul = lambda a, b: a * b % Q
+        else:
+            self.add = self.sub = lambda a, b: a ^ b
+            self.mul = F.mul
+
+    def total(self, values):
+        result = 0
+        for v in values:
+            result = self.add(result, v)
+        return result
+
+    def P_eval(self, x):
+        return [self.total(self.mul(self.mul(x[r], P_m[r][c]), x[c]) for r in range(self.N) for c in range(self.N))
+                for P_m in self.P]
+
+    def P_prime(self, x, y):
+        xy = [self.add(a, b) for a, b in zip(x, y)]
+        return [self.sub(self.sub(a, b), c) for a, b, c in zip(self.P_eval(xy), self.P_eval(x), self.P_eval(y))]
+
+    def whip(self, E, v):
+        return [self.total(self.mul(E_r[c], v[c]) for c in range(self.M)) for E_r in E]
+
+    def P_star_eval(self, s):
+        blocks = [s[i * self.N:(i + 1) * self.N] for i in range(self.K)]
+        T = [0] * self.M
+        for i in range(1, self.K + 1):
+            for j in range(i, self.K + 1):
+                term = self.P_eval(blocks[i - 1]) if i == j else self.P_prime(blocks[i - 1], blocks[j - 1])
+                T = [self.add(a, b) for a, b in zip(T, self.whip(self.E[f"{i},{j}"], term))]
+        return T
+
+@pytest.mark.parametrize("field", FIELDS)
+def test_engines_follow_the_baseline_formulas(field):
+    M, N, K = 4, 5, 3
+    # A fixed key, independent of the global random state
+    rng = random.Random(20240601)
+    order = field_order(field)
+    P = [[[rng.randrange(order) for _ in range(N)] for _ in range(N)] for _ in range(M)]
+    E = {f"{i},{j}": [[rng.randrange(order) for _ in range(M)] for _ in range(M)]
+         for i in range(1, K + 1) for j in range(i, K + 1)}
+    S = [[rng.randrange(order) for _ in range(N * K)] for _ in range(6)]
+    baseline = Baseline(P, E, M, N, K, field)
+    for simulator in (MAYO_Simulator(P, E, M, N, K, field=field), MAYO_NumpySimulator(P, E, M, N, K, field=field)):
+        label = type(simulator).__name__
+        for x, y in zip(S, S[1:]):
+            x, y = x[:N], y[N:2 * N]
+            assert list(simulator.P_eval(x)) == baseline.P_eval(x), label
+            assert list(simulator.P_prime(x, y)) == baseline.P_prime(x, y), label
+        assert [list(simulator.P_star_eval(s, N * K)) for s in S] == [baseline.P_star_eval(s) for s in S], label
+
+
+# --- 2. NUMPY ENGINE AGAINST THE REFERENCE ---
+
+@pytest.mark.parametrize("field", FIELDS)
+@pytest.mark.parametrize("M,N,K", SHAPES)
+def test_numpy_matches_reference(M, N, K, field):
+    P, E, _, _ = generate_mayo_test_parameters(M, N, K, False, field=field)
+    reference = MAYO_Simulator(P, E, M, N, K, field=field)
+    simulator = MAYO_NumpySimulator(P, E, M, N, K, field=field)
+    S = random_signatures(8, N * K, field)
+    x, y = S[0][:N], S[1][:N]
+    expected = [reference.P_star_eval(s, N * K) for s in S]
+    assert list(simulator.P_eval(x)) == reference.P_eval(x)
+    assert list(simulator.P_prime(x, y)) == reference.P_prime(x, y)
+    assert [list(simulator.P_star_eval(s, N * K)) for s in S] == expected
+    assert as_lists(simulator.P_star_eval_batch(S)) == expected
+    assert list(simulator.P_star_trace(S[0], N * K)["T"]) == expected[0]
+    outputs, valid = simulator.verify_batch(S, expected[:1] * len(S))
+    assert as_lists(outputs) == expected
+    assert list(valid) == [row == expected[0] for row in expected]
@@ -0,0 +1,54 @@
+"""verify_parallel gives what verify_batch gives, from full or packed upper-triangular keys."""
+import random
+
+import pytest
+
+from Implementation.mayo_utils import field_order, pack_upper_triangular, triangular_size
+from Implementation.mayo_primitives import MAYO_Simulator
+from Implementation.mayo_numpy import MAYO_NumpySimulator
+from Implementation.mayo_data_setup import SeededPublicKey, generate_mayo_test_parameters
+from Implementation.mayo_parallel import SharedPublicKey, verify_parallel
+
+M, N, K = 6, 5, 2
+
+
+def signatures_and_targets(simulator, field, count=20):
+    order = field_order(field)
+    S = [[random.randrange(order) for _ in range(N * K)] for _ in range(count)]
+    T = [[int(v) for v in row] for row in simulator.P_star_eval_batch(S)]
+    for row in T[::3]:
+        row[0] = (row[0] + 1) % order
+    return S, T
+
+@pytest.mark.parametrize("field", [None, "gf16"])
+@pytest.mark.parametrize("layout", ["full", "upper"])
+def test_parallel_matches_serial(field, layout):
+    key = SeededPublicKey.generate(M, N, K, field=field)
+    reference = MAYO_NumpySimulator.from_key(key)
+    S, T = signatures_and_targets(reference, field)
+    outputs, expected = reference.verify_batch(S, T)
+    parallel_outputs, valid = verify_parallel(key, S, T, workers=2, chunk_size=3, layout=layout)
+    assert valid.tolist() == expected.tolist()
+    assert parallel_outputs.tolist() == outputs.tolist()
+    # The pure-Python engine gets list (or packed bytes) copies of the shared key
+    _, valid = verify_parallel(key, S, T, workers=1, simulator_class=MAYO_Simulator, layout=layout)
+    assert list(valid) == expected.tolist()
+
+@pytest.mark.parametrize("field", [None, "gf256"])
+def test_packed_upper_key_is_shared_as_is(field):
+    P, E, _, _ = generate_mayo_test_parameters(M, N, K, False, field=field)
+    packed = pack_upper_triangular(P, field)
+    reference = MAYO_Simulator(P, E, M, N, K, field=field)
+    S, T = signatures_and_targets(reference, field)
+    _, expected = reference.verify_batch(S, T)
+    with SharedPublicKey.create(packed, E, M, N, K, field=field, layout="upper") as shared:
+        assert shared.P.shape == (M, triangular_size(N))
+        assert shared.P.tobytes() == packed
+        _, valid = verify_parallel(shared, S, T, workers=2)
+        assert valid.tolist() == list(expected)
+        with pytest.raises(ValueError):
+            shared.simulator(layout="full")
+    # An upper-layout simulator on a packed key can be shared directly
+    simulator = MAYO_Simulator(packed, E, M, N, K, field=field, layout="upper")
+    _, valid = verify_parallel(simulator, S, T, workers=1)
+    assert valid.tolist() == list(expected)
@@ -0,0 +1,51 @@
+"""Screening finds exactly the signatures verify_batch rejects."""
+import random
+
+import pytest
+
+from Implementation.mayo_utils import field_order
+from Implementation.mayo_primitives import MAYO_Simulator
+from Implementation.mayo_numpy import MAYO_NumpySimulator
+from Implementation.mayo_data_setup import generate_mayo_test_parameters
+from Implementation.mayo_screening import screen_verify
+
+M, N, K = 6, 5, 2
+
+
+def batch(field, count=100, bad=5):
+    P, E, _, _ = generate_mayo_test_parameters(M, N, K, False, field=field)
+    simulator = MAYO_NumpySimulator(P, E, M, N, K, field=field)
+    order = field_order(field)
+    S = [[random.randrange(order) for _ in range(N * K)] for _ in range(count)]
+    T = simulator.P_star_eval_batch(S).tolist()
+    for b in random.sample(range(count), bad):
+        # The ring's hardest error: 128 is cancelled by every even coefficient
+        T[b][random.randrange(M)] ^= 128 if field is None else 1
+    _, expected = MAYO_Simulator(P, E, M, N, K, field=field).verify_batch(S, T)
+    return simulator, S, T, [bool(v) for v in expected]
+
+@pytest.mark.parametrize("field,rounds", [(None, None), (None, 40), ("gf256", None), ("gf16", None)])
+def test_screening_matches_verify_batch(field, rounds):
+    simulator, S, T, expected = batch(field)
+    valid, _ = screen_verify(simulator, S, T, rounds=rounds, leaf_size=4, seed=7)
+    assert valid == expected
+
+def test_ring_verifies_directly_unless_rounds_are_given():
+    simulator, S, T, expected = batch(None)
+    valid, stats = screen_verify(simulator, S, T)
+    assert valid == expected
+    assert (stats["screens"], stats["individual"]) == (0, len(S))
+
+@pytest.mark.parametrize("field", ["gf256", "gf16"])
+def test_all_valid_batch_is_one_screen(field):
+    simulator, S, T, expected = batch(field, bad=0)
+    valid, stats = screen_verify(simulator, S, T, leaf_size=4, seed=1)
+    assert valid == expected == [True] * len(S)
+    assert (stats["screens"], stats["individual"]) == (1, 0)
+
+def test_invalid_arguments():
+    simulator, S, T, _ = batch("gf16", count=4, bad=0)
+    with pytest.raises(ValueError):
+        screen_verify(simulator, S, T[:3])
+    with pytest.raises(ValueError):
+        screen_verify(simulator, S, T, leaf_size=0)
@@ -0,0 +1,41 @@
+"""Seeded keys expand deterministically and evaluate like their nested lists."""
+import random
+
+import pytest
+
+from Implementation.mayo_utils import field_order
+from Implementation.mayo_primitives import MAYO_Simulator
+from Implementation.mayo_numpy import MAYO_NumpySimulator
+from Implementation.mayo_data_setup import SeededPublicKey
+
+FIELDS = [None, "gf256", "gf16"]
+M, N, K = 6, 5, 2
+
+
+@pytest.mark.parametrize("field", FIELDS)
+def test_seeded_key_matches_its_lists(field):
+    key = SeededPublicKey.generate(M, N, K, field=field)
+    order = field_order(field)
+    S = [[random.randrange(order) for _ in range(N * K)] for _ in range(4)]
+    expected = MAYO_Simulator(key.P_coeffs, key.E_matrices, M, N, K, field=field).P_star_eval_batch(S)
+    assert MAYO_NumpySimulator.from_key(key).P_star_eval_batch(S).tolist() == [list(row) for row in expected]
+
+@pytest.mark.parametrize("field", FIELDS)
+def test_expansion_is_deterministic_and_in_range(field):
+    key = SeededPublicKey.generate(M, N, K, field=field)
+    again = SeededPublicKey(key.key_id, M, N, K, field=field)
+    assert again.expand_P_bytes() == key.expand_P_bytes()
+    assert again.E_bytes(1, 2) == key.E_bytes(1, 2)
+    assert max(key.expand_P_bytes()) < field_order(field)
+    assert key.P_coeffs[3] == key.P_matrix(3)
+
+@pytest.mark.parametrize("seed", [0, 12345, None, [1] * 16])
+def test_non_byte_seeds_are_rejected(seed):
+    # bytes(16) of an int would otherwise be the all-zero seed
+    with pytest.raises(TypeError):
+        SeededPublicKey(seed, M, N, K)
+
+@pytest.mark.parametrize("seed", [b"short", "00" * 17, "not hex"])
+def test_seeds_of_the_wrong_length_are_rejected(seed):
+    with pytest.raises(ValueError):
+        SeededPublicKey(seed, M, N, K)
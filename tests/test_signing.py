@@ -0,0 +1,45 @@
+"""Signatures from the trapdoor signer verify under every engine."""
+import random
+
+import numpy as np
+import pytest
+
+from Implementation.mayo_utils import field_order
+from Implementation.mayo_primitives import MAYO_Simulator
+from Implementation.mayo_numpy import MAYO_NumpySimulator
+from Implementation.mayo_signing import TrapdoorKey, MAYO_Signer
+
+FIELDS = [None, "gf256", "gf16"]
+M, N, K = 6, 10, 2
+
+
+@pytest.mark.parametrize("field", FIELDS)
+def test_signatures_verify_under_reference(field):
+    key = TrapdoorKey.generate(M, N, K, field=field)
+    signer = MAYO_Signer(key)
+    targets = [[random.randrange(field_order(field)) for _ in range(M)] for _ in range(5)]
+    signatures = signer.sign_batch(targets)
+    _, valid = key.simulator(MAYO_Simulator).verify_batch(signatures, targets)
+    assert all(valid)
+    assert np.array_equal(key.simulator(MAYO_NumpySimulator).P_star_eval_batch(signatures), targets)
+    assert signer.stats()["signatures"] == 5
+
+@pytest.mark.parametrize("field", FIELDS)
+def test_public_forms_vanish_on_the_oil_space(field):
+    key = TrapdoorKey.generate(M, N, K, field=field)
+    simulator = MAYO_Simulator(key.P_coeffs, key.E_matrices, M, N, K, field=field)
+    order = field_order(field)
+    u = [random.randrange(order) for _ in range(key.o)]
+    # (O u, u), over the ring or the field
+    if field is None:
+        oil = [sum(O_r[c] * u[c] for c in range(key.o)) % order for O_r in key.O] + u
+    else:
+        F = simulator.field
+        oil = list(F.vecmat([bytes(col) for col in zip(*key.O)], bytes(u))) + u
+    assert simulator.P_eval(oil) == [0] * M
+
+@pytest.mark.parametrize("o", [0, N, 2])
+def test_unusable_oil_dimensions_are_rejected(o):
+    # o = 2 gives K * o = 4 oil variables for M = 6 equations
+    with pytest.raises(ValueError):
+        TrapdoorKey.generate(M, N, K, o=o)
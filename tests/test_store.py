@@ -0,0 +1,98 @@
+"""Stores round-trip keys and test vectors, and reject what they cannot hold."""
+import random
+import struct
+
+import numpy as np
+import pytest
+
+from Implementation.mayo_utils import field_order
+from Implementation.mayo_primitives import MAYO_Simulator
+from Implementation.mayo_numpy import MAYO_NumpySimulator
+from Implementation.mayo_gf16 import MAYO_PackedSimulator
+from Implementation.mayo_data_setup import generate_mayo_test_parameters
+from Implementation.mayo_store import StoreWriter, MayoStore
+
+FIELDS = [None, "gf256", "gf16"]
+
+
+def random_key(M, N, K, field):
+    P, E, _, _ = generate_mayo_test_parameters(M, N, K, False, field=field)
+    return P, E
+
+def random_signature(length, field):
+    return [random.randrange(field_order(field)) for _ in range(length)]
+
+@pytest.mark.parametrize("field", FIELDS)
+@pytest.mark.parametrize("layout", ["full", "upper"])
+def test_store_vectors_verify_with_every_engine(tmp_path, field, layout):
+    M, N, K = 16, 8, 2
+    path = tmp_path / "kat.mayo"
+    keys = [random_key(M, N, K, field) for _ in range(2)]
+    reference = [MAYO_Simulator(P, E, M, N, K, field=field) for P, E in keys]
+    with StoreWriter(path, M, N, K, field=field, layout=layout) as writer:
+        for P, E in keys:
+            writer.add_key(P, E)
+        for k, simulator in enumerate(reference):
+            for _ in range(3):
+                s = random_signature(N * K, field)
+                writer.add_vector(k, s, simulator.P_star_eval(s, N * K))
+            # One vector with a wrong target per key
+            writer.add_vector(k, s, [(v + 1) % field_order(field) for v in simulator.P_star_eval(s, N * K)])
+
+    classes = [MAYO_Simulator, MAYO_NumpySimulator] + ([MAYO_PackedSimulator] if field == "gf16" else [])
+    with MayoStore(path) as store:
+        for simulator_class in classes:
+            assert store.verify_vectors(simulator_class) == [3, 7], simulator_class.__name__
+
+def test_store_closes_with_live_views(tmp_path):
+    path = tmp_path / "kat.mayo"
+    P, E = random_key(4, 6, 2, None)
+    with StoreWriter(path, 4, 6, 2) as writer:
+        writer.add_key(P, E)
+    with MayoStore(path) as store:
+        simulator = store.simulator(0, MAYO_NumpySimulator)
+    assert store._file.closed
+    s = random_signature(12, None)
+    assert simulator.P_star_eval(s, 12) == MAYO_Simulator(P, E, 4, 6, 2).P_star_eval(s, 12)
+
+@pytest.mark.parametrize("layout", ["full", "upper"])
+@pytest.mark.parametrize("as_array", [False, True])
+def test_writer_rejects_values_outside_the_field(tmp_path, layout, as_array):
+    M, N, K = 4, 5, 2
+    P, E = random_key(M, N, K, "gf16")
+    wrap = (lambda values: np.array(values, dtype=np.int64)) if as_array else (lambda values: values)
+    bad_P = [[row[:] for row in P_m] for P_m in P]
+    bad_P[1][2][3] = 16
+    with StoreWriter(tmp_path / "kat.mayo", M, N, K, field="gf16", layout=layout) as writer:
+        with pytest.raises(ValueError, match="GF\\(16\\)"):
+            writer.add_key(wrap(bad_P), E)
+        with pytest.raises(ValueError, match="GF\\(16\\)"):
+            writer.add_key(P, {**E, "1,1": wrap([[16] * M] * M)})
+        writer.add_key(wrap(P), E)
+        with pytest.raises(ValueError, match="signature"):
+            writer.add_vector(0, wrap([16] + [0] * (N * K - 1)), [0] * M)
+        with pytest.raises(ValueError, match="target"):
+            writer.add_vector(0, [0] * (N * K), wrap([0] * (M - 1) + [255]))
+        writer.add_vector(0, wrap([15] * (N * K)), [0] * M)
+    with MayoStore(tmp_path / "kat.mayo") as store:
+        assert (store.key_count, store.vector_count) == (1, 1)
+
+@pytest.mark.parametrize("bad", [256, -1])
+def test_ring_arrays_are_not_wrapped(tmp_path, bad):
+    P, E = random_key(3, 4, 2, None)
+    with StoreWriter(tmp_path / "kat.mayo", 3, 4, 2) as writer:
+        writer.add_key(P, E)
+        with pytest.raises(ValueError):
+            writer.add_vector(0, np.array([bad] + [0] * 7, dtype=np.int64), [0, 0, 0])
+
+def test_unknown_layout_byte_is_rejected(tmp_path):
+    path = tmp_path / "kat.mayo"
+    P, E = random_key(3, 4, 2, None)
+    with StoreWriter(path, 3, 4, 2) as writer:
+        writer.add_key(P, E)
+    data = bytearray(path.read_bytes())
+    # The layout byte follows magic, version, header size, M, N, K and the field name
+    data[struct.calcsize("<8sHHIII8s")] = 7
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="unknown layout 7"):
+        MayoStore(path)
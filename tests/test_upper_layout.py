@@ -0,0 +1,41 @@
+"""The packed upper-triangular layout evaluates exactly like the full matrices it packs."""
+import random
+
+import pytest
+
+from Implementation.mayo_utils import field_order, pack_upper_triangular, unpack_upper_triangular
+from Implementation.mayo_primitives import MAYO_Simulator
+from Implementation.mayo_numpy import MAYO_NumpySimulator
+from Implementation.mayo_data_setup import generate_mayo_test_parameters
+
+FIELDS = [None, "gf256", "gf16"]
+SHAPES = [(3, 4, 2), (5, 7, 3), (17, 6, 2)]
+
+
+@pytest.mark.parametrize("field", FIELDS)
+def test_unpacked_triangles_define_the_same_forms(field):
+    M, N, K = 4, 5, 2
+    P, E, _, _ = generate_mayo_test_parameters(M, N, K, False, field=field)
+    packed = pack_upper_triangular(P, field)
+    assert pack_upper_triangular(unpack_upper_triangular(packed, M, N), field) == packed
+    x = [random.randrange(field_order(field)) for _ in range(N)]
+    assert MAYO_Simulator(unpack_upper_triangular(packed, M, N), E, M, N, K, field=field).P_eval(x) == \
+        MAYO_Simulator(P, E, M, N, K, field=field).P_eval(x)
+
+@pytest.mark.parametrize("simulator_class", [MAYO_Simulator, MAYO_NumpySimulator])
+@pytest.mark.parametrize("field", FIELDS)
+@pytest.mark.parametrize("M,N,K", SHAPES)
+def test_upper_layout_matches_full(simulator_class, M, N, K, field):
+    P, E, _, _ = generate_mayo_test_parameters(M, N, K, False, field=field)
+    full = MAYO_Simulator(P, E, M, N, K, field=field)
+    order = field_order(field)
+    S = [[random.randrange(order) for _ in range(N * K)] for _ in range(4)]
+    expected = [full.P_star_eval(s, N * K) for s in S]
+    # Full matrices are packed on load; an already packed buffer is read as is
+    for P_given in (P, pack_upper_triangular(P, field)):
+        upper = simulator_class(P_given, E, M, N, K, field=field, layout="upper")
+        x, y = S[0][:N], S[1][:N]
+        assert list(upper.P_eval(x)) == full.P_eval(x)
+        assert list(upper.P_prime(x, y)) == full.P_prime(x, y)
+        assert [list(upper.P_star_eval(s, N * K)) for s in S] == expected
+        assert [[int(v) for v in row] for row in upper.P_star_eval_batch(S)] == expected